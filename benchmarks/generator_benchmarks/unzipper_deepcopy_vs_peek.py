@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+           Unzipping 10^6 (x, y) samples in batches, peeking unzipper against the previous deepcopy based inspection
+
+           Created on 18/10/2026
+           """
+
+import time
+import tracemalloc
+from copy import deepcopy
+
+from draugr import unzipper
+
+NUM_SAMPLES = 10 ** 6
+BATCH_SIZE = 100
+
+
+def batches():
+    for i in range(0, NUM_SAMPLES, BATCH_SIZE):
+        yield [(j, -j) for j in range(i, i + BATCH_SIZE)]
+
+
+def deepcopy_depth_check(iterable):
+    """The inspection unzipper did before, copying the whole input"""
+    first = next(iter(deepcopy(iterable)))
+    return next(iter(first))
+
+
+def consume(columns):
+    n = 0
+    for xs, ys in columns:
+        n += len(xs)
+    return n
+
+
+def measure(name, f):
+    tracemalloc.start()
+    s = time.time()
+    out = f()
+    elapsed = time.time() - s
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name}: {elapsed:.3f}s, peak {peak / 2 ** 20:.1f} MiB, {out}")
+
+
+def test_perf_unzipper_peek_vs_deepcopy():
+    materialised = list(batches())
+    measure(
+        "deepcopy inspection, list",
+        lambda: (deepcopy_depth_check(materialised), consume(unzipper(materialised))),
+    )
+    measure("peek, list", lambda: consume(unzipper(materialised)))
+    measure("peek, generator", lambda: consume(unzipper(batches())))
+    measure("peek with schema, generator", lambda: consume(unzipper(batches(), 3)))
+
+
+if __name__ == "__main__":
+    test_perf_unzipper_peek_vs_deepcopy()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+           to_tensor against its previous per element recursive implementation, for every input type exercised in
+           the __main__ of draugr.torch_utilities.tensors.to_tensor
+
+           Created on 18/10/2026
+           """
+
+import timeit
+from typing import Sequence
+
+import numpy
+import torch
+
+from draugr.torch_utilities import to_tensor
+
+
+def previous_to_tensor(obj, dtype=torch.float, device="cpu", **kwargs):
+    """The implementation before the fast paths, kept for reference"""
+    if torch.is_tensor(obj):
+        return obj.to(dtype=dtype, device=device, **kwargs)
+    if isinstance(obj, numpy.ndarray):
+        if torch.is_tensor(obj[0]) and len(obj[0].size()) > 0:
+            return torch.stack(obj.tolist()).to(dtype=dtype, device=device, **kwargs)
+        return torch.from_numpy(obj).to(dtype=dtype, device=device, **kwargs)
+    if not isinstance(obj, Sequence):
+        obj = [*obj] if isinstance(obj, set) else [obj]
+    elif not isinstance(obj, list):
+        obj = [*obj]
+    if isinstance(obj, list):
+        if torch.is_tensor(obj[0]) and len(obj[0].size()) > 0:
+            return torch.stack(obj).to(dtype=dtype, device=device, **kwargs)
+        elif isinstance(obj[0], list):
+            obj = [previous_to_tensor(o) for o in obj]
+            return torch.stack(obj).to(dtype=dtype, device=device, **kwargs)
+    return torch.tensor(obj, dtype=dtype, device=device, **kwargs)
+
+
+def inputs():
+    z = torch.zeros((2, 2))
+    a = torch.arange(0, 10)
+    yield "int", 1
+    yield "float", 2.0
+    yield "list", [0.5, 0.5]
+    yield "nested list", [[0.5, 0.5]]
+    yield "tuple", (0.5, 0.5)
+    yield "range", range(10)
+    yield "float tensor", torch.zeros(1000)
+    yield "long tensor", a
+    yield "list of tensors", [a, a]
+    yield "tuple of tensors", (z, z)
+    yield "tuples of lists of tensors", ([z], [z])
+    yield "deeply nested tensors", ([[[z]]], [[[z]]])
+    yield "set of tensors", {z, torch.ones((2, 2))}
+    yield "float32 ndarray", numpy.zeros((256, 256), dtype=numpy.float32)
+    yield "float64 ndarray", numpy.zeros((256, 256))
+    yield "tuple of ndarrays", tuple(numpy.zeros((2, 2)) for _ in range(4))
+    yield "object ndarray of tensors", numpy.array([z, z, z], dtype=object)
+    yield "large nested list", numpy.random.random((256, 256)).tolist()
+    yield "many small tensors", [torch.zeros(3) for _ in range(1000)]
+    yield "nested small ndarrays", [[numpy.zeros(3)] * 10 for _ in range(100)]
+
+
+def test_perf_to_tensor_fast_paths(number=200):
+    for name, obj in inputs():
+        timings = []
+        for f in (previous_to_tensor, to_tensor):
+            try:
+                timings.append(
+                    f"{timeit.timeit(lambda: f(obj), number=number) / number * 1e6:9.1f}us"
+                )
+            except Exception as e:
+                timings.append(f"{type(e).__name__:>11}")
+        print(f"{name:>28}: previous {timings[0]}, fast paths {timings[1]}")
+
+
+if __name__ == "__main__":
+    test_perf_to_tensor_fast_paths()
@@ -17,3 +17,6 @@ from .mapping_generator import *
 from .recycling_generator import *
 from .zipping_generator import *
 from .filtering import *
+from .prefetching import *
+from .pipeline import *
+from .async_generators import *
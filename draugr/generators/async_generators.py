@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+           Async generator counterparts of the generator toolkit, for many concurrent I/O bound reads on one event loop,
+           and a bridge feeding them to synchronous consumers
+
+           Created on 18/10/2026
+           """
+
+import asyncio
+from collections import deque
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Iterator, Union
+
+from draugr.generators.prefetching import Prefetcher
+from draugr.generators.recycling_generator import PermutationSampler
+
+__all__ = [
+    "aiterate",
+    "abatch_generator",
+    "amap",
+    "ainner_map",
+    "arecycle",
+    "sync_iterator",
+]
+
+
+async def aiterate(iterable: Union[Iterable, AsyncIterable]) -> AsyncIterator:
+    """
+  Async iteration over a sync or async iterable
+
+  :param iterable:
+  :return:"""
+    if hasattr(iterable, "__aiter__"):
+        async for a in iterable:
+            yield a
+    else:
+        for a in iterable:
+            yield a
+
+
+async def abatch_generator(
+    iterable: Union[Iterable, AsyncIterable], n: int = 32, drop_not_full: bool = True
+) -> AsyncIterator:
+    r"""
+  Async batch_generator, lists of n consecutive items
+
+  :param iterable:
+  :param n:
+  :param drop_not_full:
+  :return:"""
+    b = []
+    async for a in aiterate(iterable):
+        b.append(a)
+        if len(b) >= n:
+            yield b
+            b = []
+    if b and not drop_not_full:
+        yield b
+
+
+async def _call(func: callable, a: Any) -> Any:
+    if asyncio.iscoroutinefunction(func):
+        return await func(a)
+    return await asyncio.get_event_loop().run_in_executor(None, func, a)
+
+
+async def amap(
+    func: callable, iterable: Union[Iterable, AsyncIterable], concurrency: int = 16
+) -> AsyncIterator:
+    """
+  Ordered map with at most concurrency calls in flight, coroutine functions are awaited on the event loop, plain
+  functions run in the default executor
+
+  :param func:
+  :param iterable:
+  :param concurrency:
+  :return:"""
+    assert concurrency > 0
+    pending = deque()
+    try:
+        async for a in aiterate(iterable):
+            pending.append(asyncio.ensure_future(_call(func, a)))
+            if len(pending) >= concurrency:
+                yield await pending.popleft()
+        while pending:
+            yield await pending.popleft()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def ainner_map(
+    func: callable,
+    iterable: Union[Iterable, AsyncIterable],
+    aggregate_yield: bool = True,
+    *,
+    concurrency: int = 16,
+) -> AsyncIterator:
+    """
+  Async inner_map, func is applied to the elements of every inner iterable with at most concurrency calls in
+  flight
+
+  :param func:
+  :param iterable:
+  :param aggregate_yield:
+  :param concurrency:
+  :return:"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(b):
+        async with semaphore:
+            return await _call(func, b)
+
+    if aggregate_yield:
+        async for a in aiterate(iterable):
+            yield list(await asyncio.gather(*(limited(b) for b in a)))
+    else:
+
+        async def flattened():
+            async for a in aiterate(iterable):
+                for b in a:
+                    yield b
+
+        async for r in amap(func, flattened(), concurrency):
+            yield r
+
+
+async def arecycle(
+    iterable: Union[Iterable, AsyncIterable], *, sampler: PermutationSampler = None
+) -> AsyncIterator:
+    """
+  Async recycle, loops the items of iterable in a new random order every epoch, an async iterable is collected once
+
+  :param iterable:
+  :param sampler: for seeding, sharding or resuming, see PermutationSampler
+  :return:"""
+    items = [a async for a in aiterate(iterable)]
+    if sampler is None:
+        sampler = PermutationSampler(len(items))
+    for i in sampler:
+        yield items[i]
+
+
+def _drive(aiterable: AsyncIterable) -> Iterator:
+    loop = asyncio.new_event_loop()
+    it = aiterable.__aiter__()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(it.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        if hasattr(it, "aclose"):
+            loop.run_until_complete(it.aclose())
+        loop.close()
+
+
+def sync_iterator(aiterable: AsyncIterable, depth: int = 2) -> Prefetcher:
+    """
+  Iterate an async iterable from synchronous code, e.g. a training loop or to_tensor_generator. The event loop runs
+  on a background thread up to depth items ahead, see Prefetcher for stats and closing.
+
+  :param aiterable:
+  :param depth:
+  :return:"""
+    return Prefetcher(_drive(aiterable), depth, "thread")
+
+
+if __name__ == "__main__":
+
+    def main():
+        import time
+
+        async def read(i):
+            await asyncio.sleep(0.01)  # Stand-in for a file or socket read
+            return i
+
+        s = time.time()
+        for batch in sync_iterator(
+            abatch_generator(amap(read, range(1000), concurrency=100), 100)
+        ):
+            print(batch[0], end=" ")
+        print(f"\n1000 reads of 10ms in {time.time() - s:.2f}s")
+
+    main()
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+from concurrent.futures import Executor, ThreadPoolExecutor
+from itertools import chain
 from typing import Any, Iterable, Sequence
 
 __author__ = "Christian Heider Nielsen"
@@ -11,21 +13,30 @@ __doc__ = r"""
 
 import numpy
 
-__all__ = ["sized_batch", "shuffled_batches", "random_batches", "batch_generator"]
+__all__ = [
+    "sized_batch",
+    "shuffled_batches",
+    "random_batches",
+    "batch_generator",
+    "preallocated_batch_generator",
+    "block_shuffled_batches",
+]
 
 
 def sized_batch(sized: Iterable, n: int = 32, drop_not_full: bool = True) -> Any:
     r"""
 
+  Numpy arrays are sliced, so batches are contiguous views without any copy
+
   :param sized:
   :param n:
   :param drop_not_full:
   :return:"""
-    if not isinstance(sized, Sequence):
+    if not isinstance(sized, (Sequence, numpy.ndarray)):
         sized = list(sized)
     l = len(sized)
     for ndx in range(0, l, n):
-        if drop_not_full and ndx + n > l - 1:
+        if drop_not_full and ndx + n > l:
             return
         yield sized[ndx : min(ndx + n, l)]
 
@@ -60,25 +71,193 @@ def shuffled_batches(*args, size: int, batch_size: int) -> Sequence:
         yield [a[perm] for a in args]
 
 
+def _block_shuffled_indices(
+    size: int,
+    batch_size: int,
+    block_size: int,
+    buffer_blocks: int,
+    rng: numpy.random.Generator,
+) -> Any:
+    starts = rng.permutation(-(-size // block_size)) * block_size
+    carry = numpy.empty(0, dtype=numpy.int64)
+    for i in range(0, starts.shape[0], buffer_blocks):
+        buffer = numpy.concatenate(
+            [carry]
+            + [
+                numpy.arange(s, min(s + block_size, size))
+                for s in starts[i : i + buffer_blocks]
+            ]
+        )
+        rng.shuffle(buffer)
+        num_full = buffer.shape[0] // batch_size
+        for j in range(num_full):
+            yield buffer[j * batch_size : (j + 1) * batch_size]
+        carry = buffer[num_full * batch_size :]
+
+
+def _gather_sorted(
+    a: numpy.ndarray, idx: numpy.ndarray, executor: Executor = None, num_parts: int = 1
+) -> numpy.ndarray:
+    order = numpy.argsort(idx, kind="stable")
+    sorted_idx = idx[order]
+    if executor is None:
+        gathered = a[sorted_idx]
+    else:
+        gathered = numpy.concatenate(
+            list(executor.map(a.__getitem__, numpy.array_split(sorted_idx, num_parts)))
+        )
+    out = numpy.empty_like(gathered)
+    out[order] = gathered
+    return out
+
+
+def block_shuffled_batches(
+    *args,
+    size: int,
+    batch_size: int,
+    block_size: int = 1024,
+    buffer_blocks: int = 16,
+    seed: int = None,
+    num_workers: int = 0,
+) -> Sequence:
+    r"""
+  Locality aware alternative to shuffled_batches for memory-mapped arrays larger than memory. Contiguous blocks of
+  block_size rows are visited in random order and rows are shuffled within a buffer of buffer_blocks blocks, so a
+  batch touches at most buffer_blocks regions of the file. Each batch is gathered with sorted indices, for mostly
+  sequential reads, and returned in its shuffled order.
+
+  With num_workers the gather of every array is split over that many threads and the next batch is gathered while
+  the current is consumed.
+
+  :param args:
+  :type args:
+  :param size:
+  :type size:
+  :param batch_size:
+  :type batch_size:
+  :param block_size:
+  :param buffer_blocks:
+  :param seed:
+  :param num_workers:"""
+    assert block_size > 0 and buffer_blocks > 0
+    batches = _block_shuffled_indices(
+        size, batch_size, block_size, buffer_blocks, numpy.random.default_rng(seed)
+    )
+    if not num_workers:
+        for idx in batches:
+            yield [_gather_sorted(a, idx) for a in args]
+        return
+
+    with ThreadPoolExecutor(num_workers) as parts, ThreadPoolExecutor(1) as ahead:
+
+        def gather(idx):
+            return [_gather_sorted(a, idx, parts, num_workers) for a in args]
+
+        future = None
+        for idx in batches:
+            following = ahead.submit(gather, idx)
+            if future is not None:
+                yield future.result()
+            future = following
+        if future is not None:
+            yield future.result()
+
+
 def batch_generator(iterable: Iterable, n: int = 32, drop_not_full: bool = True) -> Any:
     r"""
+  Lists of n consecutive samples, every batch is a new list
 
   :param iterable:
   :param n:
   :param drop_not_full:
   :return:"""
     b = []
-    i = 0
     for a in iterable:
         b.append(a)
-        i += 1
-        if i >= n:
+        if len(b) >= n:
             yield b
-            b.clear()
-            i = 0
-    if drop_not_full:
+            b = []
+    if b and not drop_not_full:
+        yield b
+
+
+def _allocate_batch(
+    sample: Any, n: int, dtype: numpy.dtype, torch_buffer: bool, pin_memory: bool
+) -> Any:
+    sample = numpy.asarray(sample, dtype=dtype)
+    shape = (n, *sample.shape)
+    if not torch_buffer:
+        return numpy.empty(shape, dtype=sample.dtype)
+    import torch
+
+    return torch.empty(
+        shape,
+        dtype=torch.from_numpy(numpy.empty(0, dtype=sample.dtype)).dtype,
+        pin_memory=pin_memory and torch.cuda.is_available(),
+    )
+
+
+def preallocated_batch_generator(
+    iterable: Iterable,
+    n: int = 32,
+    drop_not_full: bool = True,
+    *,
+    num_buffers: int = 2,
+    dtype: numpy.dtype = None,
+    torch_buffer: bool = False,
+    pin_memory: bool = False,
+) -> Any:
+    r"""
+  Batches of n consecutive samples written straight into preallocated contiguous buffers of shape
+  (n, *sample_shape), shapes and dtype are taken from the first sample. Samples that are tuples, e.g. (x, y) pairs,
+  get a buffer per field and batches are tuples of buffers.
+
+  The num_buffers buffers are reused round robin, so there is no allocation per batch, a yielded batch stays valid
+  until num_buffers - 1 further batches have been yielded. Use num_buffers=2 to fill one batch while the previous
+  is consumed, e.g. transferred to a device. A final partial batch is a view of the first len entries.
+
+  :param iterable:
+  :param n:
+  :param drop_not_full:
+  :param num_buffers:
+  :param dtype: defaults to that of the first sample
+  :param torch_buffer: yield torch tensors instead of numpy arrays
+  :param pin_memory: use page-locked torch buffers for faster asynchronous host to device copies, if cuda is
+  available
+  :return:"""
+    assert n > 0 and num_buffers > 0
+    iterator = iter(iterable)
+    try:
+        first = next(iterator)
+    except StopIteration:
         return
-    return b
+    is_tuple = isinstance(first, tuple)
+    fields = first if is_tuple else (first,)
+    buffers = [
+        [_allocate_batch(f, n, dtype, torch_buffer, pin_memory) for f in fields]
+        for _ in range(num_buffers)
+    ]
+    if torch_buffer:  # Writes go through shared memory numpy views of the tensors
+        targets = [[b.numpy() for b in buffer] for buffer in buffers]
+    else:
+        targets = buffers
+
+    i = 0
+    k = 0
+    for sample in chain((first,), iterator):
+        if is_tuple:
+            for target, field in zip(targets[k], sample):
+                target[i] = field
+        else:
+            targets[k][0][i] = sample
+        i += 1
+        if i == n:
+            yield tuple(buffers[k]) if is_tuple else buffers[k][0]
+            i = 0
+            k = (k + 1) % num_buffers
+    if i and not drop_not_full:
+        partial = [b[:i] for b in buffers[k]]
+        yield tuple(partial) if is_tuple else partial[0]
 
 
 if __name__ == "__main__":
@@ -90,5 +269,9 @@ if __name__ == "__main__":
         b = numpy.random.random((arg_num, size))
         for a in shuffled_batches(*b, size=size, batch_size=mini_batch_size):
             print(list(a))
+        for a in block_shuffled_batches(
+            *b, size=size, batch_size=mini_batch_size, block_size=3, buffer_blocks=2
+        ):
+            print(list(a))
 
     asda()
@@ -7,10 +7,21 @@ __doc__ = r"""
            Created on 18-01-2021
            """
 
+import functools
+import mmap
+import os
 from enum import Enum
-from typing import Iterable
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple
 
-__all__ = ["FilterModeEnum", "symbol_filter"]
+from draugr.generators.mapping_generator import parallel_map
+
+__all__ = [
+    "FilterModeEnum",
+    "symbol_filter",
+    "file_symbol_filter",
+    "write_symbol_filtered",
+]
 
 
 class FilterModeEnum(Enum):
@@ -43,6 +54,137 @@ def symbol_filter(
         raise NotImplemented(f"{exclusion_mode} mode not supported")
 
 
+def _chunk_ranges(path: Path, chunk_size: int) -> List[Tuple[int, int]]:
+    size = os.path.getsize(str(path))
+    if not size:
+        return []
+    ranges = []
+    with open(str(path), "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mm:
+        start = 0
+        while start < size:
+            end = mm.find(b"\n", min(start + chunk_size, size) - 1)
+            end = size if end < 0 else end + 1
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def _filter_range(
+    byte_range: Tuple[int, int], path: Path, symbol: bytes, mode: FilterModeEnum
+) -> bytes:
+    """
+  Filters the whole lines in byte_range of the file as bytes, one split of the chunk and C level bytes methods per line
+
+  :return: kept lines, each terminated by a newline"""
+    start, end = byte_range
+    with open(str(path), "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mm:
+        lines = mm[start:end].split(b"\n")
+    if not lines[-1]:
+        lines.pop()  # Chunks end after a newline, except maybe the last
+    if mode == FilterModeEnum.exclude_fully:
+        kept = [line for line in lines if symbol not in line]
+    elif mode == FilterModeEnum.exclude_postfix:
+        kept = list(filter(None, [line.partition(symbol)[0].strip() for line in lines]))
+    else:
+        kept = list(filter(None, [line.split(symbol)[-1].strip() for line in lines]))
+    if not kept:
+        return b""
+    kept.append(b"")
+    return b"\n".join(kept)
+
+
+def _filtered_chunks(
+    path: Path,
+    symbol: str,
+    exclusion_mode: FilterModeEnum,
+    encoding: str,
+    chunk_size: int,
+    workers: str,
+    num_workers: int,
+) -> Iterator[bytes]:
+    symbol = symbol.encode(encoding)
+    assert symbol and b"\n" not in symbol
+    if exclusion_mode not in FilterModeEnum:
+        raise NotImplementedError(f"{exclusion_mode} mode not supported")
+    task = functools.partial(
+        _filter_range, path=Path(path), symbol=symbol, mode=exclusion_mode
+    )
+    ranges = _chunk_ranges(path, chunk_size)
+    if num_workers:
+        yield from parallel_map(
+            task, ranges, workers=workers, num_workers=num_workers, chunk_size=1
+        )
+    else:
+        yield from map(task, ranges)
+
+
+def file_symbol_filter(
+    path: Path,
+    symbol: str = "#",
+    *,
+    exclusion_mode: FilterModeEnum = FilterModeEnum.exclude_postfix,
+    encoding: str = "utf-8",
+    chunk_size: int = 2 ** 24,
+    workers: str = "thread",
+    num_workers: int = 0,
+) -> Iterator[str]:
+    """
+  symbol_filter over the lines of a file. The file is memory-mapped and processed as bytes in chunks of about
+  chunk_size bytes of whole lines, so nothing is decoded or read line by line. With num_workers chunks are filtered in
+  parallel on the shared pools of parallel_map, in order.
+
+  Lines are split on newlines only, and stripped of ASCII whitespace as by bytes.strip.
+
+  :param path:
+  :param symbol:
+  :param exclusion_mode:
+  :param encoding: an ASCII compatible encoding
+  :param chunk_size:
+  :param workers: "thread" or "process"
+  :param num_workers:
+  :return:"""
+    for chunk in _filtered_chunks(
+        path, symbol, exclusion_mode, encoding, chunk_size, workers, num_workers
+    ):
+        yield from chunk.decode(encoding).split("\n")[:-1]
+
+
+def write_symbol_filtered(
+    path: Path,
+    out_path: Path,
+    symbol: str = "#",
+    *,
+    exclusion_mode: FilterModeEnum = FilterModeEnum.exclude_postfix,
+    encoding: str = "utf-8",
+    chunk_size: int = 2 ** 24,
+    workers: str = "thread",
+    num_workers: int = 0,
+) -> Path:
+    """
+  Writes the lines of path kept by file_symbol_filter to out_path, chunk by chunk without decoding
+
+  :param path:
+  :param out_path:
+  :param symbol:
+  :param exclusion_mode:
+  :param encoding:
+  :param chunk_size:
+  :param workers:
+  :param num_workers:
+  :return: out_path"""
+    out_path = Path(out_path)
+    with open(str(out_path), "wb") as f:
+        for chunk in _filtered_chunks(
+            path, symbol, exclusion_mode, encoding, chunk_size, workers, num_workers
+        ):
+            f.write(chunk)
+    return out_path
+
+
 if __name__ == "__main__":
 
     def asijsda():
@@ -1,5 +1,17 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import functools
+import os
+import time
+from collections import deque
+from concurrent.futures import (
+    Executor,
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from itertools import chain, islice
 from typing import Iterable, Any
 
 __author__ = "Christian Heider Nielsen"
@@ -8,7 +20,17 @@ __doc__ = r"""
            Created on 11/11/2019
            """
 
-__all__ = ["yield_and_map", "inner_map", "kw_map"]
+__all__ = [
+    "yield_and_map",
+    "inner_map",
+    "kw_map",
+    "shared_executor",
+    "parallel_map",
+    "parallel_inner_map",
+    "parallel_kw_map",
+]
+
+_EXECUTORS = {}
 
 
 def yield_and_map(iterable: Iterable, level: int = 0, func: callable = print) -> Any:
@@ -68,6 +90,137 @@ def kw_map(func: callable, kw: str, iterable: Iterable) -> Any:
         yield func(**{kw: a})
 
 
+def shared_executor(workers: str = "thread", num_workers: int = None) -> Executor:
+    """
+  Persistent pool shared by the parallel maps, created on first use and kept for the lifetime of the process, forked
+  children get pools of their own
+
+  :param workers: "thread" or "process"
+  :param num_workers: defaults to the cpu count
+  :return:"""
+    assert workers in ("thread", "process"), f"workers is {workers}"
+    key = (workers, num_workers, os.getpid())  # Pools do not survive a fork
+    if key not in _EXECUTORS:
+        if workers == "thread":
+            _EXECUTORS[key] = ThreadPoolExecutor(num_workers)
+        else:
+            _EXECUTORS[key] = ProcessPoolExecutor(num_workers)
+    return _EXECUTORS[key]
+
+
+def _apply_chunk(func: callable, chunk: list) -> tuple:
+    start = time.perf_counter()
+    return [func(a) for a in chunk], time.perf_counter() - start
+
+
+def parallel_map(
+    func: callable,
+    iterable: Iterable,
+    *,
+    workers: str = "thread",
+    num_workers: int = None,
+    executor: Executor = None,
+    chunk_size: int = None,
+    max_in_flight: int = None,
+    ordered: bool = True,
+    target_chunk_seconds: float = 0.01,
+) -> Any:
+    """
+  Lazily yields func of every element of iterable, computed in chunks on a persistent pool.
+
+  At most max_in_flight chunks (default twice the number of workers) are submitted ahead of the consumer, so memory
+  stays flat on infinite iterables. Unless chunk_size is given it is tuned from the measured time per element so
+  each chunk takes about target_chunk_seconds, amortising the per task overhead. With ordered=False results are
+  yielded chunk-wise as they complete. With process workers func and elements must be picklable.
+
+  :param func:
+  :param iterable:
+  :param workers: "thread" or "process", for the shared_executor used when executor is not given
+  :param num_workers:
+  :param executor:
+  :param chunk_size:
+  :param max_in_flight:
+  :param ordered:
+  :param target_chunk_seconds:
+  :return:"""
+    if executor is None:
+        executor = shared_executor(workers, num_workers)
+    if max_in_flight is None:
+        max_in_flight = 2 * (num_workers or os.cpu_count() or 1)
+    size = chunk_size or 1
+    iterator = iter(iterable)
+    pending = deque()
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < max_in_flight:
+                chunk = list(islice(iterator, size))
+                if chunk:
+                    pending.append(executor.submit(_apply_chunk, func, chunk))
+                else:
+                    exhausted = True
+            if not pending:
+                return
+            if ordered:
+                future = pending.popleft()
+            else:
+                future = next(iter(wait(pending, return_when=FIRST_COMPLETED)[0]))
+                pending.remove(future)
+            results, elapsed = future.result()
+            if chunk_size is None and results:
+                per_element = elapsed / len(results)
+                size = (
+                    max(1, min(1024, int(target_chunk_seconds / per_element)))
+                    if per_element > 0
+                    else 1024
+                )
+            yield from results
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _apply_all(func: callable, a: Iterable) -> list:
+    return [func(b) for b in a]
+
+
+def parallel_inner_map(
+    func: callable, iterable: Iterable, aggregate_yield: bool = True, **kwargs
+) -> Any:
+    """
+  Parallel inner_map, see parallel_map for kwargs
+
+  :param func:
+  :type func:
+  :param iterable:
+  :type iterable:
+  :param aggregate_yield:
+  :type aggregate_yield:"""
+    if aggregate_yield:
+        yield from parallel_map(functools.partial(_apply_all, func), iterable, **kwargs)
+    else:
+        yield from parallel_map(func, chain.from_iterable(iterable), **kwargs)
+
+
+def _call_with_kw(func: callable, kw: str, a: Any) -> Any:
+    return func(**{kw: a})
+
+
+def parallel_kw_map(func: callable, kw: str, iterable: Iterable, **kwargs) -> Any:
+    """
+  Parallel kw_map, see parallel_map for kwargs
+
+  :param func:
+  :type func:
+  :param kw:
+  :type kw:
+  :param iterable:
+  :type iterable:"""
+    yield from parallel_map(
+        functools.partial(_call_with_kw, func, kw), iterable, **kwargs
+    )
+
+
 if __name__ == "__main__":
     a = (2, 3)
     # TODO
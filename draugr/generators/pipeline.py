@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+           Composition of generator stages with per stage execution and throughput instrumentation
+
+           Created on 18/10/2026
+           """
+
+import time
+from functools import partial
+from typing import Any, Callable, Iterable, Iterator, List, Optional, TYPE_CHECKING
+
+from draugr.generators.mapping_generator import parallel_map
+from draugr.generators.prefetching import Prefetcher
+from draugr.metrics.meters import RateMeter
+
+if TYPE_CHECKING:
+    from draugr.writers import Writer
+
+__all__ = ["Pipeline", "PipelineStage"]
+
+
+class PipelineStage:
+    """
+  A stage of a Pipeline and its statistics, measured on the consumer side of the stage:
+
+  items: number of items the stage produced
+  items_per_sec: rate over the last rate_window seconds
+  wait: seconds downstream spent blocked waiting for the stage. For sync stages this includes the upstream stages,
+  so the difference to the wait of the stage before is the cost of the stage itself
+  occupancy: items buffered ahead by a thread or process stage"""
+
+    def __init__(
+        self,
+        name: str,
+        transform: Callable[[Iterable], Iterable],
+        workers: str,
+        buffer: int,
+        rate_window: float,
+    ):
+        assert workers in ("sync", "thread", "process"), f"workers is {workers}"
+        self.name = name
+        self.transform = transform
+        self.workers = workers
+        self.buffer = buffer
+        self.rate = RateMeter(rate_window, tag=name)
+        self.wait = 0.0
+        self._prefetcher = None
+
+    def __call__(self, upstream: Iterable) -> Iterator:
+        self.rate.reset()
+        self.wait = 0.0
+        stream = self.transform(upstream)
+        if self.workers != "sync":
+            stream = self._prefetcher = Prefetcher(stream, self.buffer, self.workers)
+        it = iter(stream)
+        clock = time.perf_counter
+        while True:
+            start = clock()
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            finally:
+                self.wait += clock() - start
+            self.rate.tick()
+            yield item
+
+    @property
+    def items(self) -> int:
+        """"""
+        return self.rate.total
+
+    @property
+    def occupancy(self) -> Optional[int]:
+        """"""
+        if self._prefetcher is None:
+            return None
+        return self._prefetcher.occupancy
+
+    def measures(self) -> dict:
+        """
+
+    :return: tag to value"""
+        return {
+            f"{self.name}/items": self.items,
+            f"{self.name}/items_per_sec": self.rate.rate,
+            f"{self.name}/wait": self.wait,
+            f"{self.name}/occupancy": self.occupancy,
+        }
+
+    def close(self) -> None:
+        """"""
+        if self._prefetcher is not None:
+            self._prefetcher.close()
+
+
+class Pipeline:
+    """
+  Chains generator stages over a source iterable, each stage either runs synchronously on the consuming thread, or
+  ahead of it on a background thread or process with a bounded buffer. Element wise stages added with map may
+  instead use the shared thread or process pools of parallel_map.
+
+  Statistics of every stage are written to writer every publish_interval seconds while iterating, or on publish.
+  Stages upstream of a process stage run in that process, so their statistics are not visible in the parent.
+
+  pipeline = (
+    Pipeline(read_files(paths), writer=writer)
+    .map(decode, workers="process", name="decode")
+    .then(lambda it: batch_generator(it, 32), workers="thread", buffer=4, name="batch")
+  )
+  for batch in pipeline:
+    ..."""
+
+    def __init__(
+        self,
+        source: Iterable,
+        *,
+        writer: "Writer" = None,
+        publish_interval: float = 10.0,
+        rate_window: float = 10.0,
+    ):
+        self.source = source
+        self.stages: List[PipelineStage] = []
+        self.writer = writer
+        self.publish_interval = publish_interval
+        self.rate_window = rate_window
+
+    def then(
+        self,
+        transform: Callable[[Iterable], Iterable],
+        *,
+        name: str = None,
+        workers: str = "sync",
+        buffer: int = 2,
+    ) -> "Pipeline":
+        """
+    Append a stage transforming the upstream iterable, e.g. lambda it: batch_generator(it, 32)
+
+    :param transform:
+    :param name: defaults to the name of transform and the stage index
+    :param workers: "sync", "thread" or "process"
+    :param buffer: number of items a thread or process stage may run ahead
+    :return: self"""
+        if name is None:
+            name = f"{len(self.stages)}_{getattr(transform, '__name__', 'stage')}"
+        self.stages.append(
+            PipelineStage(name, transform, workers, buffer, self.rate_window)
+        )
+        return self
+
+    def map(
+        self,
+        func: Callable[[Any], Any],
+        *,
+        name: str = None,
+        workers: str = "sync",
+        num_workers: int = None,
+        buffer: int = None,
+        ordered: bool = True,
+    ) -> "Pipeline":
+        """
+    Append an element wise stage, with thread or process workers it is evaluated on the shared pools of
+    parallel_map with at most buffer chunks in flight
+
+    :param func:
+    :param name:
+    :param workers: "sync", "thread" or "process"
+    :param num_workers:
+    :param buffer:
+    :param ordered:
+    :return: self"""
+        if name is None:
+            name = f"{len(self.stages)}_{getattr(func, '__name__', 'map')}"
+        if workers == "sync":
+            transform = partial(map, func)
+        else:
+            transform = partial(
+                parallel_map,
+                func,
+                workers=workers,
+                num_workers=num_workers,
+                max_in_flight=buffer,
+                ordered=ordered,
+            )
+        self.stages.append(PipelineStage(name, transform, "sync", 0, self.rate_window))
+        return self
+
+    def __iter__(self) -> Iterator:
+        stream = self.source
+        for stage in self.stages:
+            stream = stage(stream)
+        next_publish = time.monotonic() + self.publish_interval
+        try:
+            for item in stream:
+                if self.writer is not None and time.monotonic() >= next_publish:
+                    next_publish = time.monotonic() + self.publish_interval
+                    self.publish()
+                yield item
+        finally:
+            for stage in self.stages:
+                stage.close()
+
+    def measures(self) -> dict:
+        """
+
+    :return: tag to value of every stage"""
+        out = {}
+        for stage in self.stages:
+            out.update(stage.measures())
+        return out
+
+    def publish(self, writer: "Writer" = None, step_i: int = None) -> None:
+        """
+    Write the statistics of every stage as scalars
+
+    :param writer: defaults to the writer of the pipeline
+    :param step_i:"""
+        writer = writer or self.writer
+        for tag, value in self.measures().items():
+            if value is not None:
+                writer.scalar(tag, value, step_i)
+
+
+if __name__ == "__main__":
+
+    def main():
+        from draugr.generators.batching_generator import batch_generator
+
+        def slow_square(x):
+            time.sleep(0.001)
+            return x * x
+
+        pipeline = (
+            Pipeline(range(1000))
+            .map(slow_square, workers="thread", name="square")
+            .then(lambda it: batch_generator(it, 10), workers="thread", name="batch")
+        )
+        for _ in pipeline:
+            time.sleep(0.002)
+        for k, v in pipeline.measures().items():
+            print(k, v)
+
+    main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+           Background prefetching of any iterable through a bounded queue, overlapping an upstream producer with the
+           consumer
+
+           Created on 18/10/2026
+           """
+
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import weakref
+from typing import Any, Iterable, Iterator, Optional
+
+__all__ = ["prefetch", "Prefetcher"]
+
+_POLL_INTERVAL = 0.1
+
+
+class _End:
+    pass
+
+
+class _Raised:
+    def __init__(self, exception: BaseException):
+        self.exception = exception
+
+
+class _Seconds:
+    """Stand-in for multiprocessing.Value when producing on a thread"""
+
+    def __init__(self):
+        self.value = 0.0
+
+
+def _put(q, item, stop, stall) -> bool:
+    try:
+        q.put_nowait(item)
+        return True
+    except queue.Full:
+        pass
+    start = time.perf_counter()
+    try:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                pass
+        return False
+    finally:
+        stall.value += time.perf_counter() - start
+
+
+def _produce(iterable, q, stop, stall) -> None:
+    try:
+        for item in iterable:
+            if not _put(q, item, stop, stall):
+                return
+        _put(q, _End(), stop, stall)
+    except BaseException as e:
+        _put(q, _Raised(e), stop, stall)
+
+
+def _shutdown(q, stop, worker, owner_pid: int) -> None:
+    """Stops the producer and waits for it to exit, draining the queue so a producer blocked on put can see stop"""
+    if os.getpid() != owner_pid:  # Inherited copy in a forked process
+        return
+    stop.set()
+    while worker.is_alive():
+        try:
+            while True:
+                q.get_nowait()
+        except queue.Empty:
+            pass
+        if worker is threading.current_thread():  # Collected on the producer thread
+            return
+        worker.join(_POLL_INTERVAL)
+
+
+class Prefetcher:
+    """
+  Iterator over iterable, produced up to depth items ahead by a background thread or process.
+
+  Exceptions raised by the producer are re-raised on the consumer side. close, exhaustion or leaving the context
+  stops and joins the producer, as does garbage collection of an abandoned Prefetcher. stats reports the time the
+  producer stalled on a full queue (the consumer is the bottleneck) and the time the consumer stalled on an empty
+  queue (the producer is the bottleneck).
+
+  With workers="process" the producer runs in a forked process, items are pickled through the queue. That suits CPU
+  bound upstream work held back by the GIL, where fork is unavailable the iterable must itself be picklable."""
+
+    def __init__(self, iterable: Iterable, depth: int = 2, workers: str = "thread"):
+        assert depth > 0
+        assert workers in ("thread", "process"), f"workers is {workers}"
+        self._consumer_stall = 0.0
+        self._items = 0
+        self._done = False
+        if workers == "thread":
+            self._queue = queue.Queue(depth)
+            self._stop = threading.Event()
+            self._producer_stall = _Seconds()
+            self._worker = threading.Thread(
+                target=_produce,
+                args=(iterable, self._queue, self._stop, self._producer_stall),
+                daemon=True,
+            )
+        else:
+            ctx = multiprocessing.get_context(
+                "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+            )
+            self._queue = ctx.Queue(depth)
+            self._stop = ctx.Event()
+            self._producer_stall = ctx.Value("d", 0.0)
+            self._worker = ctx.Process(
+                target=_produce,
+                args=(iterable, self._queue, self._stop, self._producer_stall),
+                daemon=True,
+            )
+        self._worker.start()
+        self._finalizer = weakref.finalize(  # Must not reference self
+            self, _shutdown, self._queue, self._stop, self._worker, os.getpid()
+        )
+
+    def __iter__(self) -> Iterator:
+        return self
+
+    def _get(self) -> Any:
+        try:
+            return self._queue.get_nowait()
+        except queue.Empty:
+            pass
+        start = time.perf_counter()
+        try:
+            while True:
+                try:
+                    return self._queue.get(timeout=_POLL_INTERVAL)
+                except queue.Empty:
+                    if not self._worker.is_alive():
+                        try:  # It may have finished right after the timeout
+                            return self._queue.get(timeout=_POLL_INTERVAL)
+                        except queue.Empty:
+                            raise RuntimeError(
+                                "Prefetch producer died without finishing"
+                            )
+        finally:
+            self._consumer_stall += time.perf_counter() - start
+
+    def __next__(self) -> Any:
+        if self._done:
+            raise StopIteration
+        item = self._get()
+        if isinstance(item, _End):
+            self.close()
+            raise StopIteration
+        if isinstance(item, _Raised):
+            self.close()
+            raise item.exception
+        self._items += 1
+        return item
+
+    def close(self) -> None:
+        """Stops the producer and waits for it to exit, discarding prefetched items"""
+        if self._done:
+            return
+        self._done = True
+        self._finalizer()
+
+    @property
+    def occupancy(self) -> Optional[int]:
+        """Number of items currently prefetched, None where the platform can not tell"""
+        try:
+            return self._queue.qsize()
+        except NotImplementedError:
+            return None
+
+    @property
+    def stats(self) -> dict:
+        """
+    Number of items consumed and stall times in seconds
+
+    :return:"""
+        return {
+            "items": self._items,
+            "producer_stall": self._producer_stall.value,
+            "consumer_stall": self._consumer_stall,
+        }
+
+    def __enter__(self) -> "Prefetcher":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+
+def prefetch(iterable: Iterable, depth: int = 2, workers: str = "thread") -> Prefetcher:
+    """
+  Run iterable up to depth items ahead of the consumer on a background thread or process, see Prefetcher
+
+  :param iterable:
+  :param depth:
+  :param workers: "thread" or "process"
+  :return:"""
+    return Prefetcher(iterable, depth, workers)
+
+
+if __name__ == "__main__":
+
+    def main():
+        def slow_source():
+            for i in range(20):
+                time.sleep(0.01)
+                yield i
+
+        for workers in ("thread", "process"):
+            with prefetch(slow_source(), depth=4, workers=workers) as p:
+                for _ in p:
+                    time.sleep(0.01)
+            print(workers, p.stats)
+
+    main()
@@ -1,6 +1,5 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-import random
 from typing import Iterable, Sequence, Any
 
 import numpy
@@ -11,33 +10,154 @@ __doc__ = r"""
            Created on 28/10/2019
            """
 
-__all__ = ["recycle", "batched_recycle"]
+__all__ = ["PermutationSampler", "recycle", "batched_recycle"]
 
 
-def recycle(iterable: Iterable) -> Any:
+class PermutationSampler:
+    """
+  Endless indices into a sequence of size elements, a fresh permutation every epoch so every element is visited once
+  per epoch. Drawing n indices is O(n), the permutation is generated once per epoch.
+
+  The permutation of an epoch is determined by seed and epoch alone, so the sampler resumes exactly from
+  state_dict, and shards with the same seed take disjoint strided parts of the same permutation, e.g. one shard per
+  data loading worker or distributed rank. Without a seed one is drawn from the global numpy random state, so
+  numpy.random.seed makes the sampler reproducible too.
+
+  Draws of several indices may span an epoch boundary, the indices from the end of one epoch and the start of the
+  next are then distinct within each epoch but may repeat an element across the two."""
+
+    def __init__(
+        self, size: int, seed: int = None, *, shard_index: int = 0, num_shards: int = 1,
+    ):
+        assert 0 <= shard_index < num_shards <= size
+        if seed is None:
+            seed = int(numpy.random.randint(2 ** 63, dtype=numpy.int64))
+        self.size = size
+        self.seed = seed
+        self.shard_index = shard_index
+        self.num_shards = num_shards
+        self.epoch = 0
+        self.position = 0
+        self._permutation = None
+
+    def _epoch_permutation(self) -> numpy.ndarray:
+        if self._permutation is None:
+            rng = numpy.random.default_rng([self.seed, self.epoch])
+            self._permutation = rng.permutation(self.size)[
+                self.shard_index :: self.num_shards
+            ]
+        return self._permutation
+
+    def next_indices(self, n: int) -> numpy.ndarray:
+        """
+    The next n indices, continuing into the next epoch if the current one runs out, in which case an element may
+    appear twice
+
+    :param n:
+    :return:"""
+        out = []
+        while n > 0:
+            permutation = self._epoch_permutation()
+            if self.position >= permutation.shape[0]:
+                self.epoch += 1
+                self.position = 0
+                self._permutation = None
+                continue
+            taken = permutation[self.position : self.position + n]
+            out.append(taken)
+            self.position += taken.shape[0]
+            n -= taken.shape[0]
+        return out[0] if len(out) == 1 else numpy.concatenate(out)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> int:
+        return int(self.next_indices(1)[0])
+
+    def state_dict(self) -> dict:
+        """
+
+    :return:"""
+        return {
+            "size": self.size,
+            "seed": self.seed,
+            "shard_index": self.shard_index,
+            "num_shards": self.num_shards,
+            "epoch": self.epoch,
+            "position": self.position,
+        }
+
+    def load_state_dict(self, state_dict: dict) -> None:
+        """
+
+    :param state_dict:"""
+        for k, v in state_dict.items():
+            setattr(self, k, v)
+        self._permutation = None
+
+
+def recycle(
+    iterable: Iterable,
+    *,
+    seed: int = None,
+    shard_index: int = 0,
+    num_shards: int = 1,
+    sampler: PermutationSampler = None,
+) -> Any:
     """
   loops an iterable like itertools.cycle, but in a random order (Permutation) everytime the iterable is
   exhausted
 
   :param iterable:
+  :param seed:
+  :param shard_index:
+  :param num_shards:
+  :param sampler: overrides seed and sharding, pass one to resume from its state_dict
   :return:"""
-    if not isinstance(iterable, Sequence):
+    if not isinstance(iterable, (Sequence, numpy.ndarray)):
         iterable = list(iterable)
-    while True:
-        for element in random.sample(iterable, len(iterable)):
-            yield element
+    if sampler is None:
+        sampler = PermutationSampler(
+            len(iterable), seed, shard_index=shard_index, num_shards=num_shards
+        )
+    for i in sampler:
+        yield iterable[i]
+
 
+def batched_recycle(
+    sized: Sequence,
+    batch_size: int = 32,
+    *,
+    seed: int = None,
+    shard_index: int = 0,
+    num_shards: int = 1,
+    sampler: PermutationSampler = None,
+) -> Any:
+    """
+  Batches and re-cycles an array with a different permutation every epoch, every element is visited once per epoch
+  and batches run on into the next epoch. A batch spanning two epochs may then hold an element twice, a batch_size
+  dividing the (shard) size avoids that. Pass a sampler to resume from its state_dict.
 
-def batched_recycle(sized: Sequence, batch_size: int = 32) -> Any:
-    """Batches and re-cycles an array with a different permutation"""
+  :param sized:
+  :param batch_size:
+  :param seed:
+  :param shard_index:
+  :param num_shards:
+  :param sampler: overrides seed and sharding
+  :return:"""
+    if not isinstance(sized, (Sequence, numpy.ndarray)):
+        sized = [*sized]
+    if sampler is None:
+        sampler = PermutationSampler(
+            len(sized), seed, shard_index=shard_index, num_shards=num_shards
+        )
     if isinstance(sized, numpy.ndarray):
         while True:
-            yield sized[numpy.random.choice(sized.shape[0], batch_size, replace=False)]
+            yield sized[sampler.next_indices(batch_size)]
     else:
-        if not isinstance(sized, Sequence):
-            sized = [*sized]
         while True:
-            yield random.sample(sized, batch_size)
+            yield [sized[i] for i in sampler.next_indices(batch_size)]
 
 
 if __name__ == "__main__":
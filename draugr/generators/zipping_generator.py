@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-from copy import deepcopy
-from typing import Any, Generator, Iterable, Iterator
+from itertools import chain
+from typing import Any, Generator, Iterable, Iterator, Tuple
 
 __author__ = "Christian Heider Nielsen"
 __doc__ = r"""
@@ -9,43 +9,85 @@ __doc__ = r"""
            Created on 28/10/2019
            """
 
-__all__ = ["unzip", "unzipper"]
+__all__ = ["unzip", "unzipper", "nesting_depth"]
 
 
 def unzip(iterable: Iterable) -> Iterable:
     return zip(*iterable)
 
 
-def unzipper(iterable: Iterable[Iterable]) -> Iterable:
+def _peek(iterable: Any) -> Tuple[Any, Any]:
     """
-  Unzips an iterable of an iterable
+  First element of iterable, None if not an iterable or empty, and an iterable equivalent to the original. Re-iterable
+  containers are returned as they are, one-shot iterators are returned chained behind their consumed first element.
+
+  :param iterable:
+  :return: (first element, restored iterable)"""
+    if not isinstance(iterable, Iterable):
+        return None, iterable
+    it = iter(iterable)
+    try:
+        first = next(it)
+    except StopIteration:
+        return None, iterable if it is not iterable else iter(())
+    if it is iterable:
+        return first, chain((first,), it)
+    return first, iterable
+
+
+def nesting_depth(iterable: Any, max_depth: int = 4) -> Tuple[int, Any]:
+    """
+  Number of nested iterable levels along the first elements, at most max_depth, found with a one element lookahead
+  per level instead of copying.
+
+  :param iterable:
+  :param max_depth:
+  :return: (depth, restored iterable), iterate the restored iterable as one-shot iterators are consumed by peeking"""
+    if max_depth <= 0 or not isinstance(iterable, Iterable):
+        return 0, iterable
+    first, restored = _peek(iterable)
+    if first is None:
+        return 1, restored
+    depth, first_restored = nesting_depth(first, max_depth - 1)
+    if first_restored is not first:  # The first element was itself consumed by peeking
+        restored = chain((first_restored,), _skip_first(restored))
+    return depth + 1, restored
+
+
+def _skip_first(iterable: Iterable) -> Iterator:
+    it = iter(iterable)
+    next(it)
+    return it
+
+
+def unzipper(iterable: Iterable[Iterable], depth: int = None) -> Iterable:
+    """
+  Unzips an iterable of an iterable, lazily and without copying.
+
+  Iterables nested three levels, e.g. batches of (x, y) samples, yield the unzipped columns of each batch. Deeper
+  nesting is unzipped recursively and shallower iterables are passed through. The depth is found by peeking at the
+  first element of each level unless given as the explicit schema depth.
 
   Be carefully has undefined and expected behaviour
 
   :param iterable:
+  :param depth: nesting depth of iterable if known, skips peeking
   :return:"""
-
-    def check_next_iter(iterable: Any) -> Any:
-        if isinstance(iterable, Iterable):
-            try:
-                a = next(iter(iterable))
-                if isinstance(a, Iterable):
-                    return a
-            except StopIteration:
-                pass
-
-    if isinstance(iterable, Iterable):
-        check_a = check_next_iter(check_next_iter(deepcopy(iterable)))
-        if check_next_iter(check_a):
-            for a in iterable:
-                yield unzipper(a)
-        elif check_a:
-            for a in iterable:
-                yield unzip(a)
-        else:
-            for i in iterable:
-                yield i
-    return
+    if not isinstance(iterable, Iterable):
+        return
+    inner_depth = None  # Peek again at each element, the peeked depth is capped at 4
+    if depth is None:
+        depth, iterable = nesting_depth(iterable, 4)
+    else:
+        inner_depth = depth - 1
+    if depth >= 4:
+        for a in iterable:
+            yield unzipper(a, inner_depth)
+    elif depth == 3:
+        for a in iterable:
+            yield unzip(a)
+    else:
+        yield from iterable
 
 
 if __name__ == "__main__":
@@ -82,6 +124,8 @@ if __name__ == "__main__":
 
     def skad23():
         print(0)
+        from copy import deepcopy
+
         zippy_once = zip(range(6), range(3))
         dsadsa = list(deepcopy(zippy_once))
         zippy_twice = zip(dsadsa, dsadsa)
@@ -119,6 +163,8 @@ if __name__ == "__main__":
 
     def skad():
         print(0)
+        from copy import deepcopy
+
         zippy_once = zip(zip(range(6), range(3)))
         zippy_once_copy = deepcopy(zippy_once)
         dsadsa = list(deepcopy(zippy_once))
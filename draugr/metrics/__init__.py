@@ -11,7 +11,11 @@ with open(pathlib.Path(__file__).parent / "README.md", "r") as this_init_file:
     __doc__ += this_init_file.read()
 
 from .accumulation import *
+from .buffers import *
+from .merging import *
 from .meters import *
 from .metric_aggregator import *
 from .metric_collection import *
+from .metric_snapshot import *
 from .metric_summary import *
+from .streaming_statistics import *
@@ -0,0 +1,577 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+           Compact numeric storage for metric values
+
+           Created on 18/10/2026
+           """
+
+import os
+import shutil
+import struct
+import uuid
+import weakref
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Sequence, Union
+
+import numpy
+
+__all__ = ["GrowableBuffer", "RingBuffer", "SpillBuffer", "value_buffer"]
+
+NPY_HEADER_SIZE = 128  # Fixed so the shape can be rewritten in place as the file grows
+
+
+class GrowableBuffer:
+    """
+  Contiguous append-only numpy buffer with amortised doubling, behaves like a list of floats for indexing,
+  iteration and len. view is a zero-copy numpy view of the filled part."""
+
+    __slots__ = ("_data", "_size")
+
+    def __init__(
+        self,
+        values: Iterable = None,
+        *,
+        capacity: int = 64,
+        dtype: numpy.dtype = numpy.float64,
+    ):
+        self._data = numpy.empty(max(capacity, 1), dtype=dtype)
+        self._size = 0
+        if values is not None:
+            self.extend(values)
+
+    def _reserve(self, size: int) -> None:
+        if size > self._data.shape[0]:
+            capacity = self._data.shape[0]
+            while capacity < size:
+                capacity *= 2
+            data = numpy.empty(capacity, dtype=self._data.dtype)
+            data[: self._size] = self._data[: self._size]
+            self._data = data
+
+    def append(self, value: float) -> None:
+        """
+
+    :param value:
+    :type value:"""
+        if self._size == self._data.shape[0]:
+            self._reserve(self._size + 1)
+        self._data[self._size] = value
+        self._size += 1
+
+    def extend(self, values: Union[Iterable, numpy.ndarray]) -> None:
+        """
+
+    :param values:
+    :type values:"""
+        values = numpy.asarray(
+            values if isinstance(values, numpy.ndarray) else list(values),
+            dtype=self._data.dtype,
+        ).reshape(-1)
+        self._reserve(self._size + values.shape[0])
+        self._data[self._size : self._size + values.shape[0]] = values
+        self._size += values.shape[0]
+
+    def clear(self) -> None:
+        """"""
+        self._size = 0
+
+    @property
+    def view(self) -> numpy.ndarray:
+        """
+    Zero-copy view of the filled part, invalidated by growth
+
+    :return:
+    :rtype:"""
+        return self._data[: self._size]
+
+    @property
+    def capacity(self) -> int:
+        """"""
+        return self._data.shape[0]
+
+    def mean(self, window_size: int) -> Optional[float]:
+        """
+    Mean of the last window_size values, or of all if fewer
+
+    :param window_size:
+    :return:"""
+        if not self._size:
+            return None
+        return float(self.view[-window_size:].mean())
+
+    def variance(self, window_size: int, ddof: int = 1) -> Optional[float]:
+        """
+    Variance of the last window_size values, or of all if fewer
+
+    :param window_size:
+    :param ddof: 1 for sample variance, 0 for population variance
+    :return:"""
+        window = self.view[-window_size:]
+        if window.shape[0] - ddof <= 0:
+            return None
+        return float(window.var(ddof=ddof))
+
+    def __array__(self, dtype=None, copy=None):
+        if dtype is not None:
+            return self.view.astype(dtype)
+        return self.view
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, item):
+        return self.view[item]
+
+    def __setitem__(self, key, value):
+        self.view[key] = value
+
+    def __iter__(self) -> Iterator:
+        return iter(self.view.tolist())
+
+    def __contains__(self, item) -> bool:
+        return bool((self.view == item).any())
+
+    def __bool__(self) -> bool:
+        return self._size > 0
+
+    def __repr__(self) -> str:
+        return str(self.view.tolist())
+
+
+class RingBuffer:
+    """
+  Fixed capacity buffer keeping the latest capacity values, memory stays flat however many values are appended.
+
+  Running sums and sums of squares are maintained for each of window_sizes so the moving mean and variance of those
+  windows are O(1) per query. The sums are recomputed exactly every time the buffer wraps to bound drift, which is
+  amortised O(1) per append. Indexing, iteration and len are in chronological order over the retained values."""
+
+    __slots__ = ("_data", "_head", "_count", "_windows")
+
+    def __init__(
+        self,
+        capacity: int,
+        window_sizes: Sequence[int] = (),
+        *,
+        dtype: numpy.dtype = numpy.float64,
+    ):
+        assert capacity > 0
+        assert all(
+            0 < w <= capacity for w in window_sizes
+        ), f"window sizes {window_sizes} must be within capacity {capacity}"
+        self._data = numpy.zeros(capacity, dtype=dtype)
+        self._head = 0  # Next write position
+        self._count = 0  # Total number of values ever appended
+        self._windows = {w: [0.0, 0.0] for w in window_sizes}
+
+    def append(self, value: float) -> None:
+        """
+
+    :param value:
+    :type value:"""
+        capacity = self._data.shape[0]
+        count = self._count
+        for w, sums in self._windows.items():
+            if count >= w:
+                leaving = self._data[(self._head - w) % capacity]
+                sums[0] -= leaving
+                sums[1] -= leaving * leaving
+            sums[0] += value
+            sums[1] += value * value
+        self._data[self._head] = value
+        self._head = (self._head + 1) % capacity
+        self._count = count + 1
+        if self._head == 0:
+            self._resum()
+
+    def extend(self, values: Union[Iterable, numpy.ndarray]) -> None:
+        """
+
+    :param values:
+    :type values:"""
+        values = numpy.asarray(
+            values if isinstance(values, numpy.ndarray) else list(values),
+            dtype=self._data.dtype,
+        ).reshape(-1)
+        n = values.shape[0]
+        if n < 2:
+            for v in values:
+                self.append(float(v))
+            return
+        capacity = self._data.shape[0]
+        if n >= capacity:
+            self._data[:] = values[-capacity:]
+            self._head = 0
+        else:
+            self._data[(self._head + numpy.arange(n)) % capacity] = values
+            self._head = (self._head + n) % capacity
+        self._count += n
+        self._resum()
+
+    def _resum(self) -> None:
+        view = self.view
+        for w, sums in self._windows.items():
+            window = view[-w:]
+            sums[0] = float(window.sum())
+            sums[1] = float(numpy.dot(window, window))
+
+    def clear(self) -> None:
+        """"""
+        self._head = 0
+        self._count = 0
+        for sums in self._windows.values():
+            sums[0], sums[1] = 0.0, 0.0
+
+    @property
+    def capacity(self) -> int:
+        """"""
+        return self._data.shape[0]
+
+    @property
+    def count(self) -> int:
+        """Total number of values appended, including those no longer retained"""
+        return self._count
+
+    @property
+    def window_sizes(self) -> Sequence[int]:
+        """"""
+        return tuple(self._windows.keys())
+
+    @property
+    def view(self) -> numpy.ndarray:
+        """
+    Chronologically ordered retained values, zero-copy until the buffer has wrapped
+
+    :return:
+    :rtype:"""
+        if self._count <= self._data.shape[0]:
+            return self._data[: self._count]
+        return numpy.concatenate((self._data[self._head :], self._data[: self._head]))
+
+    def _window_sums(self, window_size: int):
+        if window_size in self._windows:
+            s, sq = self._windows[window_size]
+        else:  # Not a maintained window, O(window_size)
+            window = self.view[-window_size:]
+            s, sq = float(window.sum()), float(numpy.dot(window, window))
+        return s, sq, min(window_size, len(self))
+
+    def mean(self, window_size: int) -> Optional[float]:
+        """
+    Mean of the last window_size values, or of all retained if fewer
+
+    :param window_size:
+    :return:"""
+        s, _, n = self._window_sums(window_size)
+        if n == 0:
+            return None
+        return s / n
+
+    def variance(self, window_size: int, ddof: int = 1) -> Optional[float]:
+        """
+    Variance of the last window_size values, or of all retained if fewer
+
+    :param window_size:
+    :param ddof: 1 for sample variance, 0 for population variance
+    :return:"""
+        s, sq, n = self._window_sums(window_size)
+        if n - ddof <= 0:
+            return None
+        return max(sq - s * s / n, 0.0) / (n - ddof)
+
+    def __array__(self, dtype=None, copy=None):
+        if dtype is not None:
+            return self.view.astype(dtype)
+        return self.view
+
+    def __len__(self) -> int:
+        return min(self._count, self._data.shape[0])
+
+    def __getitem__(self, item):
+        if isinstance(item, int):
+            n = len(self)
+            if not -n <= item < n:
+                raise IndexError(f"index {item} out of range for {n} retained values")
+            return self._data[(self._head - n + item % n) % self._data.shape[0]]
+        return self.view[item]
+
+    def __iter__(self) -> Iterator:
+        return iter(self.view.tolist())
+
+    def __contains__(self, item) -> bool:
+        return bool((self.view == item).any())
+
+    def __bool__(self) -> bool:
+        return self._count > 0
+
+    def __repr__(self) -> str:
+        return str(self.view.tolist())
+
+
+def _npy_header(length: int, dtype: numpy.dtype) -> bytes:
+    header = (
+        f"{{'descr': {numpy.dtype(dtype).str!r}, 'fortran_order': False, "
+        f"'shape': ({length},), }}"
+    )
+    header = header.ljust(NPY_HEADER_SIZE - 10 - 1) + "\n"
+    return (
+        b"\x93NUMPY\x01\x00"
+        + struct.pack("<H", NPY_HEADER_SIZE - 10)
+        + header.encode("latin1")
+    )
+
+
+def _remove_cache_file(state: dict) -> None:
+    state["file"].close()
+    Path(state["path"]).unlink()
+
+
+class SpillBuffer:
+    """
+  Unbounded buffer keeping only the latest memory_tail values in memory, older values are spilled to an append-only
+  .npy file which is memory-mapped for historical indexing. Indexing, iteration and len behave as for GrowableBuffer,
+  view materialises all values.
+
+  The file is removed when the buffer is garbage collected, save_to writes independent copies of it."""
+
+    __slots__ = (
+        "_tail",
+        "_memory_tail",
+        "_spilled",
+        "_memmap",
+        "_state",
+        "__weakref__",
+    )
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        memory_tail: int = 2 ** 16,
+        dtype: numpy.dtype = numpy.float64,
+    ):
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{uuid.uuid4().hex}.npy"
+        f = open(str(path), "w+b")
+        f.write(_npy_header(0, dtype))
+        f.flush()
+        self._state = {"path": path, "file": f}
+        weakref.finalize(self, _remove_cache_file, self._state)
+
+        self._tail = GrowableBuffer(capacity=memory_tail * 2, dtype=dtype)
+        self._memory_tail = memory_tail
+        self._spilled = 0
+        self._memmap = None
+
+    @property
+    def path(self) -> Path:
+        """"""
+        return self._state["path"]
+
+    @property
+    def spilled(self) -> int:
+        """Number of values residing on disk"""
+        return self._spilled
+
+    def _spill(self, keep: int) -> None:
+        """
+    Appends all but the latest keep in-memory values to the file
+
+    :param keep:
+    :return:"""
+        tail = self._tail.view
+        out = tail[: tail.shape[0] - keep]
+        if not out.shape[0]:
+            return
+        f = self._state["file"]
+        f.seek(0, os.SEEK_END)
+        f.write(out.tobytes())
+        self._spilled += out.shape[0]
+        f.seek(0)
+        f.write(_npy_header(self._spilled, tail.dtype))
+        f.flush()
+        self._tail = GrowableBuffer(
+            tail[tail.shape[0] - keep :],
+            capacity=self._memory_tail * 2,
+            dtype=tail.dtype,
+        )
+        self._memmap = None
+
+    @property
+    def _disk(self) -> numpy.ndarray:
+        if self._memmap is None:
+            if not self._spilled:
+                return self._tail.view[:0]
+            self._memmap = numpy.memmap(
+                str(self.path),
+                dtype=self._tail.view.dtype,
+                mode="r",
+                offset=NPY_HEADER_SIZE,
+                shape=(self._spilled,),
+            )
+        return self._memmap
+
+    def append(self, value: float) -> None:
+        """
+
+    :param value:
+    :type value:"""
+        self._tail.append(value)
+        if len(self._tail) >= 2 * self._memory_tail:
+            self._spill(self._memory_tail)
+
+    def extend(self, values: Union[Iterable, numpy.ndarray]) -> None:
+        """
+
+    :param values:
+    :type values:"""
+        self._tail.extend(values)
+        if len(self._tail) >= 2 * self._memory_tail:
+            self._spill(self._memory_tail)
+
+    def flush(self) -> None:
+        """Spills every value to disk, the file is then a complete .npy of all values"""
+        self._spill(0)
+
+    def save_to(self, path: Path) -> Path:
+        """
+    Flushes and copies the backing file to path, a complete .npy of the values at the time of saving. The copy is
+    independent of the buffer, later appends and saves leave it unchanged.
+
+    :param path:
+    :return:"""
+        self.flush()
+        path = Path(path)
+        self._state["file"].flush()
+        shutil.copyfile(str(self.path), str(path))
+        return path
+
+    def clear(self) -> None:
+        """"""
+        self._tail.clear()
+        self._spilled = 0
+        self._memmap = None
+        f = self._state["file"]
+        f.truncate(0)
+        f.seek(0)
+        f.write(_npy_header(0, self._tail.view.dtype))
+        f.flush()
+
+    @property
+    def view(self) -> numpy.ndarray:
+        """
+    All values, materialised from disk if any were spilled
+
+    :return:
+    :rtype:"""
+        if not self._spilled:
+            return self._tail.view
+        return numpy.concatenate((self._disk, self._tail.view))
+
+    def _window(self, window_size: int) -> numpy.ndarray:
+        if window_size <= len(self._tail) or not self._spilled:
+            return self._tail.view[-window_size:]
+        return self[-window_size:]
+
+    def mean(self, window_size: int) -> Optional[float]:
+        """
+    Mean of the last window_size values, or of all if fewer
+
+    :param window_size:
+    :return:"""
+        window = self._window(window_size)
+        if not window.shape[0]:
+            return None
+        return float(window.mean())
+
+    def variance(self, window_size: int, ddof: int = 1) -> Optional[float]:
+        """
+    Variance of the last window_size values, or of all if fewer
+
+    :param window_size:
+    :param ddof: 1 for sample variance, 0 for population variance
+    :return:"""
+        window = self._window(window_size)
+        if window.shape[0] - ddof <= 0:
+            return None
+        return float(window.var(ddof=ddof))
+
+    def __array__(self, dtype=None, copy=None):
+        if dtype is not None:
+            return self.view.astype(dtype)
+        return self.view
+
+    def __len__(self) -> int:
+        return self._spilled + len(self._tail)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            if step == 1 and start >= self._spilled:
+                return self._tail.view[start - self._spilled : stop - self._spilled]
+            if step == 1 and stop <= self._spilled:
+                return self._disk[start:stop]
+            return self.view[item]
+        if isinstance(item, (int, numpy.integer)):
+            n = len(self)
+            if not -n <= item < n:
+                raise IndexError(f"index {item} out of range for {n} values")
+            item %= n
+            if item < self._spilled:
+                return self._disk[item]
+            return self._tail.view[item - self._spilled]
+        return self.view[item]
+
+    def __iter__(self) -> Iterator:
+        disk = self._disk
+        for i in range(0, disk.shape[0], self._memory_tail):
+            yield from disk[i : i + self._memory_tail].tolist()
+        yield from self._tail
+
+    def __contains__(self, item) -> bool:
+        return bool((self._tail.view == item).any() or (self._disk == item).any())
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __repr__(self) -> str:
+        return f"<SpillBuffer> {len(self)} values, {self._spilled} at {self.path} </SpillBuffer>"
+
+
+def value_buffer(
+    capacity: int = None,
+    window_sizes: Sequence[int] = (),
+    *,
+    spill_directory: Path = None,
+    memory_tail: int = 2 ** 16,
+) -> Union[GrowableBuffer, RingBuffer, SpillBuffer]:
+    """
+  A RingBuffer maintaining the window sizes that fit if capacity is given, otherwise a SpillBuffer if
+  spill_directory is given or else an in memory GrowableBuffer
+
+  :param capacity:
+  :param window_sizes:
+  :param spill_directory:
+  :param memory_tail:
+  :return:"""
+    if capacity is not None:
+        return RingBuffer(capacity, [w for w in window_sizes if w <= capacity])
+    if spill_directory is not None:
+        return SpillBuffer(spill_directory, memory_tail=memory_tail)
+    return GrowableBuffer()
+
+
+if __name__ == "__main__":
+    b = GrowableBuffer()
+    for i in range(100):
+        b.append(i)
+    print(len(b), b.capacity, b[-1], b[:3], b.view.mean())
+
+    r = RingBuffer(10, window_sizes=(3, 10))
+    for i in range(25):
+        r.append(i)
+    print(len(r), r.count, r[0], r[-1], r.mean(3), r.variance(10), r.mean(5))
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+           Combination of metric states from parallel workers, each worker ships a fixed size summary instead of its
+           raw values and the summaries are reduced pairwise in any grouping
+
+           Created on 18/10/2026
+           """
+
+import functools
+from typing import Any, Dict, Iterable, Mapping
+
+from draugr.metrics.streaming_statistics import StreamingStatistics
+
+__all__ = ["merge_all", "reduce_summaries"]
+
+
+def merge_all(states: Iterable[Any]) -> Any:
+    """
+  Reduce mergeable states, anything with a merge(other) method returning a new state
+
+  :param states:
+  :return:"""
+    return functools.reduce(lambda a, b: a.merge(b), states)
+
+
+def reduce_summaries(
+    summaries: Iterable[Mapping[str, Mapping]]
+) -> Dict[str, StreamingStatistics]:
+    """
+  Reduce MetricCollection.summary() dicts from several workers into one StreamingStatistics per metric name, metrics
+  missing from some workers are combined over the workers that have them
+
+  :param summaries:
+  :return:"""
+    out = {}
+    for summary in summaries:
+        for name, state in summary.items():
+            s = StreamingStatistics.from_summary(state)
+            out[name] = out[name].merge(s) if name in out else s
+    return out
+
+
+if __name__ == "__main__":
+
+    def worker(seed):
+        import random
+
+        from draugr.metrics.metric_collection import MetricCollection
+
+        random.seed(seed)
+        collection = MetricCollection(metrics=("loss",), keep_measure_history=False)
+        for _ in range(1000):
+            collection.loss.append(random.gauss(seed, 1))
+        return collection.summary()
+
+    def main():
+        from multiprocessing import Pool
+
+        with Pool(4) as pool:
+            summaries = pool.map(worker, range(4))
+
+        for name, s in reduce_summaries(summaries).items():
+            print(
+                name, len(s), s.measure("mean"), s.measure("stdev"), s.measure("median")
+            )
+
+    main()
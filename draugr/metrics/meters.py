@@ -7,7 +7,15 @@ __doc__ = r"""
            Created on 28/06/2020
            """
 
-__all__ = ["Meter", "AverageMeter"]
+import math
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Optional, Sequence, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from draugr.writers import Writer
+
+__all__ = ["Meter", "AverageMeter", "RateMeter", "LatencyHistogramMeter"]
 
 
 class Meter:
@@ -33,6 +41,43 @@ class Meter:
         self.sum += val * n
         self.count += n
 
+    def summary(self) -> dict:
+        """
+    Fixed size, picklable state
+
+    :return:
+    :rtype:"""
+        return {"val": self.val, "sum": self.sum, "count": self.count}
+
+    @classmethod
+    def from_summary(cls, summary: dict) -> "Meter":
+        """
+
+    :param summary:
+    :type summary:
+    :return:
+    :rtype:"""
+        m = cls()
+        m.update(summary["val"], 0)
+        m.sum, m.count = summary["sum"], summary["count"]
+        return m
+
+    def merge(self, other: "Meter") -> "Meter":
+        """
+    Associative combination, sums and counts add up and the current value is that of the right hand side
+
+    :param other:
+    :type other:
+    :return: a new combined meter
+    :rtype:"""
+        return type(self).from_summary(
+            {
+                "val": other.val,
+                "sum": self.sum + other.sum,
+                "count": self.count + other.count,
+            }
+        )
+
 
 class AverageMeter(Meter):
     """Computes and stores the average and current value"""
@@ -50,4 +95,309 @@ class AverageMeter(Meter):
     :param n:
     :type n:"""
         super().update(val, n)
-        self.avg = self.sum / self.count
+        if self.count:
+            self.avg = self.sum / self.count
+
+    @classmethod
+    def from_summary(cls, summary: dict) -> "AverageMeter":
+        """
+
+    :param summary:
+    :type summary:
+    :return:
+    :rtype:"""
+        m = super().from_summary(summary)
+        if m.count:
+            m.avg = m.sum / m.count
+        return m
+
+
+class PublishingMeter(ABC):
+    """
+  Base of the timed meters, publishes to writer every publish_interval seconds of the monotonic clock from tick"""
+
+    def __init__(
+        self,
+        *,
+        writer: "Writer" = None,
+        tag: str,
+        publish_interval: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.writer = writer
+        self.tag = tag
+        self.publish_interval = publish_interval
+        self._clock = clock
+        self._next_publish = clock() + publish_interval
+
+    def _maybe_publish(self, now: float) -> None:
+        if self.writer is not None and now >= self._next_publish:
+            self._next_publish = now + self.publish_interval
+            self.publish()
+
+    def publish(self, writer: "Writer" = None, step_i: int = None) -> None:
+        """
+    Write the current measures as scalars
+
+    :param writer: defaults to the writer of the meter
+    :param step_i:"""
+        writer = writer or self.writer
+        for tag, value in self.measures().items():
+            if value is not None:
+                writer.scalar(tag, value, step_i)
+
+    @abstractmethod
+    def measures(self) -> dict:
+        """
+
+    :return: tag to value"""
+
+
+class RateMeter(PublishingMeter):
+    """
+  Events per second over a sliding time window, e.g. samples/sec or steps/sec.
+
+  The window is split into num_buckets fixed time buckets counted in a ring, so memory is fixed and tick is O(1)
+  amortised however high the rate. The rate is the count in the retained buckets over the time they span."""
+
+    def __init__(
+        self,
+        window: float = 10.0,
+        num_buckets: int = 10,
+        *,
+        writer: "Writer" = None,
+        tag: str = "rate",
+        publish_interval: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        assert window > 0 and num_buckets > 0
+        super().__init__(
+            writer=writer, tag=tag, publish_interval=publish_interval, clock=clock
+        )
+        self._bucket_width = window / num_buckets
+        self._num_buckets = num_buckets
+        self.reset()
+
+    def reset(self) -> None:
+        """"""
+        self._counts = [0] * self._num_buckets
+        self._window_total = 0
+        self.total = 0
+        self._bucket = 0
+        self._start = self._clock()
+
+    def _advance(self, now: float) -> int:
+        bucket = int((now - self._start) / self._bucket_width)
+        if bucket != self._bucket:
+            num_buckets = self._num_buckets
+            for b in range(max(self._bucket + 1, bucket - num_buckets + 1), bucket + 1):
+                self._window_total -= self._counts[b % num_buckets]
+                self._counts[b % num_buckets] = 0
+            self._bucket = bucket
+        return bucket
+
+    def tick(self, n: int = 1) -> None:
+        """
+    Count n events now
+
+    :param n:"""
+        now = self._clock()
+        bucket = self._advance(now)
+        self._counts[bucket % self._num_buckets] += n
+        self._window_total += n
+        self.total += n
+        self._maybe_publish(now)
+
+    @property
+    def rate(self) -> Optional[float]:
+        """Events per second over the window, None before any time has passed"""
+        now = self._clock()
+        self._advance(now)
+        elapsed = now - self._start
+        span = min(
+            elapsed,
+            (self._num_buckets - 1) * self._bucket_width
+            + (elapsed - self._bucket * self._bucket_width),
+        )
+        if span <= 0:
+            return None
+        return self._window_total / span
+
+    @property
+    def mean_rate(self) -> Optional[float]:
+        """Events per second since the start"""
+        elapsed = self._clock() - self._start
+        if elapsed <= 0:
+            return None
+        return self.total / elapsed
+
+    def measures(self) -> dict:
+        """
+
+    :return:"""
+        return {self.tag: self.rate}
+
+
+class LatencyHistogramMeter(PublishingMeter):
+    """
+  Fixed memory latency distribution in the spirit of HDR histograms, values between lowest and highest are counted
+  in logarithmic buckets of relative width precision, so quantiles like p50 and p99 are reported within that
+  relative error. Values outside the range are clamped into the first or last bucket, min, max and mean are exact.
+
+  tick() records the time since the previous tick, e.g. once per training step, record() takes any duration."""
+
+    def __init__(
+        self,
+        lowest: float = 1e-6,
+        highest: float = 1e3,
+        precision: float = 0.01,
+        *,
+        quantiles: Sequence[float] = (0.5, 0.9, 0.99),
+        writer: "Writer" = None,
+        tag: str = "latency",
+        publish_interval: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        assert 0 < lowest < highest and precision > 0
+        super().__init__(
+            writer=writer, tag=tag, publish_interval=publish_interval, clock=clock
+        )
+        self.lowest = lowest
+        self.highest = highest
+        self.precision = precision
+        self.quantiles = quantiles
+        self._log_base = math.log1p(precision)
+        self._num_buckets = int(math.log(highest / lowest) / self._log_base) + 1
+        self.reset()
+
+    def reset(self) -> None:
+        """"""
+        self._counts = [0] * self._num_buckets
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._last_tick = None
+
+    def record(self, value: float) -> None:
+        """
+
+    :param value: a duration, in seconds by convention"""
+        if value <= self.lowest:
+            i = 0
+        elif value >= self.highest:
+            i = self._num_buckets - 1
+        else:
+            i = min(
+                int(math.log(value / self.lowest) / self._log_base),
+                self._num_buckets - 1,
+            )
+        self._counts[i] += 1
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def tick(self) -> None:
+        """
+    Record the time since the previous tick, the first tick only starts the clock"""
+        now = self._clock()
+        if self._last_tick is not None:
+            self.record(now - self._last_tick)
+        self._last_tick = now
+        self._maybe_publish(now)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+    Geometric midpoint of the bucket holding the q quantile, clamped to the exact min and max
+
+    :param q:
+    :return:"""
+        assert 0 <= q <= 1
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        cumulative = 0
+        for i, c in enumerate(self._counts):
+            cumulative += c
+            if cumulative > rank:
+                break
+        value = self.lowest * math.exp((i + 0.5) * self._log_base)
+        return min(max(value, self.min), self.max)
+
+    @property
+    def mean(self) -> Optional[float]:
+        """"""
+        if not self.count:
+            return None
+        return self.sum / self.count
+
+    def summary(self) -> dict:
+        """
+    Fixed size, picklable state
+
+    :return:"""
+        return {
+            "counts": list(self._counts),
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+        }
+
+    def merge(self, other: "LatencyHistogramMeter") -> "LatencyHistogramMeter":
+        """
+    Exact associative combination of two histograms with the same range and precision
+
+    :param other:
+    :return: a new combined meter"""
+        assert (self.lowest, self.highest, self.precision) == (
+            other.lowest,
+            other.highest,
+            other.precision,
+        ), "Can not merge histograms with different buckets"
+        out = LatencyHistogramMeter(
+            self.lowest,
+            self.highest,
+            self.precision,
+            quantiles=self.quantiles,
+            writer=self.writer,
+            tag=self.tag,
+            publish_interval=self.publish_interval,
+            clock=self._clock,
+        )
+        out._counts = [a + b for a, b in zip(self._counts, other._counts)]
+        out.count = self.count + other.count
+        out.sum = self.sum + other.sum
+        out.min = min(self.min, other.min)
+        out.max = max(self.max, other.max)
+        return out
+
+    def measures(self) -> dict:
+        """
+
+    :return:"""
+        m = {f"{self.tag}_p{q * 100:g}": self.quantile(q) for q in self.quantiles}
+        m[f"{self.tag}_mean"] = self.mean
+        return m
+
+
+if __name__ == "__main__":
+
+    def main():
+        import random
+
+        from draugr.writers import MockWriter
+
+        writer = MockWriter()
+        rate = RateMeter(1.0, writer=writer, tag="steps_per_sec", publish_interval=0.1)
+        latency = LatencyHistogramMeter(writer=writer, publish_interval=0.1)
+        for _ in range(200):
+            time.sleep(random.uniform(0, 0.005))
+            rate.tick()
+            latency.tick()
+        print(rate.measures(), latency.measures())
+
+    main()
@@ -1,30 +1,124 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import math
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional, Sequence
 from warnings import warn
 
+import numpy
+
 __author__ = "Christian Heider Nielsen"
 
 import statistics
 
-__all__ = ["MetricAggregator", "save_metric"]
+from draugr.metrics.buffers import SpillBuffer, value_buffer
+from draugr.metrics.metric_snapshot import (
+    append_metric_chunk,
+    load_metric,
+    snapshot_directory,
+)
+from draugr.metrics.streaming_statistics import (
+    STREAMING_MEASURES,
+    StreamingStatistics,
+    exponential_moving_averages,
+)
+
+__all__ = [
+    "MetricAggregator",
+    "save_metric",
+    "metric_file_name",
+    "as_float_array",
+]
+
+
+def default_cache_directory() -> Path:
+    """
+  Directory for spilled metric values, the user cache of PROJECT_APP_PATH
+
+  :return:"""
+    from draugr import PROJECT_APP_PATH  # Deferred, draugr imports metrics on init
+
+    return Path(PROJECT_APP_PATH.user_cache) / "metrics"
+
+
+def metric_file_name(
+    project_name: str, config_name: str, metric_name: str, suffix: str = "csv"
+) -> str:
+    """
+
+  :param project_name:
+  :param config_name:
+  :param metric_name:
+  :param suffix:
+  :return:"""
+    import datetime
+
+    _file_date = datetime.datetime.now()
+    return (
+        f'{project_name}-{config_name.replace(".", "_")}-'
+        f'{_file_date.strftime("%y%m%d%H%M")}.{metric_name}.{suffix}'
+    )
+
+
+def as_float_array(values) -> numpy.ndarray:
+    """
+  Flat float64 array of values, numbers, sequences, numpy arrays and torch tensors (detached and moved to host
+  without importing torch)
+
+  :param values:
+  :return:"""
+    if hasattr(values, "detach"):
+        values = values.detach().cpu().numpy()
+    return numpy.asarray(values, dtype=numpy.float64).reshape(-1)
 
 
 class MetricAggregator(object):
-    """"""
+    """
+  Measures in STREAMING_MEASURES are maintained incrementally in O(1) per append, other measures of the statistics
+  module are computed over the retained values when requested (and on every append if keeping measure history)
+
+  If capacity is given only the latest capacity values (and measure history entries) are retained in ring buffers
+  so memory stays flat, moving averages over window_sizes are then O(1)
+
+  Otherwise if use_disk_cache is set all but the latest memory_tail values (and measure history entries) are spilled
+  to memory-mapped files in cache_directory, defaulting to the user cache of PROJECT_APP_PATH, save then moves the
+  values file instead of rewriting it
+
+  Whole batches of values, lists, numpy arrays or torch tensors, are ingested with one vectorised call to extend (or
+  append), measure history then gets one entry per call. Exponential moving averages are kept for each of ema_decays
+  and updated for a batch in one vectorised step, see running_values"""
 
     def __init__(
         self,
-        measures=statistics.__all__[1:],
+        measures=STREAMING_MEASURES,
         keep_measure_history=False,
-        use_disk_cache=True,
+        use_disk_cache=False,
+        *,
+        capacity: int = None,
+        window_sizes: Sequence[int] = (100,),
+        cache_directory: Path = None,
+        memory_tail: int = 2 ** 16,
+        ema_decays: Sequence[float] = (0.9, 0.99, 0.999),
     ):
-        self._values = []
+        self._capacity = capacity
+        spill_directory = None
+        if use_disk_cache:
+            spill_directory = cache_directory or default_cache_directory()
+        self._values = value_buffer(
+            capacity,
+            window_sizes,
+            spill_directory=spill_directory,
+            memory_tail=memory_tail,
+        )
         self._length = 0
+        self._saved_length = 0
+        self._snapshot_length = 0
+        self._streaming = StreamingStatistics()
 
         self._running_value = None
         self._running_value_key = "running_value"
+        self._ema_decays = tuple(ema_decays)
+        self._running_values = None
 
         # for key in self._measure_keys:
         #  setattr(self,key,None)
@@ -34,16 +128,21 @@ class MetricAggregator(object):
         if self._keep_measure_history:
             self._measures = {}
             for key in self._stat_measure_keys:
-                self._measures[key] = []
-            self._measures[self._running_value_key] = []
+                self._measures[key] = value_buffer(  # Undefined stored as nan
+                    capacity, spill_directory=spill_directory, memory_tail=memory_tail
+                )
+            self._measures[self._running_value_key] = value_buffer(
+                capacity, spill_directory=spill_directory, memory_tail=memory_tail
+            )
 
     @property
     def values(self):
         """
+    Zero-copy numpy view of the values
 
     :return:
     :rtype:"""
-        return self._values
+        return self._values.view
 
     @property
     def max(self):
@@ -51,7 +150,7 @@ class MetricAggregator(object):
 
     :return:
     :rtype:"""
-        return max(self._values)
+        return self._streaming.max
 
     @property
     def min(self):
@@ -59,7 +158,7 @@ class MetricAggregator(object):
 
     :return:
     :rtype:"""
-        return min(self._values)
+        return self._streaming.min
 
     @property
     def measures(self):
@@ -70,15 +169,31 @@ class MetricAggregator(object):
         if self._keep_measure_history:
             return self._measures
         else:
-            out = {}
-            for key in self._stat_measure_keys:
-                try:
-                    val = getattr(statistics, key)(self._values)
-                except statistics.StatisticsError as e:
-                    # TODO: warn(f'{e}')
-                    val = None
-                out[key] = val
-            return out
+            return {key: self._measure(key) for key in self._stat_measure_keys}
+
+    def _measure(self, key):
+        """
+    Current value of measure key, streamed if supported, otherwise computed over all values. None if ill-defined.
+
+    :param key:
+    :type key:
+    :return:
+    :rtype:"""
+        if key in STREAMING_MEASURES:
+            return self._streaming.measure(key)
+        try:
+            return getattr(statistics, key)(self._values.view.tolist())
+        except (statistics.StatisticsError, TypeError, ValueError):
+            return None
+
+    def summary(self) -> dict:
+        """
+    Fixed size, picklable streaming state of all values appended so far, combine summaries from several workers
+    with draugr.metrics.merging.reduce_summaries
+
+    :return:
+    :rtype:"""
+        return self._streaming.summary()
 
     def add(self, values):
         """
@@ -89,33 +204,44 @@ class MetricAggregator(object):
 
     def append(self, values):
         """
+    Append a single value, or a batch of values through extend
 
     :param values:
     :type values:"""
+        if isinstance(values, (list, tuple)) or getattr(values, "ndim", 0):
+            self.extend(values)
+            return
+        values = float(values)
         self._values.append(values)
-        if type is list:
-            self._length += len(values)
-        else:
-            self._length += 1
+        self._length += 1
+
+        self._streaming.update(values)
+        self.calc_running_value(values)
+        self.calc_running_values(values)
+        self._record_measures()
+
+    def extend(self, values):
+        """
+    Append a batch of values, a list, numpy array or torch tensor, in one vectorised step
+
+    :param values:
+    :type values:"""
+        values = as_float_array(values)
+        if not values.shape[0]:
+            return
+        self._values.extend(values)
+        self._length += values.shape[0]
 
+        self._streaming.extend(values)
         self.calc_running_value(values)
+        self.calc_running_values(values)
+        self._record_measures()
 
+    def _record_measures(self):
         if self._keep_measure_history:
             for key in self._stat_measure_keys:
-                if self._length > 1:
-                    try:
-                        val = getattr(statistics, key)(self._values)
-                    except:
-                        val = None
-                    self._measures[key].append(val)
-                else:
-                    # warn(f'Length of statistical values are <=1, measure "{key}" maybe ill-defined')
-                    try:
-                        val = getattr(statistics, key)(self._values)
-                    except statistics.StatisticsError as e:
-                        # TODO: warn(f'{e}')
-                        val = None
-                    self._measures[key].append(val)
+                val = self._measure(key)
+                self._measures[key].append(math.nan if val is None else val)
 
     # def __setitem__(self, key, value):
     #    if self._keep_measure_history:
@@ -125,31 +251,20 @@ class MetricAggregator(object):
         return self._values[item]
 
     def __contains__(self, item):
-        return self._values[item]
+        return item in self._values
 
     def __iter__(self):
-        return self._values
+        return iter(self._values)
 
     def __getattr__(self, item):
         if item in self._stat_measure_keys:
-            if self._length > 1:
-                if self._keep_measure_history:
-                    return self._measures[item]
-                else:
-                    try:
-                        return getattr(statistics, item)(self._values)
-                    except statistics.StatisticsError as e:
-                        warn(f"{e}")
-                        return None
-            else:
+            if self._keep_measure_history:
+                return self._measures[item]
+            if self._length <= 1:
                 warn(
                     f'Length of statistical values are <=1, measure "{item}" maybe ill-defined'
                 )
-                try:
-                    return getattr(statistics, item)(self._values)
-                except statistics.StatisticsError as e:
-                    warn(f"{e}")
-                    return None
+            return self._measure(item)
         elif item == self._running_value_key:
             return self._measures[item]
         else:
@@ -174,12 +289,19 @@ class MetricAggregator(object):
     :type window_size:
     :return:
     :rtype:"""
-        if self._length >= window_size:
-            return statistics.mean(self._values[-window_size:])
-        elif self._length > 0:
-            return statistics.mean(self._values)
-        else:
-            return 0
+        if self._length > 0:
+            return self._values.mean(window_size)
+        return 0
+
+    def calc_moving_variance(self, window_size=100) -> Optional[float]:
+        """
+    Sample variance of the last window_size values, None if ill-defined
+
+    :param window_size:
+    :type window_size:
+    :return:
+    :rtype:"""
+        return self._values.variance(window_size)
 
     def calc_running_value(self, new_val=None, *, lambd=0.99):
         """
@@ -193,24 +315,75 @@ class MetricAggregator(object):
         if new_val is None:
             return self._running_value
 
-        if new_val is list:
-            for nw in new_val:
-                self.calc_running_value(nw, lambd=lambd)
-
-        if self._running_value:
-            self._running_value = self._running_value * lambd + new_val * (1 - lambd)
+        if isinstance(new_val, (int, float)):
+            if self._running_value is not None:
+                self._running_value = self._running_value * lambd + new_val * (
+                    1 - lambd
+                )
+            else:
+                self._running_value = new_val
         else:
-            self._running_value = new_val
+            new_val = as_float_array(new_val)
+            if not new_val.shape[0]:
+                return self._running_value
+            self._running_value = float(
+                exponential_moving_averages(new_val, (lambd,), self._running_value)[0]
+            )
 
         if self._keep_measure_history:
             self._measures[self._running_value_key].append(self._running_value)
 
         return self._running_value
 
+    @property
+    def running_values(self) -> Dict[float, float]:
+        """
+    Current exponential moving average per decay in ema_decays
+
+    :return:
+    :rtype:"""
+        if self._running_values is None:
+            return {}
+        return dict(zip(self._ema_decays, self._running_values.tolist()))
+
+    def calc_running_values(self, new_vals=None) -> Dict[float, float]:
+        """
+    Update the exponential moving averages of all ema_decays with a value or a batch of values at once
+
+    :param new_vals:
+    :type new_vals:
+    :return:
+    :rtype:"""
+        if new_vals is None or not self._ema_decays:
+            return self.running_values
+        if isinstance(new_vals, (int, float)):
+            if self._running_values is None:
+                self._running_values = numpy.full(
+                    len(self._ema_decays), new_vals, dtype=numpy.float64
+                )
+            else:
+                d = numpy.asarray(self._ema_decays)
+                self._running_values = self._running_values * d + new_vals * (1 - d)
+        else:
+            new_vals = as_float_array(new_vals)
+            if new_vals.shape[0]:
+                self._running_values = exponential_moving_averages(
+                    new_vals, self._ema_decays, self._running_values
+                )
+        return self.running_values
+
     def save(
-        self, *, stat_name, project_name="non", config_name="non", directory="logs"
+        self,
+        *,
+        stat_name,
+        project_name="non",
+        config_name="non",
+        directory="logs",
+        incremental: bool = False,
     ):
         """
+    If incremental only the values appended since the last save are written as a binary chunk to the snapshot
+    directory of project_name and config_name, see save_snapshot, otherwise all values are written to a new file
 
     :param stat_name:
     :type stat_name:
@@ -219,7 +392,22 @@ class MetricAggregator(object):
     :param config_name:
     :type config_name:
     :param directory:
-    :type directory:"""
+    :type directory:
+    :param incremental:
+    :type incremental:"""
+        if incremental:
+            self.save_snapshot(
+                snapshot_directory(directory, project_name, config_name), stat_name
+            )
+            return
+        if isinstance(self._values, SpillBuffer):
+            if self._values:
+                file_path = self._values.save_to(
+                    Path(directory)
+                    / metric_file_name(project_name, config_name, stat_name, "npy")
+                )
+                print(f"Saved metric at {file_path}")
+            return
         save_metric(
             self._values,
             metric_name=stat_name,
@@ -228,6 +416,49 @@ class MetricAggregator(object):
             directory=directory,
         )
 
+    def save_snapshot(self, directory: Path, stat_name: str) -> Optional[Path]:
+        """
+    Appends the values added since the last snapshot as a new chunk, see draugr.metrics.metric_snapshot. Values
+    that already left a bounded buffer are lost, a warning is raised if so. Raises ValueError if the snapshot holds
+    values this aggregator did not save or load, continue an existing snapshot through load_snapshot.
+
+    :param directory:
+    :param stat_name:
+    :return: path of the written chunk, None if nothing new"""
+        delta = self._length - self._saved_length
+        if delta <= 0:
+            return None
+        if delta > len(self._values):
+            warn(
+                f"{delta - len(self._values)} values of {stat_name} left the buffer before being snapshot"
+            )
+            delta = len(self._values)
+        path = append_metric_chunk(
+            self._values[-delta:],
+            directory,
+            stat_name,
+            expected_length=self._snapshot_length,
+        )
+        self._saved_length = self._length
+        self._snapshot_length += delta
+        return path
+
+    @classmethod
+    def load_snapshot(
+        cls, directory: Path, stat_name: str, **kwargs
+    ) -> "MetricAggregator":
+        """
+    New aggregator holding all snapshot values of stat_name, further incremental saves continue the snapshot
+
+    :param directory:
+    :param stat_name:
+    :param kwargs: passed on to the constructor
+    :return:"""
+        aggregator = cls(**kwargs)
+        aggregator.extend(load_metric(directory, stat_name))
+        aggregator._saved_length = aggregator._snapshot_length = aggregator._length
+        return aggregator
+
 
 def save_metric(
     metric: List[MetricAggregator],
@@ -252,15 +483,11 @@ def save_metric(
   :return:
   :rtype:"""
     import csv
-    import datetime
 
     if metric:
-        _file_date = datetime.datetime.now()
-        _file_name = (
-            f'{project_name}-{config_name.replace(".", "_")}-'
-            f'{_file_date.strftime("%y%m%d%H%M")}.{metric_name}.csv'
+        _file_path = Path(directory) / metric_file_name(
+            project_name, config_name, metric_name
         )
-        _file_path = directory / _file_name
 
         stat = [[s] for s in metric]
         with open(_file_path, "w") as f:
@@ -3,45 +3,61 @@
 
 __author__ = "Christian Heider Nielsen"
 
-import statistics
+from pathlib import Path
+from typing import Sequence
 
 from draugr.metrics.metric_aggregator import MetricAggregator
+from draugr.metrics.metric_snapshot import snapshot_metric_names
+from draugr.metrics.streaming_statistics import STREAMING_MEASURES
 
-MEASURES = statistics.__all__[1:]
+MEASURES = STREAMING_MEASURES
 
 __all__ = ["MetricCollection"]
 
 
 class MetricCollection(dict):
-    """"""
+    """
+  use_disk_cache, capacity, window_sizes and aggregator_kws are passed on to every MetricAggregator, see there for
+  bounded and disk cached modes"""
 
     def __init__(
         self,
         metrics=("signal", "length"),
         measures=MEASURES,
         keep_measure_history=True,
-        use_disk_cache=True,
+        use_disk_cache=False,
+        *,
+        capacity: int = None,
+        window_sizes: Sequence[int] = (100,),
+        **aggregator_kws,
     ):
         super().__init__()
         self._metrics = {}
         self._measures = measures
         self._keep_measure_history = keep_measure_history
         self._use_disk_cache = use_disk_cache
+        self._capacity = capacity
+        self._window_sizes = window_sizes
+        self._aggregator_kws = aggregator_kws
 
         for metric in metrics:
-            self._metrics[metric] = MetricAggregator(
-                measures=self._measures,
-                keep_measure_history=self._keep_measure_history,
-                use_disk_cache=self._use_disk_cache,
-            )
+            self.add_metric(metric)
 
     def add_metric(self, name):
         """
 
     :param name:
     :type name:"""
-        self._metrics[name] = MetricAggregator(
-            measures=self._measures, keep_measure_history=self._keep_measure_history
+        self._metrics[name] = MetricAggregator(**self._aggregator_config())
+
+    def _aggregator_config(self) -> dict:
+        return dict(
+            measures=self._measures,
+            keep_measure_history=self._keep_measure_history,
+            use_disk_cache=self._use_disk_cache,
+            capacity=self._capacity,
+            window_sizes=self._window_sizes,
+            **self._aggregator_kws,
         )
 
     def append(self, *args, **kwargs):
@@ -54,9 +70,23 @@ class MetricCollection(dict):
         for (arg, (k, v)) in zip(args, self._metrics.items()):
             self._metrics[k].append(arg)
 
-        for (k, v) in kwargs:
+        for (k, v) in kwargs.items():
             self._metrics[k].append(v)
 
+    def extend(self, *args, **kwargs):
+        """
+    Append a batch of values, lists, numpy arrays or torch tensors, per metric in one call each
+
+    :param args:
+    :type args:
+    :param kwargs:
+    :type kwargs:"""
+        for (arg, k) in zip(args, self._metrics.keys()):
+            self._metrics[k].extend(arg)
+
+        for (k, v) in kwargs.items():
+            self._metrics[k].extend(v)
+
     def remove_metric(self, name):
         """
 
@@ -121,14 +151,40 @@ class MetricCollection(dict):
     :rtype:"""
         return self.metrics.items()
 
+    def summary(self) -> dict:
+        """
+    Fixed size, picklable streaming state per metric
+
+    :return:
+    :rtype:"""
+        return {key: value.summary() for key, value in self._metrics.items()}
+
     def save(self, **kwargs):
         """
+    Saves every metric, with incremental=True only the values appended since the last save are written, see
+    MetricAggregator.save
 
     :param kwargs:
     :type kwargs:"""
         for key, value in self._metrics.items():
             value.save(stat_name=key, **kwargs)
 
+    @classmethod
+    def load_snapshot(cls, directory: Path, **kwargs) -> "MetricCollection":
+        """
+    New collection of every metric in the snapshot directory, e.g. snapshot_directory(directory, project_name,
+    config_name) of an incremental save
+
+    :param directory:
+    :param kwargs: passed on to the constructor
+    :return:"""
+        collection = cls(metrics=(), **kwargs)
+        for name in snapshot_metric_names(directory):
+            collection._metrics[name] = MetricAggregator.load_snapshot(
+                directory, name, **collection._aggregator_config()
+            )
+        return collection
+
 
 if __name__ == "__main__":
     stats = MetricCollection(keep_measure_history=False)
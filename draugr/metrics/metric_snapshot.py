@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+           Append-only binary metric snapshots, every save writes only the values appended since the previous save
+           as a new .npy chunk and atomically replaces a small json index of the chunks. Loading memory-maps the
+           chunks.
+
+           Layout of a snapshot directory, per metric:
+             {metric_name}.index.json
+             {metric_name}.000000.npy
+             {metric_name}.000001.npy
+             ...
+
+           Created on 18/10/2026
+           """
+
+import json
+import os
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import numpy
+
+__all__ = [
+    "snapshot_directory",
+    "snapshot_metric_names",
+    "read_metric_index",
+    "append_metric_chunk",
+    "load_metric_chunks",
+    "load_metric",
+]
+
+INDEX_SUFFIX = ".index.json"
+
+
+def snapshot_directory(directory: Path, project_name: str, config_name: str) -> Path:
+    """
+  Stable, untimestamped, directory of the snapshots of a project configuration, so successive saves append
+
+  :param directory:
+  :param project_name:
+  :param config_name:
+  :return:"""
+    return Path(directory) / f'{project_name}-{config_name.replace(".", "_")}'
+
+
+def _index_path(directory: Path, metric_name: str) -> Path:
+    return Path(directory) / f"{metric_name}{INDEX_SUFFIX}"
+
+
+def snapshot_metric_names(directory: Path) -> List[str]:
+    """
+
+  :param directory:
+  :return: names of the metrics with an index in directory"""
+    return sorted(
+        p.name[: -len(INDEX_SUFFIX)] for p in Path(directory).glob(f"*{INDEX_SUFFIX}")
+    )
+
+
+def read_metric_index(directory: Path, metric_name: str) -> dict:
+    """
+
+  :param directory:
+  :param metric_name:
+  :return: {"length": total number of values, "chunks": [{"file", "start", "length"}, ...]}"""
+    path = _index_path(directory, metric_name)
+    if not path.exists():
+        return {"length": 0, "chunks": []}
+    with open(str(path)) as f:
+        return json.load(f)
+
+
+def append_metric_chunk(
+    values: Sequence[float],
+    directory: Path,
+    metric_name: str,
+    *,
+    expected_length: int = None,
+) -> Optional[Path]:
+    """
+  Writes values as the next chunk of metric_name, the index is replaced atomically after the chunk is written so an
+  interrupted save leaves the previous snapshot intact
+
+  :param values:
+  :param directory:
+  :param metric_name:
+  :param expected_length: number of values the snapshot must already hold, guards against appending to the
+  snapshot of another run
+  :return: path of the written chunk, None if values is empty"""
+    values = numpy.asarray(values).reshape(-1)
+    if not values.shape[0]:
+        return None
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    index = read_metric_index(directory, metric_name)
+    if expected_length is not None and index["length"] != expected_length:
+        raise ValueError(
+            f"Snapshot of {metric_name} in {directory} holds {index['length']} values, expected {expected_length}"
+        )
+    file_name = f"{metric_name}.{len(index['chunks']):06d}.npy"
+    numpy.save(str(directory / file_name), values)
+    index["chunks"].append(
+        {"file": file_name, "start": index["length"], "length": values.shape[0]}
+    )
+    index["length"] += values.shape[0]
+    index_path = _index_path(directory, metric_name)
+    tmp_path = index_path.with_name(index_path.name + ".tmp")
+    with open(str(tmp_path), "w") as f:
+        json.dump(index, f)
+    os.replace(str(tmp_path), str(index_path))
+    return directory / file_name
+
+
+def load_metric_chunks(directory: Path, metric_name: str) -> List[numpy.ndarray]:
+    """
+  Memory-maps the chunks listed in the index, nothing is read until accessed
+
+  :param directory:
+  :param metric_name:
+  :return:"""
+    directory = Path(directory)
+    return [
+        numpy.load(str(directory / chunk["file"]), mmap_mode="r")
+        for chunk in read_metric_index(directory, metric_name)["chunks"]
+    ]
+
+
+def load_metric(directory: Path, metric_name: str) -> numpy.ndarray:
+    """
+  All values of metric_name as one array, a single copy out of the memory-mapped chunks
+
+  :param directory:
+  :param metric_name:
+  :return:"""
+    chunks = load_metric_chunks(directory, metric_name)
+    if not chunks:
+        return numpy.empty(0)
+    return numpy.concatenate(chunks)
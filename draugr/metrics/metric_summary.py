@@ -3,18 +3,21 @@
 
 __author__ = "Christian Heider Nielsen"
 
-import statistics
-
 import numpy
 
+from typing import Optional, Sequence
+
+from draugr.metrics.buffers import value_buffer
+
 __all__ = ["MetricSummary"]
 
 
 class MetricSummary:
-    """"""
+    """
+  If capacity is given only the latest capacity values are retained, moving averages over window_sizes are then O(1)"""
 
-    def __init__(self):
-        self._values = []
+    def __init__(self, *, capacity: int = None, window_sizes: Sequence[int] = (100,)):
+        self._values = value_buffer(capacity, window_sizes)
         self.length = 0
         self.running_mean = 0
         self.running_variance = 0
@@ -30,10 +33,11 @@ class MetricSummary:
     @property
     def values(self):
         """
+    Zero-copy numpy view of the values
 
     :return:
     :rtype:"""
-        return self._values
+        return self._values.view
 
     def moving_average(self, window_size=100):
         """
@@ -42,12 +46,19 @@ class MetricSummary:
     :type window_size:
     :return:
     :rtype:"""
-        if self.length >= window_size:
-            return statistics.mean(self._values[-window_size:])
-        elif self.length > 0:
-            return statistics.mean(self._values)
-        else:
-            return 0
+        if self.length > 0:
+            return self._values.mean(window_size)
+        return 0
+
+    def moving_variance(self, window_size=100) -> Optional[float]:
+        """
+    Sample variance of the last window_size values, None if ill-defined
+
+    :param window_size:
+    :type window_size:
+    :return:
+    :rtype:"""
+        return self._values.variance(window_size)
 
     def running_average(self, data):
         """
@@ -0,0 +1,561 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+           O(1) per update statistics, Welford moments and P² quantile estimation
+
+           Created on 18/10/2026
+           """
+
+import math
+import statistics
+from bisect import bisect_right
+from typing import Mapping, Optional, Sequence
+
+import numpy
+from scipy.signal import lfilter
+
+__all__ = [
+    "RunningMoments",
+    "P2Quantile",
+    "StreamingStatistics",
+    "STREAMING_MEASURES",
+    "exponential_moving_averages",
+]
+
+STREAMING_MEASURES = (
+    "mean",
+    "fmean",
+    "geometric_mean",
+    "harmonic_mean",
+    "median",
+    "median_low",
+    "median_high",
+    "pstdev",
+    "pvariance",
+    "stdev",
+    "variance",
+)
+
+
+def exponential_moving_averages(
+    values: Sequence[float], decays: Sequence[float], initial: Sequence[float] = None
+) -> numpy.ndarray:
+    """
+  Final values of the recurrences y_t = decay * y_(t-1) + (1 - decay) * x_t for a bank of decays over a batch of
+  values at once, each run as a linear filter in O(n) time and memory
+
+  :param values:
+  :param decays:
+  :param initial: y_(-1) per decay, defaults to the first value
+  :return: one value per decay"""
+    x = numpy.asarray(values, dtype=numpy.float64).reshape(-1)
+    d = numpy.asarray(decays, dtype=numpy.float64).reshape(-1)
+    assert ((0 <= d) & (d < 1)).all()
+    if initial is None:
+        initial = x[0]
+    initial = numpy.broadcast_to(numpy.asarray(initial, dtype=numpy.float64), d.shape)
+    out = numpy.empty_like(d)
+    for i, (decay, y) in enumerate(zip(d, initial)):
+        out[i] = lfilter([1 - decay], [1, -decay], x, zi=[decay * y])[0][-1]
+    return out
+
+
+class RunningMoments:
+    """
+  Welford running mean and variance, min, max and the sums needed for geometric and harmonic means"""
+
+    __slots__ = (
+        "count",
+        "mean",
+        "m2",
+        "min",
+        "max",
+        "log_sum",
+        "reciprocal_sum",
+        "num_negative",
+        "num_zero",
+    )
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.log_sum = 0.0
+        self.reciprocal_sum = 0.0
+        self.num_negative = 0
+        self.num_zero = 0
+
+    def update(self, x: float) -> None:
+        """
+
+    :param x:
+    :type x:"""
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+        if x > 0:
+            self.log_sum += math.log(x)
+            self.reciprocal_sum += 1 / x
+        elif x == 0:
+            self.num_zero += 1
+        else:
+            self.num_negative += 1
+
+    def extend(self, values: Sequence[float]) -> None:
+        """
+    Vectorised update with a batch of values, the batch moments are computed with numpy and combined as in merge
+
+    :param values:
+    :type values:"""
+        x = numpy.asarray(values, dtype=numpy.float64).reshape(-1)
+        if not x.shape[0]:
+            return
+        batch = RunningMoments()
+        batch.count = x.shape[0]
+        batch.mean = float(x.mean())
+        batch.m2 = float(numpy.square(x - batch.mean).sum())
+        batch.min = float(x.min())
+        batch.max = float(x.max())
+        positive = x[x > 0]
+        batch.log_sum = float(numpy.log(positive).sum())
+        batch.reciprocal_sum = float(numpy.reciprocal(positive).sum())
+        batch.num_zero = int(numpy.count_nonzero(x == 0))
+        batch.num_negative = int(numpy.count_nonzero(x < 0))
+        merged = self.merge(batch)
+        for k in self.__slots__:
+            setattr(self, k, getattr(merged, k))
+
+    @property
+    def variance(self) -> Optional[float]:
+        """Sample variance, None for less than two samples"""
+        if self.count < 2:
+            return None
+        return self.m2 / (self.count - 1)
+
+    @property
+    def pvariance(self) -> Optional[float]:
+        """Population variance, None for no samples"""
+        if self.count < 1:
+            return None
+        return self.m2 / self.count
+
+    @property
+    def stdev(self) -> Optional[float]:
+        """"""
+        v = self.variance
+        return None if v is None else math.sqrt(v)
+
+    @property
+    def pstdev(self) -> Optional[float]:
+        """"""
+        v = self.pvariance
+        return None if v is None else math.sqrt(v)
+
+    @property
+    def geometric_mean(self) -> Optional[float]:
+        """None if empty or if any sample was non-positive, like statistics.geometric_mean raising"""
+        if self.count < 1 or self.num_zero or self.num_negative:
+            return None
+        return math.exp(self.log_sum / self.count)
+
+    @property
+    def harmonic_mean(self) -> Optional[float]:
+        """None if empty or if any sample was negative, zero if any sample was zero, like statistics.harmonic_mean"""
+        if self.count < 1 or self.num_negative:
+            return None
+        if self.num_zero:
+            return 0
+        return self.count / self.reciprocal_sum
+
+    def summary(self) -> dict:
+        """
+    Fixed size, picklable state
+
+    :return:"""
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    @classmethod
+    def from_summary(cls, summary: Mapping) -> "RunningMoments":
+        """
+
+    :param summary:
+    :return:"""
+        m = cls()
+        for k in cls.__slots__:
+            setattr(m, k, summary[k])
+        return m
+
+    def merge(self, other: "RunningMoments") -> "RunningMoments":
+        """
+    Exact associative combination of two disjoint streams, Chan et al. parallel variance
+
+    :param other:
+    :return: a new combined state"""
+        out = RunningMoments()
+        out.count = self.count + other.count
+        if out.count:
+            delta = other.mean - self.mean
+            out.mean = self.mean + delta * other.count / out.count
+            out.m2 = (
+                self.m2
+                + other.m2
+                + delta * delta * self.count * other.count / out.count
+            )
+        out.min = min(self.min, other.min)
+        out.max = max(self.max, other.max)
+        out.log_sum = self.log_sum + other.log_sum
+        out.reciprocal_sum = self.reciprocal_sum + other.reciprocal_sum
+        out.num_negative = self.num_negative + other.num_negative
+        out.num_zero = self.num_zero + other.num_zero
+        return out
+
+
+class P2Quantile:
+    """
+  P² algorithm for dynamic calculation of a quantile without storing observations, Jain & Chlamtac 1985.
+
+  Exact for fewer than five observations, an approximation thereafter."""
+
+    __slots__ = ("p", "count", "_heights", "_positions", "_desired", "_increments")
+
+    def __init__(self, p: float = 0.5):
+        assert 0 < p < 1
+        self.p = p
+        self.count = 0
+        self._heights = []
+        self._positions = [0, 1, 2, 3, 4]
+        self._desired = [0, 2 * p, 4 * p, 2 + 2 * p, 4]
+        self._increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def update(self, x: float) -> None:
+        """
+
+    :param x:
+    :type x:"""
+        self.count += 1
+        q = self._heights
+        if self.count <= 5:
+            q.append(x)
+            if self.count == 5:
+                q.sort()
+            return
+
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+
+        n = self._positions
+        for i in range(k + 1, 5):
+            n[i] += 1
+        desired = self._desired
+        for i in range(5):
+            desired[i] += self._increments[i]
+
+        for i in (1, 2, 3):
+            d = desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                qp = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+                )
+                if not q[i - 1] < qp < q[i + 1]:  # Fall back to linear prediction
+                    qp = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = qp
+                n[i] += d
+
+    @property
+    def value(self) -> Optional[float]:
+        """
+
+    :return:
+    :rtype:"""
+        if self.count == 0:
+            return None
+        if self.count < 5:
+            s = sorted(self._heights)
+            h = (len(s) - 1) * self.p
+            lo = math.floor(h)
+            return s[lo] + (h - lo) * (s[min(lo + 1, len(s) - 1)] - s[lo])
+        return self._heights[2]
+
+    def summary(self) -> dict:
+        """
+    Fixed size, picklable state
+
+    :return:"""
+        return {
+            "p": self.p,
+            "count": self.count,
+            "heights": list(self._heights),
+            "positions": list(self._positions),
+            "desired": list(self._desired),
+        }
+
+    @classmethod
+    def from_summary(cls, summary: Mapping) -> "P2Quantile":
+        """
+
+    :param summary:
+    :return:"""
+        q = cls(summary["p"])
+        q.count = summary["count"]
+        q._heights = list(summary["heights"])
+        q._positions = list(summary["positions"])
+        q._desired = list(summary["desired"])
+        return q
+
+    def merge(self, other: "P2Quantile") -> "P2Quantile":
+        """
+    Combination of two estimators of the same quantile. If either has seen fewer than five observations they are
+    replayed into the other which is exact. Otherwise the extreme markers take the min and max, the inner marker
+    heights are count weighted averages and the marker positions are reset to their desired positions. This is
+    associative and commutative but approximate, best suited for streams from similar distributions.
+
+    :param other:
+    :return: a new combined estimator"""
+        assert self.p == other.p, f"Can not merge quantiles {self.p} and {other.p}"
+        small, large = (self, other) if self.count <= other.count else (other, self)
+        if small.count < 5:
+            out = P2Quantile.from_summary(large.summary())
+            for x in small._heights:
+                out.update(x)
+            return out
+
+        out = P2Quantile(self.p)
+        out.count = self.count + other.count
+        a, b = self._heights, other._heights
+        out._heights = [min(a[0], b[0])]
+        out._heights += [
+            (self.count * a[i] + other.count * b[i]) / out.count for i in (1, 2, 3)
+        ]
+        out._heights.append(max(a[4], b[4]))
+        out._reset_positions()
+        return out
+
+    def _reset_positions(self) -> None:
+        """Marker positions at their desired positions for count observations"""
+        self._desired = [(self.count - 1) * dn for dn in self._increments]
+        self._positions = [round(d) for d in self._desired]
+        for i in (1, 2, 3):  # Keep positions strictly increasing
+            self._positions[i] = min(
+                max(self._positions[i], self._positions[i - 1] + 1),
+                self._positions[4] - (4 - i),
+            )
+
+    @classmethod
+    def from_values(cls, values: Sequence[float], p: float = 0.5) -> "P2Quantile":
+        """
+    Estimator state for a batch in O(n), the markers are placed at their desired positions with the exact order
+    statistics there as heights, found by numpy.partition
+
+    :param values:
+    :param p:
+    :return:"""
+        x = numpy.asarray(values, dtype=numpy.float64).reshape(-1)
+        q = cls(p)
+        if x.shape[0] < 5:
+            for v in x.tolist():
+                q.update(v)
+            return q
+        q.count = x.shape[0]
+        q._reset_positions()
+        q._heights = numpy.partition(x, q._positions)[q._positions].tolist()
+        return q
+
+    def extend(self, values: Sequence[float]) -> None:
+        """
+    Batch update, equivalent to update per value. The P² marker adjustment is inherently sequential, merging batch
+    summaries instead biases the estimate when the distribution drifts between batches, so only an empty estimator
+    is initialised at once with from_values.
+
+    :param values:"""
+        x = numpy.asarray(values, dtype=numpy.float64).reshape(-1)
+        if self.count == 0 and x.shape[0] >= 5:
+            first = P2Quantile.from_values(x, self.p)
+            self.count = first.count
+            self._heights = first._heights
+            self._positions = first._positions
+            self._desired = first._desired
+            return
+        while self.count < 5 and x.shape[0]:
+            self.update(float(x[0]))
+            x = x[1:]
+        q, n, desired, increments = (
+            self._heights,
+            self._positions,
+            self._desired,
+            self._increments,
+        )
+        for v in x.tolist():  # update inlined
+            if v < q[0]:
+                q[0] = v
+                k = 0
+            elif v >= q[4]:
+                q[4] = v
+                k = 3
+            else:
+                k = bisect_right(q, v, 1, 4) - 1
+            for i in range(k + 1, 5):
+                n[i] += 1
+            for i in (1, 2, 3, 4):
+                desired[i] += increments[i]
+            for i in (1, 2, 3):
+                ni = n[i]
+                d = desired[i] - ni
+                if (d >= 1 and n[i + 1] - ni > 1) or (d <= -1 and n[i - 1] - ni < -1):
+                    d = 1 if d > 0 else -1
+                    qi = q[i]
+                    qp = qi + d / (n[i + 1] - n[i - 1]) * (
+                        (ni - n[i - 1] + d) * (q[i + 1] - qi) / (n[i + 1] - ni)
+                        + (n[i + 1] - ni - d) * (qi - q[i - 1]) / (ni - n[i - 1])
+                    )
+                    if not q[i - 1] < qp < q[i + 1]:  # Fall back to linear prediction
+                        qp = qi + d * (q[i + d] - qi) / (n[i + d] - ni)
+                    q[i] = qp
+                    n[i] = ni + d
+        self.count += x.shape[0]
+
+    def low_high(self, high: bool = False) -> Optional[float]:
+        """
+    median_low and median_high, exact while fewer than five observations, the estimate thereafter
+
+    :param high:
+    :return:"""
+        if self.count == 0:
+            return None
+        if self.count < 5:
+            s = self._heights
+            return statistics.median_high(s) if high else statistics.median_low(s)
+        return self._heights[2]
+
+
+class StreamingStatistics:
+    """
+  Constant time and memory per update engine for the measures in STREAMING_MEASURES, named as in the statistics
+  module. Medians are P² estimates."""
+
+    __slots__ = ("moments", "median_estimator")
+
+    def __init__(self):
+        self.moments = RunningMoments()
+        self.median_estimator = P2Quantile(0.5)
+
+    def update(self, x: float) -> None:
+        """
+
+    :param x:
+    :type x:"""
+        self.moments.update(x)
+        self.median_estimator.update(x)
+
+    def extend(self, values: Sequence[float]) -> None:
+        """
+    Batch update, vectorised for the moments, see P2Quantile.extend for the median
+
+    :param values:
+    :type values:"""
+        x = numpy.asarray(values, dtype=numpy.float64).reshape(-1)
+        self.moments.extend(x)
+        self.median_estimator.extend(x)
+
+    def __len__(self):
+        return self.moments.count
+
+    def summary(self) -> dict:
+        """
+    Fixed size, picklable state, e.g. for sending from worker processes
+
+    :return:"""
+        return {
+            "moments": self.moments.summary(),
+            "median": self.median_estimator.summary(),
+        }
+
+    @classmethod
+    def from_summary(cls, summary: Mapping) -> "StreamingStatistics":
+        """
+
+    :param summary:
+    :return:"""
+        s = cls()
+        s.moments = RunningMoments.from_summary(summary["moments"])
+        s.median_estimator = P2Quantile.from_summary(summary["median"])
+        return s
+
+    def merge(self, other: "StreamingStatistics") -> "StreamingStatistics":
+        """
+    Associative combination of two streams, exact for everything but the median estimates
+
+    :param other:
+    :return: a new combined state"""
+        s = StreamingStatistics()
+        s.moments = self.moments.merge(other.moments)
+        s.median_estimator = self.median_estimator.merge(other.median_estimator)
+        return s
+
+    @property
+    def min(self) -> Optional[float]:
+        """"""
+        return self.moments.min if self.moments.count else None
+
+    @property
+    def max(self) -> Optional[float]:
+        """"""
+        return self.moments.max if self.moments.count else None
+
+    def measure(self, key: str) -> Optional[float]:
+        """
+    Current value of measure key, None where the statistics module would raise
+
+    :param key:
+    :return:"""
+        m = self.moments
+        if key in ("mean", "fmean"):
+            return m.mean if m.count else None
+        if key == "median":
+            return self.median_estimator.value
+        if key == "median_low":
+            return self.median_estimator.low_high(high=False)
+        if key == "median_high":
+            return self.median_estimator.low_high(high=True)
+        if key in STREAMING_MEASURES:
+            return getattr(m, key)
+        raise KeyError(
+            f"{key} is not a streaming measure, supported: {STREAMING_MEASURES}"
+        )
+
+
+if __name__ == "__main__":
+
+    def main():
+        import random
+
+        s = StreamingStatistics()
+        values = [random.gauss(0, 1) for _ in range(10000)]
+        for v in values:
+            s.update(v)
+        for k in STREAMING_MEASURES:
+            try:
+                ref = getattr(statistics, k)(values)
+            except (statistics.StatisticsError, AttributeError):
+                ref = None
+            print(k, s.measure(k), ref)
+
+    main()
@@ -15,3 +15,4 @@ from .signal_mixing import *
 from .signal_projection import *
 from .padding import *
 from .subsampling import *
+from .smoothing import *
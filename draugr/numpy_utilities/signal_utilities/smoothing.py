@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18-10-2026
+           """
+
+__all__ = ["exponential_moving_average", "debiased_ema_smooth", "window_smooth"]
+
+import numpy
+from scipy.signal import lfilter
+
+
+def exponential_moving_average(
+    signal: numpy.ndarray, decay: float = 0.99, initial: float = None, axis: int = 0
+) -> numpy.ndarray:
+    """
+  Vectorised exponential moving average along axis, y_t = decay * y_(t-1) + (1 - decay) * x_t
+
+  :param signal:
+  :param decay:
+  :param initial: value of y_(-1), defaults to the first sample
+  :param axis:
+  :return:"""
+    assert 0 <= decay < 1
+    signal = numpy.asarray(signal, dtype=numpy.float64)
+    if signal.shape[axis] == 0:
+        return signal
+    if initial is None:
+        initial = numpy.take(signal, [0], axis=axis)
+    zi = numpy.asarray(initial, dtype=numpy.float64) * decay
+    out, _ = lfilter([1 - decay], [1, -decay], signal, axis=axis, zi=zi)
+    return out
+
+
+def debiased_ema_smooth(signal: numpy.ndarray, weight: float = 0.6) -> numpy.ndarray:
+    """
+  Smoothing as done by the TensorBoard smoothing slider, a zero initialised exponential moving average with
+  debiasing. Non-finite entries are skipped and kept as they are.
+
+  :param signal: 1d signal
+  :param weight: slider value in [0,1)
+  :return:"""
+    assert 0 <= weight < 1
+    signal = numpy.asarray(signal, dtype=numpy.float64)
+    out = signal.copy()
+    finite = numpy.isfinite(signal)
+    if weight == 0 or not finite.any():
+        return out
+    x = signal[finite]
+    ema = lfilter([1 - weight], [1, -weight], x)
+    out[finite] = ema / (1 - weight ** numpy.arange(1, x.shape[0] + 1))
+    return out
+
+
+def window_smooth(signal: numpy.ndarray, window: int = 10) -> numpy.ndarray:
+    """
+  Trailing moving average over the last window samples, the first window-1 entries average over what is available.
+  Non-finite entries are skipped and kept as they are.
+
+  :param signal: 1d signal
+  :param window:
+  :return:"""
+    assert window > 0
+    signal = numpy.asarray(signal, dtype=numpy.float64)
+    out = signal.copy()
+    finite = numpy.isfinite(signal)
+    x = signal[finite]
+    if not x.shape[0]:
+        return out
+    c = numpy.concatenate(([0.0], numpy.cumsum(x)))
+    idx = numpy.arange(1, x.shape[0] + 1)
+    lower = numpy.maximum(idx - window, 0)
+    out[finite] = (c[idx] - c[lower]) / (idx - lower)
+    return out
+
+
+if __name__ == "__main__":
+    s = numpy.sin(numpy.linspace(0, 10, 20)) + numpy.random.random(20)
+    print(exponential_moving_average(s, 0.9))
+    print(debiased_ema_smooth(s))
+    print(window_smooth(s, 4))
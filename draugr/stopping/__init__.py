@@ -10,4 +10,9 @@ import pathlib
 with open(pathlib.Path(__file__).parent / "README.md", "r") as this_init_file:
     __doc__ += this_init_file.read()
 
-from .stopping_key import *
+from .stopping_criteria import *
+
+try:
+    from .stopping_key import *
+except ImportError:  # pynput is unavailable or has no backend, e.g. on headless nodes
+    pass
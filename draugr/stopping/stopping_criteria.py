@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+           Headless early stopping, criteria watching metric streams in O(1) per update and a context that also stops
+           on POSIX signals and on the appearance of a sentinel file
+
+           Created on 18/10/2026
+           """
+
+import contextlib
+import math
+import signal
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, Iterable, List, Mapping, Sequence, Union
+from warnings import warn
+
+__all__ = [
+    "StoppingCriterion",
+    "PlateauCriterion",
+    "EMASlopeCriterion",
+    "DivergenceCriterion",
+    "WallClockCriterion",
+    "EarlyStop",
+]
+
+
+class StoppingCriterion(ABC):
+    """
+  Base of the stopping criteria, update is fed one metric value at a time and returns whether to stop"""
+
+    reason = ""
+
+    def reset(self) -> None:
+        """"""
+
+    @abstractmethod
+    def update(self, value: float) -> bool:
+        """
+
+    :param value:
+    :return: True if the criterion is met"""
+
+
+class PlateauCriterion(StoppingCriterion):
+    """
+  Met after patience updates without an improvement over the best value by more than min_delta"""
+
+    def __init__(self, patience: int = 10, min_delta: float = 0.0, mode: str = "min"):
+        assert patience > 0 and mode in ("min", "max")
+        self.patience = patience
+        self.min_delta = min_delta
+        self._sign = 1 if mode == "min" else -1
+        self.reset()
+
+    def reset(self) -> None:
+        """"""
+        self.best = math.inf
+        self.num_bad_updates = 0
+
+    def update(self, value: float) -> bool:
+        """
+
+    :param value:
+    :return:"""
+        v = self._sign * value
+        if v < self.best - self.min_delta:
+            self.best = v
+            self.num_bad_updates = 0
+        else:
+            self.num_bad_updates += 1
+        if self.num_bad_updates >= self.patience:
+            self.reason = f"no improvement for {self.num_bad_updates} updates, best {self._sign * self.best}"
+            return True
+        return False
+
+
+class EMASlopeCriterion(StoppingCriterion):
+    """
+  Met when the exponential moving average of the per update change of the exponential moving average of the value
+  is below threshold in magnitude, after min_updates updates"""
+
+    def __init__(
+        self, threshold: float = 1e-4, decay: float = 0.99, min_updates: int = 100
+    ):
+        assert 0 <= decay < 1
+        self.threshold = threshold
+        self.decay = decay
+        self.min_updates = min_updates
+        self.reset()
+
+    def reset(self) -> None:
+        """"""
+        self.ema = None
+        self.slope = 0.0
+        self.count = 0
+
+    def update(self, value: float) -> bool:
+        """
+
+    :param value:
+    :return:"""
+        self.count += 1
+        if self.ema is None:
+            self.ema = value
+            return False
+        previous = self.ema
+        self.ema = self.decay * self.ema + (1 - self.decay) * value
+        self.slope = self.decay * self.slope + (1 - self.decay) * (self.ema - previous)
+        if self.count >= self.min_updates and abs(self.slope) < self.threshold:
+            self.reason = f"ema slope {self.slope:g} below {self.threshold:g}"
+            return True
+        return False
+
+
+class DivergenceCriterion(StoppingCriterion):
+    """
+  Met on a nan or infinite value, or one beyond threshold in magnitude if given"""
+
+    def __init__(self, threshold: float = None):
+        self.threshold = threshold
+
+    def update(self, value: float) -> bool:
+        """
+
+    :param value:
+    :return:"""
+        if not math.isfinite(value):
+            self.reason = f"non-finite value {value}"
+            return True
+        if self.threshold is not None and abs(value) > self.threshold:
+            self.reason = f"value {value:g} beyond {self.threshold:g}"
+            return True
+        return False
+
+
+class WallClockCriterion(StoppingCriterion):
+    """
+  Met once budget seconds of the monotonic clock have passed since construction or reset, values are ignored"""
+
+    def __init__(self, budget: float, clock: Callable[[], float] = time.monotonic):
+        self.budget = budget
+        self._clock = clock
+        self.reset()
+
+    def reset(self) -> None:
+        """"""
+        self._start = self._clock()
+
+    def update(self, value: float = None) -> bool:
+        """
+
+    :param value: ignored
+    :return:"""
+        elapsed = self._clock() - self._start
+        if elapsed >= self.budget:
+            self.reason = f"wall clock budget of {self.budget:g}s spent"
+            return True
+        return False
+
+
+class EarlyStop(contextlib.AbstractContextManager):
+    """
+  Context for early stopping a loop without a keyboard or X server, the headless counterpart of CaptureEarlyStop.
+
+  Stops when any criterion of a metric is met on update, when budget seconds have passed, when one of signals is
+  received (SIGTERM and, where available, SIGUSR1 by default) or when sentinel_file exists (checked at most every
+  sentinel_interval seconds). Callbacks are called once on stopping. Signal handlers are installed on enter and
+  restored on exit, only possible from the main thread.
+
+  with EarlyStop({"loss": [PlateauCriterion(20), DivergenceCriterion()]}, budget=3600) as stop:
+    while not stop.should_stop:
+      stop.update(loss=train_step())"""
+
+    def __init__(
+        self,
+        criteria: Mapping[
+            str, Union[StoppingCriterion, Sequence[StoppingCriterion]]
+        ] = None,
+        *,
+        budget: float = None,
+        signals: Iterable[int] = None,
+        sentinel_file: Path = None,
+        sentinel_interval: float = 1.0,
+        callbacks: Union[Callable, Iterable[Callable]] = (),
+        verbose: bool = False,
+    ):
+        self.criteria = {
+            k: list(v) if isinstance(v, Sequence) else [v]
+            for k, v in (criteria or {}).items()
+        }
+        self._wall_clock = WallClockCriterion(budget) if budget is not None else None
+        if signals is None:  # SIGUSR1 does not exist on Windows
+            signals = (signal.SIGTERM, getattr(signal, "SIGUSR1", None))
+        self.signals = tuple(s for s in signals if s is not None)
+        self.sentinel_file = Path(sentinel_file) if sentinel_file else None
+        self.sentinel_interval = sentinel_interval
+        self.callbacks = [callbacks] if callable(callbacks) else list(callbacks)
+        self.verbose = verbose
+        self.reasons: List[str] = []
+        self._next_sentinel_check = 0.0
+        self._previous_handlers = {}
+
+    def stop(self, reason: str = "stopped") -> None:
+        """
+    Stop now, callbacks are called on the first stop only
+
+    :param reason:"""
+        first = not self.reasons
+        self.reasons.append(reason)
+        if self.verbose:
+            print(f"Early stopping: {reason}")
+        if first:
+            for callback in self.callbacks:
+                callback()
+
+    def update(self, **metrics: float) -> bool:
+        """
+    Feed the latest value of each metric to its criteria
+
+    :param metrics:
+    :return: should_stop"""
+        for name, value in metrics.items():
+            for criterion in self.criteria.get(name, ()):
+                if criterion.update(float(value)):
+                    self.stop(f"{name}: {criterion.reason}")
+        return self.should_stop
+
+    @property
+    def should_stop(self) -> bool:
+        """Whether any trigger fired, also checks the wall clock budget and the sentinel file"""
+        if self.reasons:
+            return True
+        if self._wall_clock is not None and self._wall_clock.update():
+            self.stop(self._wall_clock.reason)
+        elif self.sentinel_file is not None:
+            now = time.monotonic()
+            if now >= self._next_sentinel_check:
+                self._next_sentinel_check = now + self.sentinel_interval
+                if self.sentinel_file.exists():
+                    self.stop(f"sentinel file {self.sentinel_file} exists")
+        return bool(self.reasons)
+
+    def _on_signal(self, signum, frame) -> None:
+        self.stop(f"received {signal.Signals(signum).name}")
+
+    def __enter__(self) -> "EarlyStop":
+        if self._wall_clock is not None:
+            self._wall_clock.reset()
+        if self.signals:
+            if threading.current_thread() is threading.main_thread():
+                for s in self.signals:
+                    self._previous_handlers[s] = signal.signal(s, self._on_signal)
+            else:
+                warn("Signal triggers can only be installed from the main thread")
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        for s, handler in self._previous_handlers.items():
+            signal.signal(s, handler)
+        self._previous_handlers.clear()
+        return False
+
+
+if __name__ == "__main__":
+
+    def main():
+        import random
+
+        with EarlyStop(
+            {"loss": [PlateauCriterion(50), DivergenceCriterion()]},
+            budget=10,
+            verbose=True,
+        ) as stop:
+            loss = 1.0
+            while not stop.should_stop:
+                loss = max(loss * 0.99, 0.1) + random.uniform(0, 0.01)
+                stop.update(loss=loss)
+        print(stop.reasons)
+
+    main()
@@ -1,20 +1,194 @@
+import io
+import shutil
+import tempfile
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from itertools import zip_longest
 from pathlib import Path
 from pickle import dump
-from typing import Iterable, Mapping, Tuple
+from typing import (
+    Any,
+    Callable,
+    Generator,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 import numpy
 import pandas
-import tensorflow
-from PIL.Image import Image
+from PIL import Image
 from apppath import AppPath
 from matplotlib import pyplot
 from tensorboard.backend.event_processing import event_accumulator
+from tensorboard.util import tensor_util
+
+try:
+    from tensorboard.backend.event_processing.event_file_loader import (
+        LegacyEventFileLoader as EventFileLoader,
+    )  # Does not migrate legacy image, audio and histo summaries to tensors
+except ImportError:
+    from tensorboard.backend.event_processing.event_file_loader import EventFileLoader
+
+from draugr.numpy_utilities.signal_utilities.smoothing import (
+    debiased_ema_smooth,
+    window_smooth,
+)
 
 __all__ = ["TensorboardEventExporter"]
 
 from warg import passes_kws_to
 
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+
+    INOTIFY_AVAILABLE = True
+except ImportError:
+    INOTIFY_AVAILABLE = False
+
+EVENT_ACCESSORS = {
+    "scalars": "Scalars",
+    "histograms": "Histograms",
+    "distributions": "CompressedHistograms",
+    "images": "Images",
+    "audio": "Audio",
+    "tensors": "Tensors",
+}
+
+
+def _safe_tag(tag: str) -> str:
+    return tag.replace("/", "_")
+
+
+def _first_after(events: Sequence, wall_time: float) -> int:
+    """Index of the first event later than wall_time, events are in the order they were added"""
+    lo, hi = 0, len(events)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if events[mid].wall_time > wall_time:
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+def _write_bytes(file_path: Path, blob: bytes) -> None:
+    with open(str(file_path), "wb") as f:
+        f.write(blob)
+
+
+def _encoded_blobs(
+    value: Any, type_str: str
+) -> Generator[Tuple[bytes, str], None, None]:
+    """
+  Encoded payloads of a summary value, supports both legacy image/audio summaries and the tensor based summaries of
+  the images and audio plugins
+
+  :param value:
+  :param type_str:
+  :return:"""
+    if type_str == "images":
+        if value.HasField("image"):
+            yield value.image.encoded_image_string, "png"
+        elif value.metadata.plugin_data.plugin_name == "images":
+            for blob in value.tensor.string_val[2:]:  # First two are width and height
+                yield blob, "png"
+    elif type_str == "audio":
+        if value.HasField("audio"):
+            ext = value.audio.content_type.split("/")[-1] or "wav"
+            yield value.audio.encoded_audio_string, ext
+        elif value.metadata.plugin_data.plugin_name == "audio":
+            # Pairs of encoded audio and label
+            for blob in value.tensor.string_val[::2]:
+                yield blob, "wav"
+
+
+def _histogram_buckets(
+    value: Any, tensor_histogram: bool
+) -> Optional[Tuple[Tuple[float, ...], numpy.ndarray, numpy.ndarray]]:
+    """
+  Stats (min, max, num, sum, sum_squares), bucket limits and counts of a legacy histo summary value, or of a tensor
+  summary value of the histograms plugin when tensor_histogram. The tensor form only holds (left edge, right edge,
+  count) per bucket, there sum and sum_squares are estimated from the bucket centres.
+
+  :param value:
+  :param tensor_histogram:
+  :return: None if value is not a histogram"""
+    if value.HasField("histo"):
+        h = value.histo
+        return (
+            (h.min, h.max, h.num, h.sum, h.sum_squares),
+            numpy.asarray(h.bucket_limit, dtype=numpy.float64),
+            numpy.asarray(h.bucket, dtype=numpy.float64),
+        )
+    if tensor_histogram and value.HasField("tensor"):
+        left, right, counts = (
+            tensor_util.make_ndarray(value.tensor)
+            .astype(numpy.float64)
+            .reshape(-1, 3)
+            .T
+        )
+        if not counts.shape[0]:
+            return (numpy.nan, numpy.nan, 0.0, 0.0, 0.0), right, counts
+        centres = (left + right) / 2
+        return (
+            (
+                left[0],
+                right[-1],
+                counts.sum(),
+                (centres * counts).sum(),
+                (centres ** 2 * counts).sum(),
+            ),
+            right,
+            counts,
+        )
+    return None
+
+
+class _ColumnSpool:
+    """
+  Appends rows of a fixed dtype to a temporary file, so arrays of unknown length are built with flat memory and later
+  copied into an npz without being loaded"""
+
+    def __init__(self, directory: Path, dtype: Any, row_shape: Tuple[int, ...] = ()):
+        self.dtype = numpy.dtype(dtype)
+        self.row_shape = row_shape
+        self.rows = 0
+        self.file = tempfile.TemporaryFile(dir=str(directory))
+
+    def append(self, values: Any) -> None:
+        rows = numpy.asarray(values, dtype=self.dtype).reshape(-1, *self.row_shape)
+        self.file.write(rows.tobytes())
+        self.rows += rows.shape[0]
+
+    def write_npy(self, f: io.IOBase) -> None:
+        numpy.lib.format.write_array_header_1_0(
+            f,
+            {
+                "descr": numpy.lib.format.dtype_to_descr(self.dtype),
+                "fortran_order": False,
+                "shape": (self.rows, *self.row_shape),
+            },
+        )
+        self.file.seek(0)
+        shutil.copyfileobj(self.file, f)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def _write_spooled_npz(file_path: Path, columns: Mapping[str, _ColumnSpool]) -> None:
+    with zipfile.ZipFile(str(file_path), "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, column in columns.items():
+            with zf.open(f"{name}.npy", "w", force_zip64=True) as f:
+                column.write_npy(f)
+
 
 class TensorboardEventExporter:
     def __init__(
@@ -23,12 +197,14 @@ class TensorboardEventExporter:
         size_guidance: Mapping = None,
         *,
         save_to_disk: bool = False,
+        num_workers: int = 4,
     ):
         """
 
     :param path_to_events_file_s:
     :param size_guidance:
     :param save_to_disk:
+    :param num_workers: threads used for writing files when exporting
     """
         if size_guidance is None:
             size_guidance = 0
@@ -58,6 +234,7 @@ class TensorboardEventExporter:
         self.event_acc.Reload()
         self.tags_available = self.event_acc.Tags()
         self.save_to_disk = save_to_disk
+        self.num_workers = num_workers
 
         for (
             t
@@ -92,22 +269,26 @@ class TensorboardEventExporter:
 
     def export_image(
         self, *tags: Iterable[str], out_dir: Path = Path.cwd()
-    ) -> Tuple[Image]:
+    ) -> Tuple[Iterable]:
         """
+    if save_to_disk the encoded images are streamed from the event files straight to out_dir without decoding,
+    returns a list of written paths per tag, otherwise a lazy generator of decoded images per tag
 
     :param tags:
     :param out_dir:
-    :return:
-    """
+    :return:"""
         self.tag_test(*tags, type_str="images")
-        out = []
-        for t in tags:
-            img = self.event_acc.Images(t)
-            if self.save_to_disk:
-                with open(str(out_dir / f"{t}_img_{img.step}.png"), "wb") as f:
-                    f.write(img.encoded_image_string)
-            out.append(Image.fromstring(img.encoded_image_string))
-        return (*out,)
+        if self.save_to_disk:
+            return self._export_blobs(tags, "images", out_dir)
+        return (
+            *[
+                (
+                    Image.open(io.BytesIO(e.encoded_image_string))
+                    for e in self.event_acc.Images(t)
+                )
+                for t in tags
+            ],
+        )
 
     def tag_test(
         self, *tags, type_str: str  # TODO: Maybe make an Enum for supported types
@@ -166,18 +347,29 @@ class TensorboardEventExporter:
         self, *tags: Iterable[str], out_dir: Path = Path.cwd()
     ) -> Iterable:
         """
+    if save_to_disk every tensor is written as {tag}_tensor_{step}.npy to out_dir
 
     :param tags:
     :param out_dir:
-    :return:
-    """
+    :return:"""
         self.tag_test(*tags, type_str="tensors")
         out = []
-        for t in tags:
-            w_times, step_nums, vals = zip(*self.event_acc.Tensors(t))
-            if self.save_to_disk:
-                pass
-            out.append(vals)
+        with ThreadPoolExecutor(self.num_workers) as pool:
+            in_flight = deque()
+            for t in tags:
+                w_times, step_nums, vals = zip(*self.event_acc.Tensors(t))
+                if self.save_to_disk:
+                    for step, val in zip(step_nums, vals):
+                        self._bounded_submit(
+                            pool,
+                            in_flight,
+                            numpy.save,
+                            str(out_dir / f"{_safe_tag(t)}_tensor_{step}.npy"),
+                            tensor_util.make_ndarray(val),
+                        )
+                out.append(vals)
+            for f in in_flight:
+                f.result()
         return (*out,)
 
     def export_graph(
@@ -200,17 +392,18 @@ class TensorboardEventExporter:
         self, *tags: Iterable[str], out_dir: Path = Path.cwd()
     ) -> Iterable:
         """
+    if save_to_disk the encoded audio clips are streamed from the event files straight to out_dir, returns a list
+    of written paths per tag, otherwise the audio events per tag
 
     :param tags:
     :param out_dir:
-    :return:
-    """
+    :return:"""
         self.tag_test(*tags, type_str="audio")
+        if self.save_to_disk:
+            return self._export_blobs(tags, "audio", out_dir)
         out = []
         for t in tags:
             w_times, step_nums, vals = zip(*self.event_acc.Audio(t))
-            if self.save_to_disk:
-                pass
             out.append(vals)
         return (*out,)
 
@@ -221,20 +414,230 @@ class TensorboardEventExporter:
 
     https://www.tensorflow.org/api_docs/python/tf/summary/histogram
 
+    if save_to_disk the histograms are streamed from the event files into a compact {tag}_histograms.npz per tag
+    holding steps, wall_times, stats (min, max, num, sum, sum_squares) and the ragged bucket limits and counts
+    concatenated with offsets, returns the written paths. Both legacy histo summaries and the tensor summaries of the
+    TF2 histograms plugin are exported
+
     :param tags:
     :param out_dir:
-    :return:
-    """
-        self.tag_test(*tags, type_str="histograms")
+    :return:"""
+        if self.save_to_disk:
+            available = (
+                self.tags_available["histograms"] + self.tags_available["tensors"]
+            )
+            assert all(
+                t in available for t in tags
+            ), f"histograms tags available: {available}, tags requested {tags}"
+            return self._export_histograms_npz(tags, out_dir)
 
+        self.tag_test(*tags, type_str="histograms")
         out = []
         for t in tags:
             w_times, step_nums, vals = zip(*self.event_acc.Histograms(t))
-            if self.save_to_disk:
-                pass
             out.append(vals)
         return (*out,)
 
+    def _export_histograms_npz(self, tags: Sequence[str], out_dir: Path) -> Tuple[Path]:
+        """
+    Spools every histogram of the requested tags to per tag temporary column files in one pass over the event files,
+    then copies each tag's columns into its npz, memory stays flat regardless of run size
+
+    :param tags:
+    :param out_dir:
+    :return:"""
+        tensor_histogram_tags = (
+            set()
+        )  # TF2 writes the plugin metadata only once per tag
+        with tempfile.TemporaryDirectory(dir=str(out_dir)) as spool_dir:
+            spool_dir = Path(spool_dir)
+            columns = {
+                t: {
+                    "steps": _ColumnSpool(spool_dir, numpy.int64),
+                    "wall_times": _ColumnSpool(spool_dir, numpy.float64),
+                    "stats": _ColumnSpool(spool_dir, numpy.float64, (5,)),
+                    "offsets": _ColumnSpool(spool_dir, numpy.int64),
+                    "limits": _ColumnSpool(spool_dir, numpy.float64),
+                    "counts": _ColumnSpool(spool_dir, numpy.float64),
+                }
+                for t in tags
+            }
+            try:
+                for c in columns.values():
+                    c["offsets"].append(0)
+                for t, event, value in self.iterate_summary_values(*tags):
+                    if value.metadata.plugin_data.plugin_name == "histograms":
+                        tensor_histogram_tags.add(t)
+                    histogram = _histogram_buckets(value, t in tensor_histogram_tags)
+                    if histogram is None:
+                        continue
+                    stats, limits, counts = histogram
+                    c = columns[t]
+                    c["steps"].append(event.step)
+                    c["wall_times"].append(event.wall_time)
+                    c["stats"].append(stats)
+                    c["limits"].append(limits)
+                    c["counts"].append(counts)
+                    c["offsets"].append(c["limits"].rows)
+
+                out = []
+                for t, c in columns.items():
+                    file_path = out_dir / f"{_safe_tag(t)}_histograms.npz"
+                    _write_spooled_npz(file_path, c)
+                    out.append(file_path)
+                return (*out,)
+            finally:
+                for c in columns.values():
+                    for column in c.values():
+                        column.close()
+
+    def iterate_events(self) -> Generator:
+        """
+    Lazily iterates the raw events of all event files in order, without accumulating them in memory
+
+    :return:"""
+        path = Path(self.path_to_events_file)
+        files = sorted(path.glob("*tfevents*")) if path.is_dir() else [path]
+        for f in files:
+            yield from EventFileLoader(str(f)).Load()
+
+    def iterate_summary_values(self, *tags: Iterable[str]) -> Generator:
+        """
+    Lazily yields (tag, event, summary value) for every summary value of the requested tags, all if none given
+
+    :param tags:
+    :return:"""
+        for event in self.iterate_events():
+            if event.HasField("summary"):
+                for value in event.summary.value:
+                    if not tags or value.tag in tags:
+                        yield value.tag, event, value
+
+    def _export_blobs(
+        self, tags: Sequence[str], type_str: str, out_dir: Path
+    ) -> Tuple[List[Path]]:
+        """
+    Streams encoded images or audio from the event files to out_dir using a thread pool for the file io,
+    the number of pending writes is bounded so memory stays flat regardless of run size
+
+    :param tags:
+    :param type_str: images or audio
+    :param out_dir:
+    :return:"""
+        written = {t: [] for t in tags}
+        with ThreadPoolExecutor(self.num_workers) as pool:
+            in_flight = deque()
+            for t, event, value in self.iterate_summary_values(*tags):
+                for i, (blob, ext) in enumerate(_encoded_blobs(value, type_str)):
+                    file_path = out_dir / (
+                        f"{_safe_tag(t)}_{type_str}_{event.step}"
+                        f'{f"_{i}" if i else ""}.{ext}'
+                    )
+                    self._bounded_submit(pool, in_flight, _write_bytes, file_path, blob)
+                    written[t].append(file_path)
+            for f in in_flight:
+                f.result()
+        return (*written.values(),)
+
+    def _bounded_submit(
+        self, pool: ThreadPoolExecutor, in_flight: deque, fn: Callable, *args
+    ) -> None:
+        """
+
+    :param pool:
+    :param in_flight:
+    :param fn:
+    :param args:
+    :return:"""
+        if len(in_flight) >= self.num_workers * 4:
+            in_flight.popleft().result()  # Back pressure, also propagates write errors
+        in_flight.append(pool.submit(fn, *args))
+
+    def follow(
+        self,
+        *tags: Iterable[str],
+        type_str: str = "scalars",
+        callback: Callable = None,
+        poll_interval: float = 0.5,
+        max_poll_interval: float = 10.0,
+        timeout: float = None,
+    ) -> Generator[Tuple[str, Any], None, None]:
+        """
+    Tails the event file(s) and yields (tag, event) for every new record as it is flushed, e.g. (tag, ScalarEvent(
+    wall_time, step, value)) for scalars. Waits on inotify when inotify_simple is available, otherwise polls with an
+    exponential backoff from poll_interval up to max_poll_interval.
+
+    Tags not yet present in the event file are picked up once they appear, if no tags are given all available
+    tags of type_str are followed.
+
+    :param tags:
+    :param type_str: one of scalars, histograms, distributions, images, audio, tensors
+    :param callback: called with (tag, event) for every new record, if supplied
+    :param poll_interval:
+    :param max_poll_interval:
+    :param timeout: stop following after this many seconds without new records, None follows forever
+    :return:"""
+        assert (
+            type_str in EVENT_ACCESSORS
+        ), f"{type_str} not in {EVENT_ACCESSORS.keys()}"
+        if (
+            len(tags) == 1
+            and isinstance(tags[0], Iterable)
+            and not isinstance(tags[0], str)
+        ):
+            tags = tags[0]
+        accessor = getattr(self.event_acc, EVENT_ACCESSORS[type_str])
+
+        watch_path = Path(self.path_to_events_file)
+        if watch_path.is_file():
+            watch_path = watch_path.parent
+
+        notifier = None
+        if INOTIFY_AVAILABLE:
+            notifier = INotify()
+            notifier.add_watch(
+                str(watch_path),
+                inotify_flags.MODIFY | inotify_flags.CREATE | inotify_flags.MOVED_TO,
+            )
+
+        # tag -> wall_time of last yielded event, robust to reservoir sampling
+        seen = {}
+        interval = poll_interval
+        last_new = time.monotonic()
+        try:
+            while True:
+                self.event_acc.Reload()  # Incremental, only reads what was appended
+                self.tags_available = self.event_acc.Tags()
+
+                followed = tags if len(tags) else self.tags_available[type_str]
+                num_new = 0
+                for t in followed:
+                    if t not in self.tags_available[type_str]:
+                        continue
+                    events = accessor(t)
+                    for e in events[_first_after(events, seen.get(t, -1)) :]:
+                        if callback:
+                            callback(t, e)
+                        yield t, e
+                        seen[t] = e.wall_time
+                        num_new += 1
+
+                if num_new:
+                    interval = poll_interval
+                    last_new = time.monotonic()
+                else:
+                    interval = min(interval * 2, max_poll_interval)
+                    if timeout is not None and time.monotonic() - last_new > timeout:
+                        return
+
+                if notifier:
+                    notifier.read(timeout=int(interval * 1000))
+                else:
+                    time.sleep(interval)
+        finally:
+            if notifier:
+                notifier.close()
+
     @passes_kws_to(pandas.DataFrame.to_csv)
     def scalar_export_csv(
         self,
@@ -282,6 +685,117 @@ class TensorboardEventExporter:
         out.append(df)
         return (*out,)
 
+    def scalar_arrays(self, tag: str) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+    Steps and values of a scalar tag as numpy arrays, sorted by step. If a step was logged more than once the last
+    value is kept.
+
+    :param tag:
+    :return:"""
+        events = self.event_acc.Scalars(tag)
+        records = numpy.fromiter(
+            ((e.step, e.value) for e in events),
+            dtype=[("step", numpy.int64), ("value", numpy.float64)],
+            count=len(events),
+        )
+        steps, values = records["step"], records["value"]
+        order = numpy.argsort(steps, kind="stable")
+        steps, values = steps[order], values[order]
+        last = numpy.ones(steps.shape[0], dtype=bool)
+        last[:-1] = steps[1:] != steps[:-1]
+        return steps[last], values[last]
+
+    def scalar_export_aligned(
+        self,
+        *tags: Iterable[str],
+        out_dir: Path = Path.cwd(),
+        resample_steps: Union[int, Sequence[int]] = None,
+        smoothing: float = 0.0,
+        window: int = None,
+        file_format: str = "csv",
+        chunk_size: int = 100000,
+        index_label: str = "step",
+    ) -> pandas.DataFrame:
+        """
+    Step aligned scalar export, tags are outer-joined on step (missing entries are NaN) or resampled onto a common
+    step grid by linear interpolation within each tag's logged range.
+
+    smoothing applies the debiased exponential moving average of the TensorBoard smoothing slider, window a trailing
+    moving average, both are applied per tag before alignment.
+
+    :param tags:
+    :param out_dir:
+    :param resample_steps: number of evenly spaced steps or an explicit step grid, None outer-joins on step
+    :param smoothing: TensorBoard smoothing slider value in [0,1)
+    :param window: trailing moving average window
+    :param file_format: csv or npz
+    :param chunk_size: rows per written csv chunk
+    :param index_label:
+    :return:"""
+        if (
+            len(tags) == 1
+            and isinstance(tags[0], Iterable)
+            and not isinstance(tags[0], str)
+        ):
+            tags = tags[0]
+        if file_format not in ("csv", "npz"):
+            raise ValueError(f"{file_format} is not supported, use csv or npz")
+        self.tag_test(*tags, type_str="scalars")
+
+        series = []
+        for t in tags:
+            steps, values = self.scalar_arrays(t)
+            if smoothing:
+                values = debiased_ema_smooth(values, smoothing)
+            if window:
+                values = window_smooth(values, window)
+            series.append((steps, values))
+
+        if resample_steps is None:
+            grid = numpy.unique(
+                numpy.concatenate(
+                    [s for s, _ in series] or [numpy.empty(0, dtype=numpy.int64)]
+                )
+            )
+        elif isinstance(resample_steps, int):
+            logged = [s for s, _ in series if s.shape[0]]
+            if logged:
+                lo, hi = min(s[0] for s in logged), max(s[-1] for s in logged)
+                grid = numpy.unique(
+                    numpy.linspace(lo, hi, resample_steps).round().astype(numpy.int64)
+                )
+            else:
+                grid = numpy.empty(0, dtype=numpy.int64)
+        else:
+            grid = numpy.asarray(resample_steps, dtype=numpy.int64)
+
+        aligned = numpy.full((grid.shape[0], len(tags)), numpy.nan)
+        for i, (steps, values) in enumerate(series):
+            if not steps.shape[0]:
+                continue
+            if resample_steps is None:
+                aligned[numpy.searchsorted(grid, steps), i] = values
+            else:
+                inside = (grid >= steps[0]) & (grid <= steps[-1])
+                aligned[inside, i] = numpy.interp(grid[inside], steps, values)
+
+        df = pandas.DataFrame(
+            aligned, index=pandas.Index(grid, name=index_label), columns=list(tags)
+        )
+
+        if self.save_to_disk:
+            file_path = out_dir / f'scalars_aligned_{"_".join(tags)}.{file_format}'
+            if file_format == "npz":
+                numpy.savez_compressed(
+                    str(file_path), steps=grid, values=aligned, tags=numpy.array(tags)
+                )
+            else:
+                with open(str(file_path), "w") as f:
+                    for i in range(0, max(grid.shape[0], 1), chunk_size):
+                        df.iloc[i : i + chunk_size].to_csv(f, header=i == 0)
+
+        return df
+
     @passes_kws_to(pandas.DataFrame.to_csv)
     def pr_curve_export_csv(
         self,
@@ -309,7 +823,7 @@ class TensorboardEventExporter:
 
         numpy_rep = numpy.array(
             [
-                tensorflow.make_ndarray(b)
+                tensor_util.make_ndarray(b)
                 for a in list(
                     zip_longest(
                         *[
@@ -371,7 +885,7 @@ class TensorboardEventExporter:
 
         numpy_rep = numpy.array(
             [
-                tensorflow.make_ndarray(b)
+                tensor_util.make_ndarray(b)
                 for a in list(
                     zip_longest(
                         *[
@@ -421,4 +935,18 @@ if __name__ == "__main__":
             )
         )
 
+    def follow_to_terminal():
+        from draugr.writers import TerminalPlotWriter
+
+        _path_to_events_file = next(
+            AppPath("Adversarial Speech", "Christian Heider Nielsen").user_log.rglob(
+                "events.out.tfevents.*"
+            )
+        )
+        with TensorboardEventExporter(_path_to_events_file.parent) as tee:
+            with TerminalPlotWriter() as w:
+                for tag, event in tee.follow(timeout=60):
+                    w.scalar(tag, event.value, event.step)
+
     a()
+    # follow_to_terminal()
@@ -20,6 +20,7 @@ from .tensors import *
 from .writers import *
 from .sessions import *
 from .evaluation import *
+from .metrics import *
 
 if __name__ == "__main__":
     print(__doc__)
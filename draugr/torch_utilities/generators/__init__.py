@@ -7,4 +7,5 @@ __doc__ = r"""
            Created on 17/03/2020
            """
 
+from .device_prefetching import *
 from .to_tensor_generator import *
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+           Double buffered host to device prefetching, overlapping conversion and copies of the next batches with the
+           consumer
+
+           Created on 18/10/2026
+           """
+
+from typing import Any, Iterable, Iterator, List, Optional, Tuple, Union
+
+import torch
+
+from draugr.generators.async_generators import sync_iterator
+from draugr.generators.prefetching import Prefetcher
+from draugr.torch_utilities.tensors import to_tensor
+
+__all__ = ["DevicePrefetcher", "prefetch_to_device"]
+
+
+class DevicePrefetcher:
+    """
+  Iterator over iterable converted with to_tensor and moved to device, prepared up to num_buffers items ahead on a
+  background thread.
+
+  With a cuda device each item is converted on the host, copied into one of num_buffers reused page-locked staging
+  buffers and from there to the device on a side stream, so copies overlap the consumer's kernels. An item is
+  yielded only once its copy has completed, and a staging buffer is only refilled once its previous copy has. On
+  other devices, or without cuda, the background thread alone overlaps the conversion with the consumer."""
+
+    def __init__(
+        self,
+        iterable: Iterable,
+        device: Union[str, torch.device] = "cpu",
+        num_buffers: int = 2,
+        **kwargs
+    ):
+        """
+
+    :param iterable:
+    :param device:
+    :param num_buffers: number of items prepared ahead, and of pinned staging buffers
+    :param kwargs: passed to to_tensor"""
+        assert num_buffers > 0
+        if hasattr(iterable, "__aiter__"):
+            iterable = sync_iterator(iterable)
+        self._device = torch.device(device)
+        self._cuda = self._device.type == "cuda" and torch.cuda.is_available()
+        self._to_tensor_kws = kwargs
+        if self._cuda:
+            self._stream = torch.cuda.Stream(self._device)
+            self._staging = [None] * num_buffers
+            self._copied = [None] * num_buffers
+        self._prefetcher = Prefetcher(self._stage(iterable), depth=num_buffers)
+
+    def _host_tensors(self, item: Any) -> List[torch.Tensor]:
+        return [to_tensor(item, device="cpu", **self._to_tensor_kws)]
+
+    def _copy_to_device(
+        self, slot: int, tensors: List[torch.Tensor]
+    ) -> Tuple[List[torch.Tensor], torch.cuda.Event]:
+        if self._copied[slot] is not None:
+            self._copied[slot].synchronize()  # Staging buffer free again
+        staging = self._staging[slot]
+        if staging is None or [(s.shape, s.dtype) for s in staging] != [
+            (t.shape, t.dtype) for t in tensors
+        ]:
+            staging = self._staging[slot] = [
+                torch.empty(t.shape, dtype=t.dtype, pin_memory=True) for t in tensors
+            ]
+        for s, t in zip(staging, tensors):
+            s.copy_(t)
+        with torch.cuda.stream(self._stream):
+            on_device = [s.to(self._device, non_blocking=True) for s in staging]
+            copied = torch.cuda.Event()
+            copied.record(self._stream)
+        self._copied[slot] = copied
+        return on_device, copied
+
+    def _stage(
+        self, iterable: Iterable
+    ) -> Iterator[Tuple[List[torch.Tensor], Optional[torch.cuda.Event]]]:
+        """Runs on the background thread"""
+        for i, item in enumerate(iterable):
+            tensors = self._host_tensors(item)
+            if self._cuda:
+                yield self._copy_to_device(i % len(self._staging), tensors)
+            else:
+                yield [t.to(self._device) for t in tensors], None
+
+    def _assemble(self, tensors: List[torch.Tensor]) -> Any:
+        return tensors[0]
+
+    def __iter__(self) -> Iterator:
+        return self
+
+    def __next__(self) -> Any:
+        tensors, copied = next(self._prefetcher)
+        if copied is not None:
+            copied.synchronize()
+            consumer_stream = torch.cuda.current_stream(self._device)
+            for t in tensors:  # Allocated on the side stream, used on this one
+                t.record_stream(consumer_stream)
+        return self._assemble(tensors)
+
+    def close(self) -> None:
+        """Stops the background thread, discarding prefetched items"""
+        self._prefetcher.close()
+
+    @property
+    def stats(self) -> dict:
+        """
+    Items consumed and stall times of the underlying Prefetcher, a large consumer_stall means the host side
+    conversion or copies are the bottleneck
+
+    :return:"""
+        return self._prefetcher.stats
+
+    def __enter__(self) -> "DevicePrefetcher":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+
+def prefetch_to_device(
+    iterable: Iterable,
+    device: Union[str, torch.device] = "cpu",
+    num_buffers: int = 2,
+    **kwargs
+) -> DevicePrefetcher:
+    """
+  Converts and moves the items of iterable to device num_buffers items ahead of the consumer, see DevicePrefetcher
+
+  :param iterable:
+  :param device:
+  :param num_buffers:
+  :param kwargs: passed to to_tensor
+  :return:"""
+    return DevicePrefetcher(iterable, device, num_buffers, **kwargs)
+
+
+if __name__ == "__main__":
+
+    def main():
+        import numpy
+        import time
+
+        def slow_batches():
+            for _ in range(20):
+                time.sleep(0.01)
+                yield numpy.random.random((64, 3, 32, 32))
+
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        with prefetch_to_device(slow_batches(), device) as batches:
+            for batch in batches:
+                time.sleep(0.01)
+        print(device, batch.device, batches.stats)
+
+    main()
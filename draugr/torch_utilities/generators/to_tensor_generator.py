@@ -1,13 +1,15 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-from typing import Iterable, Iterator, Tuple, Union
+from typing import Iterable, Iterator, Union
 
 import numpy
 import torch
 from torch.utils.data.dataloader import DataLoader
 
+from draugr.generators.async_generators import sync_iterator
 from draugr.torch_utilities.datasets import NonSequentialDataset
-from draugr.torch_utilities.tensors import to_tensor
+from draugr.torch_utilities.generators.device_prefetching import DevicePrefetcher
+from draugr.torch_utilities.tensors import to_device, to_tensor
 from warg import passes_kws_to
 
 __author__ = "Christian Heider Nielsen"
@@ -21,19 +23,18 @@ __all__ = ["to_tensor_generator", "batch_generator_torch", "to_device_iterator"]
 @passes_kws_to(to_tensor)
 def to_tensor_generator(iterable: Iterable, preload_next: bool = False, **kwargs):
     """
+Async iterables are bridged with draugr.generators.sync_iterator, running their event loop on a background thread
 
 :param iterable:
-:param preload_next:
+:param preload_next: convert and copy the next items to the device on a background thread while the current is
+consumed, through pinned staging buffers and a side stream on cuda, see DevicePrefetcher
 :param kwargs:
 :return:"""
+    if hasattr(iterable, "__aiter__"):
+        iterable = sync_iterator(iterable)
     if preload_next:
-        iterable_iter = iter(iterable)
-        current = to_tensor(next(iterable_iter), **kwargs)
-        kwargs["non_blocking"] = True
-        while current is not None:
-            next_ = to_tensor(next(iterable_iter), **kwargs)
-            yield current
-            current = next_
+        with DevicePrefetcher(iterable, **kwargs) as prefetched:
+            yield from prefetched
     else:
         for a in iterable:
             yield to_tensor(a, **kwargs)
@@ -41,20 +42,18 @@ def to_tensor_generator(iterable: Iterable, preload_next: bool = False, **kwargs
 
 
 def to_device_iterator(
-    data_iterator: Iterator, device: Union[torch.device, str]
-) -> Tuple:
+    data_iterator: Iterable, device: Union[torch.device, str], **kwargs
+) -> Iterator:
     """
+Moves each batch of data_iterator to device with to_device, keeping its structure. The tensor and ndarray leaves of
+each dtype are transferred in a single coalesced copy
 
 :param data_iterator:
 :param device:
+:param kwargs: passed to to_device
 """
-    if isinstance(data_iterator, Iterable):
-        data_iterator = iter(data_iterator)
-    try:
-        while True:
-            yield (to_tensor(i, device=device) for i in next(data_iterator))
-    except StopIteration:
-        pass
+    for batch in data_iterator:
+        yield to_device(batch, device, **kwargs)
 
 
 @passes_kws_to(DataLoader)
@@ -96,8 +95,8 @@ if __name__ == "__main__":
 
         a = DataLoader(RandomDataset((10, 2), 100), batch_size=4)
         for _ in range(4):
-            for i, a in enumerate(to_device_iterator(a, "cpu")):
-                d, *_ = a
+            for i, b in enumerate(to_device_iterator(a, "cpu")):
+                d, *_ = b
                 print(d)
                 print(type(d))
 
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+           Tensor counterparts of the draugr.metrics.accumulation generators, state is kept as detached tensors on
+           the device of the first value and is only copied to the host when value is read
+
+           Created on 18/10/2026
+           """
+
+from abc import ABC, abstractmethod
+from typing import Optional, Union
+
+import torch
+
+__all__ = [
+    "TensorAccumulator",
+    "TensorLambdaAccumulator",
+    "TensorMeanAccumulator",
+    "TensorTotalAccumulator",
+]
+
+
+def host_value(t: Optional[torch.Tensor]) -> Union[None, float, list]:
+    """
+  Synchronising copy to the host, a number for single element tensors and nested lists otherwise
+
+  :param t:
+  :return:"""
+    if t is None:
+        return None
+    if t.numel() == 1 and t.dim() == 0:
+        return t.item()
+    return t.tolist()
+
+
+class TensorAccumulator(ABC):
+    """
+  Base of the tensor accumulators, the state has the shape of the values sent, a vector of per stream values tracks
+  many streams at once. Values are detached so no autograd graph is retained."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        """"""
+        self._state = None
+
+    def update(self, value: torch.Tensor) -> None:
+        """
+
+    :param value:
+    :type value:"""
+        value = torch.as_tensor(value).detach()
+        if self._state is None:
+            self._state = value.to(
+                dtype=value.dtype if value.is_floating_point() else torch.float32,
+                copy=True,
+            )
+        else:
+            self._update(value)
+
+    @abstractmethod
+    def _update(self, value: torch.Tensor) -> None:
+        """Folds value into the existing state"""
+
+    def send(self, value: torch.Tensor) -> None:
+        """
+    Alias of update, for drop-in use where the generator accumulators were used
+
+    :param value:"""
+        self.update(value)
+
+    @property
+    def tensor(self) -> Optional[torch.Tensor]:
+        """Current state on device, does not synchronise"""
+        return self._state
+
+    @property
+    def value(self) -> Union[None, float, list]:
+        """Current state copied to the host, synchronises"""
+        return host_value(self.tensor)
+
+    def to(self, device: Union[str, torch.device]) -> "TensorAccumulator":
+        """
+
+    :param device:
+    :return:"""
+        if self._state is not None:
+            self._state = self._state.to(device)
+        return self
+
+
+class TensorLambdaAccumulator(TensorAccumulator):
+    """
+  Exponential moving average, state = state * lambd + value * (1 - lambd), as a single fused in place lerp"""
+
+    def __init__(self, lambd: float = 0.99):
+        assert 0 <= lambd <= 1
+        self.lambd = lambd
+        super().__init__()
+
+    def _update(self, value: torch.Tensor) -> None:
+        self._state.lerp_(value.to(self._state), 1 - self.lambd)
+
+
+class TensorMeanAccumulator(TensorAccumulator):
+    """
+  Arithmetic mean of all values sent, a running sum and a host side count, the division happens on read"""
+
+    def reset(self) -> None:
+        """"""
+        super().reset()
+        self.count = 0
+
+    def update(self, value: torch.Tensor) -> None:
+        """
+
+    :param value:
+    :type value:"""
+        super().update(value)
+        self.count += 1
+
+    def _update(self, value: torch.Tensor) -> None:
+        self._state.add_(value.to(self._state))
+
+    @property
+    def tensor(self) -> Optional[torch.Tensor]:
+        """Current mean on device, does not synchronise"""
+        if self._state is None:
+            return None
+        return self._state / self.count
+
+
+class TensorTotalAccumulator(TensorAccumulator):
+    """
+  Sum of all values sent"""
+
+    def _update(self, value: torch.Tensor) -> None:
+        self._state.add_(value.to(self._state))
+
+
+if __name__ == "__main__":
+
+    def main():
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        acc = TensorLambdaAccumulator()
+        mean = TensorMeanAccumulator()
+        for i in range(1000):
+            v = torch.cos(torch.arange(4, device=device) * i)
+            acc.update(v)
+            mean.update(v)
+        print(acc.value, mean.value)
+
+    main()
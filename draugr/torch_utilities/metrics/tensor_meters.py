@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+           Tensor counterparts of draugr.metrics.meters, val, sum and count are detached device tensors updated in
+           place, avg is computed on device and nothing is synchronised until summary() is called
+
+           Created on 18/10/2026
+           """
+
+from typing import Optional, Union
+
+import torch
+
+from draugr.torch_utilities.metrics.tensor_accumulation import host_value
+
+__all__ = ["TensorMeter", "TensorAverageMeter"]
+
+
+class TensorMeter:
+    """Stores current value, sum and count, optionally per stream when updated with vectors"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """"""
+        self.val = None
+        self.sum = None
+        self.count = None
+
+    def update(self, val: torch.Tensor, n: Union[int, torch.Tensor] = 1) -> None:
+        """
+
+    :param val:
+    :type val:
+    :param n: number of samples val summarises, a tensor gives per stream counts e.g. a mask of streams that
+    completed an episode
+    :type n:"""
+        val = torch.as_tensor(val).detach()
+        if not val.is_floating_point():
+            val = val.float()
+        if self.sum is None:
+            self.val = val.clone()
+            self.sum = torch.zeros_like(val)
+            self.count = torch.zeros_like(val)
+        else:
+            self.val.copy_(val)
+        if torch.is_tensor(n):
+            n = n.to(device=val.device, dtype=val.dtype)
+            self.sum.addcmul_(val, n)
+            self.count.add_(n)
+        else:  # Host numbers are passed as scalars, no host to device copy
+            self.sum.add_(val, alpha=n)
+            self.count.add_(n)
+
+    def summary(self) -> dict:
+        """
+    Host copy of the state, synchronises
+
+    :return:
+    :rtype:"""
+        return {
+            "val": host_value(self.val),
+            "sum": host_value(self.sum),
+            "count": host_value(self.count),
+        }
+
+    def to(self, device: Union[str, torch.device]) -> "TensorMeter":
+        """
+
+    :param device:
+    :return:"""
+        if self.sum is not None:
+            self.val, self.sum, self.count = (
+                t.to(device) for t in (self.val, self.sum, self.count)
+            )
+        return self
+
+
+class TensorAverageMeter(TensorMeter):
+    """Computes and stores the average and current value, streams without any updates have nan average"""
+
+    @property
+    def avg(self) -> Optional[torch.Tensor]:
+        """Average on device, does not synchronise"""
+        if self.sum is None:
+            return None
+        return self.sum / self.count
+
+    @property
+    def value(self) -> Union[None, float, list]:
+        """Average copied to the host, synchronises"""
+        return host_value(self.avg)
+
+    def summary(self) -> dict:
+        """
+    Host copy of the state, synchronises
+
+    :return:
+    :rtype:"""
+        s = super().summary()
+        s["avg"] = host_value(self.avg)
+        return s
+
+
+if __name__ == "__main__":
+
+    def main():
+        meter = TensorAverageMeter()
+        for i in range(10):
+            returns = torch.randn(8)
+            done = torch.rand(8) > 0.5
+            meter.update(returns, done)
+        print(meter.summary())
+
+    main()
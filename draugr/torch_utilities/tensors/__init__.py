@@ -17,5 +17,6 @@ from .mixins import *
 from .normalise import *
 from .reshaping import *
 from .tensor_container import *
+from .to_device import *
 from .to_scalar import *
 from .to_tensor import *
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+           Moving nested batch structures to a device, with one coalesced copy per dtype
+
+           Created on 18/10/2026
+           """
+
+from collections import defaultdict
+from typing import Any, List, Mapping, Tuple, Union
+
+import numpy
+import torch
+
+from draugr.torch_utilities.tensors.tensor_container import NamedTensorTuple
+
+__all__ = ["tree_flatten", "tree_unflatten", "to_device"]
+
+
+def tree_flatten(tree: Any) -> Tuple[List, Any]:
+    """
+  Flattens nested mappings, lists, tuples, namedtuples and NamedTensorTuples into their leaves in depth first order
+
+  :param tree:
+  :return: leaves and the spec to rebuild the structure with tree_unflatten"""
+    leaves = []
+
+    def flatten(node: Any) -> Any:
+        if isinstance(node, NamedTensorTuple):
+            keys = list(node)
+            return NamedTensorTuple, keys, [flatten(node[k]) for k in keys]
+        if isinstance(node, Mapping):
+            keys = list(node.keys())
+            return type(node), keys, [flatten(node[k]) for k in keys]
+        if isinstance(node, (list, tuple)):
+            return type(node), None, [flatten(c) for c in node]
+        leaves.append(node)
+        return None
+
+    return leaves, flatten(tree)
+
+
+def tree_unflatten(spec: Any, leaves: List) -> Any:
+    """
+  Inverse of tree_flatten, mappings that can not be built from key value pairs are rebuilt as dicts
+
+  :param spec:
+  :param leaves:
+  :return:"""
+    leaves = iter(leaves)
+
+    def build(node: Any) -> Any:
+        if node is None:
+            return next(leaves)
+        kind, keys, children = node
+        values = [build(c) for c in children]
+        if keys is None:
+            if hasattr(kind, "_fields"):  # namedtuple
+                return kind(*values)
+            return kind(values)
+        if kind is NamedTensorTuple:
+            return NamedTensorTuple(**dict(zip(keys, values)))
+        try:
+            return kind(zip(keys, values))
+        except TypeError:
+            return dict(zip(keys, values))
+
+    return build(spec)
+
+
+def to_device(
+    batch: Any,
+    device: Union[str, torch.device],
+    *,
+    non_blocking: bool = True,
+    coalesce: bool = True,
+) -> Any:
+    """
+  Moves the tensor and ndarray leaves of a nested batch to device, keeping the structure and other leaves as they are.
+
+  With coalesce the cpu tensors of each dtype are gathered into one contiguous staging buffer, page-locked when
+  copying to cuda, and transferred in a single copy. The returned leaves are views into that buffer, so it lives as
+  long as any of them. Tensors requiring grad and non-strided tensors are moved one by one.
+
+  :param batch:
+  :param device:
+  :param non_blocking: asynchronous copies from the page-locked staging buffers
+  :param coalesce:
+  :return:"""
+    device = torch.device(device)
+    leaves, spec = tree_flatten(batch)
+    groups = defaultdict(list)
+    for i, leaf in enumerate(leaves):
+        if isinstance(leaf, numpy.ndarray) and not leaf.dtype.hasobject:
+            leaf = leaves[i] = torch.from_numpy(numpy.ascontiguousarray(leaf))
+        if not torch.is_tensor(leaf) or leaf.device == device:
+            continue
+        if (
+            coalesce
+            and leaf.device.type == "cpu"
+            and leaf.layout == torch.strided
+            and not leaf.requires_grad
+        ):
+            groups[leaf.dtype].append(i)
+        else:
+            leaves[i] = leaf.to(device, non_blocking=non_blocking)
+
+    pin = device.type == "cuda" and torch.cuda.is_available()
+    for dtype, indices in groups.items():
+        if len(indices) == 1:
+            leaves[indices[0]] = leaves[indices[0]].to(
+                device, non_blocking=non_blocking
+            )
+            continue
+        sizes = [leaves[i].numel() for i in indices]
+        staging = torch.empty(sum(sizes), dtype=dtype, pin_memory=pin)
+        torch.cat([leaves[i].reshape(-1) for i in indices], out=staging)
+        moved = staging.to(device, non_blocking=non_blocking and pin)
+        for i, part in zip(indices, moved.split(sizes)):
+            leaves[i] = part.view(leaves[i].shape)
+
+    return tree_unflatten(spec, leaves)
+
+
+if __name__ == "__main__":
+    from collections import namedtuple
+
+    Sample = namedtuple("Sample", ("image", "label"))
+    b = {
+        "samples": Sample(torch.zeros((2, 3)), torch.arange(2)),
+        "masks": [numpy.ones((2, 2)), torch.ones((2, 2), dtype=torch.double)],
+        "boxes": NamedTensorTuple(boxes=torch.rand(4, 4), labels=torch.arange(4)),
+        "name": "batch",
+    }
+    print(to_device(b, "cuda" if torch.cuda.is_available() else "meta"))
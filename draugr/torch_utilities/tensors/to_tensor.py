@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-from typing import Iterable, Sequence, Union
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
 
 import numpy
 import torch
@@ -12,48 +12,120 @@ __doc__ = ""
 __all__ = ["to_tensor"]
 
 
+def _flatten_nested(obj: Sequence) -> Optional[Tuple[Tuple[int, ...], List]]:
+    """
+  Flattens rectangular nested lists and tuples a level at a time
+
+  :return: the nesting shape and the leaves in row-major order, None if ragged or empty"""
+    shape = []
+    level = [obj]
+    while isinstance(level[0], (list, tuple)):
+        n = len(level[0])
+        if not n or any(not isinstance(o, (list, tuple)) or len(o) != n for o in level):
+            return None
+        shape.append(n)
+        level = [leaf for o in level for leaf in o]
+    return tuple(shape), level
+
+
+def _stack_leaves(shape: Tuple[int, ...], leaves: List) -> Optional[torch.Tensor]:
+    """
+  Stacks tensor or ndarray leaves once, instead of per nesting level"""
+    first = leaves[0]
+    if torch.is_tensor(first):
+        stacked = torch.stack(leaves)
+    elif isinstance(first, numpy.ndarray):
+        stacked = _from_numpy(numpy.stack(leaves))
+    else:
+        return None
+    if len(shape) > 1:
+        return stacked.reshape(*shape, *first.shape)
+    return stacked
+
+
+def _from_numpy(obj: numpy.ndarray) -> torch.Tensor:
+    """
+  Shares memory with obj, copies read-only and negatively strided arrays first"""
+    if obj.dtype.hasobject:
+        stacked = _stack_leaves(obj.shape, list(obj.flat))
+        if stacked is not None:
+            return stacked
+        obj = numpy.array(obj.tolist())
+    if not obj.flags.writeable or (obj.ndim and min(obj.strides) < 0):
+        obj = numpy.array(obj)
+    return torch.from_numpy(obj)
+
+
+def _finish(
+    tensor: torch.Tensor,
+    dtype: torch.dtype,
+    device: Union[str, torch.device],
+    pin_memory: bool,
+    **kwargs
+) -> torch.Tensor:
+    if pin_memory and tensor.device.type == "cpu" and torch.cuda.is_available():
+        tensor = tensor.to(dtype=dtype).pin_memory()
+        kwargs.setdefault("non_blocking", True)
+    return tensor.to(dtype=dtype, device=device, **kwargs)
+
+
 # @passes_kws_to(torch.Tensor.to)
 def to_tensor(
     obj: Union[torch.Tensor, numpy.ndarray, Iterable, Sequence, int, float],
     dtype: torch.dtype = torch.float,
     device: Union[str, torch.device] = "cpu",
+    *,
+    pin_memory: bool = False,
     **kwargs
 ) -> torch.Tensor:
     """
+  Converts obj to a tensor of dtype on device, doing as little work as the input allows.
+
+  Tensors already of dtype on device are returned as they are, numpy arrays share memory through torch.from_numpy when
+  dtype matches, nested lists and tuples whose innermost first element is a tensor or ndarray are flattened once and
+  their leaves stacked in a single call, other nested sequences are handed to torch.tensor directly.
 
   :param obj:
   :param dtype:
   :param device:
-  :param kwargs:
+  :param pin_memory: build the tensor in page-locked memory, copied asynchronously when device is not the cpu. Ignored
+  when cuda is not available
+  :param kwargs: passed to torch.Tensor.to
   :return:"""
-
-    # torch.as_tensor()
     if torch.is_tensor(obj):
-        return obj.to(dtype=dtype, device=device, **kwargs)
+        return _finish(obj, dtype, device, pin_memory, **kwargs)
 
     if isinstance(obj, Image):
         return torchvision.transforms.functional.to_tensor(obj)
 
     if isinstance(obj, numpy.ndarray):
-        if torch.is_tensor(obj[0]) and len(obj[0].size()) > 0:
-            return torch.stack(obj.tolist()).to(dtype=dtype, device=device, **kwargs)
-        return torch.from_numpy(obj).to(dtype=dtype, device=device, **kwargs)
+        return _finish(_from_numpy(obj), dtype, device, pin_memory, **kwargs)
 
     if not isinstance(obj, Sequence):
         if isinstance(obj, set):
             obj = [*obj]
         else:
             obj = [obj]
-    elif not isinstance(obj, list) and isinstance(obj, Iterable):
+    elif not isinstance(obj, (list, tuple)) and isinstance(obj, Iterable):
         obj = [*obj]
-
-    if isinstance(obj, list):
-        if torch.is_tensor(obj[0]) and len(obj[0].size()) > 0:
-            return torch.stack(obj).to(dtype=dtype, device=device, **kwargs)
-        elif isinstance(obj[0], list):
-            obj = [to_tensor(o) for o in obj]
-            return torch.stack(obj).to(dtype=dtype, device=device, **kwargs)
-
+    if not len(obj):
+        raise ValueError("Cannot convert an empty sequence, its shape is unknown")
+
+    first = obj[0]
+    if torch.is_tensor(first):
+        return _finish(torch.stack([*obj]), dtype, device, pin_memory, **kwargs)
+    innermost = first
+    while isinstance(innermost, (list, tuple)) and innermost:
+        innermost = innermost[0]
+    if torch.is_tensor(innermost) or isinstance(innermost, numpy.ndarray):
+        flat = _flatten_nested(obj)
+        if flat is not None:
+            stacked = _stack_leaves(*flat)
+            if stacked is not None:
+                return _finish(stacked, dtype, device, pin_memory, **kwargs)
+
+    if pin_memory:
+        return _finish(torch.tensor(obj, dtype=dtype), dtype, device, True, **kwargs)
     return torch.tensor(obj, dtype=dtype, device=device, **kwargs)
 
 
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+
+from draugr.generators import (
+    abatch_generator,
+    ainner_map,
+    amap,
+    arecycle,
+    sync_iterator,
+)
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+           """
+
+
+async def slow_negate(x):
+    await asyncio.sleep(0.001 * (x % 5))
+    return -x
+
+
+def test_amap_ordered_and_batched():
+    out = list(sync_iterator(abatch_generator(amap(slow_negate, range(25)), 10, False)))
+    assert out == [[-i for i in range(j, min(j + 10, 25))] for j in range(0, 25, 10)]
+
+
+def test_ainner_map():
+    batches = [[1, 2], [3]]
+    assert list(sync_iterator(ainner_map(slow_negate, batches))) == [[-1, -2], [-3]]
+    assert list(sync_iterator(ainner_map(abs, batches, aggregate_yield=False))) == [
+        1,
+        2,
+        3,
+    ]
+
+
+def test_arecycle_epoch():
+    it = iter(sync_iterator(arecycle(amap(slow_negate, range(6)))))
+    assert sorted(next(it) for _ in range(6)) == [-5, -4, -3, -2, -1, 0]
+    it.close()
+
+
+def test_to_tensor_generator_bridge():
+    import torch
+    from draugr.torch_utilities import to_tensor_generator
+
+    out = list(to_tensor_generator(abatch_generator(range(4), 2), device="cpu"))
+    assert all(isinstance(t, torch.Tensor) for t in out) and out[1].tolist() == [2, 3]
@@ -33,3 +33,85 @@ def test_batch_with_label():
     for i, a in enumerate(generator):
         print(a)
         break
+
+
+def test_batch_generator_partial_and_distinct():
+    from draugr import batch_generator
+
+    batches = list(batch_generator(range(7), 3, drop_not_full=False))
+    assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_sized_batch_keeps_last_full_batch():
+    import numpy
+    from draugr import sized_batch
+
+    batches = list(sized_batch(numpy.arange(6), 3))
+    assert len(batches) == 2 and batches[1].base is not None
+
+
+def test_preallocated_batch_generator():
+    import numpy
+    from draugr import preallocated_batch_generator
+
+    xs = numpy.random.random((10, 4, 2)).astype(numpy.float32)
+    ys = numpy.arange(10)
+    batches = []
+    for x, y in preallocated_batch_generator(
+        zip(xs, ys), 4, drop_not_full=False, num_buffers=3
+    ):
+        assert x.flags["C_CONTIGUOUS"] and x.dtype == numpy.float32
+        batches.append((x, y))
+    assert [len(y) for _, y in batches] == [4, 4, 2]
+    numpy.testing.assert_array_equal(numpy.concatenate([x for x, _ in batches]), xs)
+    numpy.testing.assert_array_equal(batches[2][1], ys[8:])
+
+
+def test_preallocated_torch_buffers():
+    import numpy
+    import torch
+    from draugr import preallocated_batch_generator
+
+    xs = numpy.random.random((8, 3))
+    for b in preallocated_batch_generator(xs, 4, torch_buffer=True, pin_memory=True):
+        assert isinstance(b, torch.Tensor) and b.shape == (4, 3)
+    numpy.testing.assert_array_equal(b.numpy(), xs[4:])
+
+
+def test_preallocated_torch_buffers_scalar_samples():
+    import torch
+    from draugr import preallocated_batch_generator
+
+    batches = []
+    for b in preallocated_batch_generator(range(8), 4, torch_buffer=True):
+        assert b.dtype == torch.int64 and b.shape == (4,)
+        batches.append(b.tolist())
+    assert batches == [[0, 1, 2, 3], [4, 5, 6, 7]]
+
+
+def test_block_shuffled_batches_memmap(tmp_path):
+    import numpy
+    from draugr import block_shuffled_batches
+
+    size = 1000
+    x = numpy.lib.format.open_memmap(
+        str(tmp_path / "x.npy"), mode="w+", dtype=numpy.float32, shape=(size, 3)
+    )
+    x[:] = numpy.arange(size)[:, None]
+    y = numpy.arange(size)
+    for num_workers in (0, 3):
+        seen = []
+        for bx, by in block_shuffled_batches(
+            x,
+            y,
+            size=size,
+            batch_size=64,
+            block_size=50,
+            seed=1,
+            num_workers=num_workers,
+        ):
+            numpy.testing.assert_array_equal(bx[:, 0], by)  # Rows stay paired
+            seen.append(by)
+        seen = numpy.concatenate(seen)
+        assert len(seen) == size // 64 * 64 and len(set(seen)) == len(seen)
+        assert not numpy.array_equal(seen, numpy.sort(seen))
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import itertools
+import math
+import time
+
+import pytest
+
+from draugr.generators import (
+    inner_map,
+    kw_map,
+    parallel_inner_map,
+    parallel_kw_map,
+    parallel_map,
+)
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+           """
+
+
+@pytest.mark.parametrize("workers", ["thread", "process"])
+def test_parallel_map_ordered(workers):
+    assert list(parallel_map(math.sqrt, range(1000), workers=workers)) == [
+        math.sqrt(i) for i in range(1000)
+    ]
+
+
+def test_parallel_map_unordered_and_infinite():
+    def slow(x):
+        time.sleep(0.001 * (x % 3))
+        return x
+
+    out = list(
+        itertools.islice(
+            parallel_map(slow, itertools.count(), ordered=False, max_in_flight=4), 100
+        )
+    )
+    assert len(set(out)) == 100 and max(out) < 100 + 4 * 1024
+
+
+def test_parallel_inner_and_kw_map():
+    batches = [[1, 2], [3], [4, 5, 6]]
+    assert list(parallel_inner_map(abs, batches)) == list(inner_map(abs, batches))
+    assert list(parallel_inner_map(abs, batches, aggregate_yield=False)) == list(
+        inner_map(abs, batches, aggregate_yield=False)
+    )
+    assert list(parallel_kw_map(dict, "a", range(5))) == list(
+        kw_map(dict, "a", range(5))
+    )
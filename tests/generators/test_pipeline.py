@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import time
+
+import pytest
+
+from draugr.generators import Pipeline, batch_generator
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+           """
+
+
+class RecordingWriter:
+    def __init__(self):
+        self.tags = set()
+
+    def scalar(self, tag, value, step_i=None):
+        self.tags.add(tag)
+
+
+@pytest.mark.parametrize("workers", ["sync", "thread", "process"])
+def test_pipeline_output_and_stats(workers):
+    pipeline = (
+        Pipeline(range(100))
+        .map(abs, workers="thread" if workers == "process" else workers, name="abs")
+        .then(lambda it: batch_generator(it, 10), workers=workers, name="batch")
+    )
+    assert [b[0] for b in pipeline] == list(range(0, 100, 10))
+    assert pipeline.stages[1].items == 10
+    if workers != "process":
+        assert pipeline.stages[0].items == 100
+
+
+def test_pipeline_locates_bottleneck_and_publishes():
+    def slow(x):
+        time.sleep(0.002)
+        return x
+
+    writer = RecordingWriter()
+    pipeline = (
+        Pipeline(range(50), writer=writer, publish_interval=0)
+        .map(slow, name="slow")
+        .map(abs, name="fast")
+    )
+    list(pipeline)
+    slow_stage, fast_stage = pipeline.stages
+    assert fast_stage.wait - slow_stage.wait < slow_stage.wait
+    assert {"slow/items_per_sec", "fast/wait"} <= writer.tags
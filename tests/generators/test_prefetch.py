@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import gc
+import itertools
+import time
+
+import pytest
+
+from draugr.generators import inner_map, prefetch
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+           """
+
+
+@pytest.mark.parametrize("workers", ["thread", "process"])
+def test_prefetch_order(workers):
+    source = inner_map(lambda x: x * 2, ([i, i + 1] for i in range(50)))
+    assert list(prefetch(source, depth=3, workers=workers)) == [
+        [2 * i, 2 * i + 2] for i in range(50)
+    ]
+
+
+@pytest.mark.parametrize("workers", ["thread", "process"])
+def test_prefetch_propagates_exceptions(workers):
+    def failing():
+        yield 1
+        raise ValueError("upstream")
+
+    p = prefetch(failing(), workers=workers)
+    assert next(p) == 1
+    with pytest.raises(ValueError):
+        next(p)
+
+
+def test_prefetch_early_close_and_stats():
+    with prefetch(itertools.count(), depth=2) as p:
+        for i in p:
+            if i == 5:
+                break
+        time.sleep(0.05)
+    assert not p._worker.is_alive()
+    assert p.stats["items"] == 6 and p.stats["producer_stall"] > 0
+
+
+@pytest.mark.parametrize("workers", ["thread", "process"])
+def test_prefetch_abandoned_producer_stops(workers):
+    p = prefetch(itertools.count(), depth=1, workers=workers)
+    assert next(p) == 0
+    worker = p._worker
+    del p
+    gc.collect()
+    assert not worker.is_alive()
@@ -15,3 +15,44 @@ def test_recycle1():
     for i, b in zip(range(18), recycle(a)):
         assert b in a
     assert i == 17
+
+
+def test_batched_recycle_epoch_coverage_and_resume():
+    import numpy
+    from draugr import PermutationSampler, batched_recycle
+
+    data = numpy.arange(10)
+    sampler = PermutationSampler(10, seed=3)
+    g = batched_recycle(data, 5, sampler=sampler)
+    first_epoch = numpy.concatenate([next(g), next(g)])
+    assert sorted(first_epoch) == list(range(10))
+    next(g)
+    state = sampler.state_dict()
+    expected = [next(g) for _ in range(3)]
+
+    resumed = PermutationSampler(10)
+    resumed.load_state_dict(state)
+    g = batched_recycle(data, 5, sampler=resumed)
+    for e in expected:
+        numpy.testing.assert_array_equal(next(g), e)
+
+
+def test_sharded_samplers_are_disjoint():
+    from draugr import PermutationSampler
+
+    shards = [PermutationSampler(11, 7, shard_index=i, num_shards=3) for i in range(3)]
+    indices = [s.next_indices(len(range(i, 11, 3))) for i, s in enumerate(shards)]
+    assert sorted(int(i) for idx in indices for i in idx) == list(range(11))
+
+
+def test_recycle_default_seed_follows_numpy_seed():
+    import numpy
+    from itertools import islice
+
+    numpy.random.seed(5)
+    first = list(islice(recycle(range(9)), 9))
+    numpy.random.seed(5)
+    assert list(islice(recycle(range(9)), 9)) == first
+    assert list(islice(recycle(range(9), seed=5), 9)) == list(
+        islice(recycle(range(9), seed=5), 9)
+    )
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import pytest
+
+from draugr.generators import (
+    FilterModeEnum,
+    file_symbol_filter,
+    symbol_filter,
+    write_symbol_filtered,
+)
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+           """
+
+LINES = [
+    " # aasd # sad ",
+    " faojasasd # oiwaos ",
+    "",
+    " okjasifj  oajsidw2 ",
+    " 12 329#9213",
+    "   ",
+    "no symbol ## at all",
+]
+
+
+@pytest.mark.parametrize("mode", list(FilterModeEnum))
+@pytest.mark.parametrize("symbol", ["#", "##"])
+@pytest.mark.parametrize("chunk_size,num_workers", [(2 ** 24, 0), (8, 2)])
+def test_file_symbol_filter_matches_symbol_filter(
+    tmp_path, mode, symbol, chunk_size, num_workers
+):
+    path = tmp_path / "lines.txt"
+    path.write_text("\n".join(LINES))
+    expected = list(symbol_filter(LINES, symbol, exclusion_mode=mode))
+    kws = dict(exclusion_mode=mode, chunk_size=chunk_size, num_workers=num_workers)
+    assert list(file_symbol_filter(path, symbol, **kws)) == expected
+
+    out = write_symbol_filtered(path, tmp_path / "out.txt", symbol, **kws)
+    assert out.read_text().split("\n")[:-1] == expected
+
+
+def test_file_symbol_filter_empty(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_text("")
+    assert list(file_symbol_filter(path)) == []
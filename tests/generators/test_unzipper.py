@@ -10,3 +10,29 @@ __doc__ = r"""
 
 def test_unzipper_generator1():
     pass
+
+
+def test_unzipper_generator_not_copied():
+    from draugr import unzipper
+
+    consumed = []
+
+    def batches():
+        for i in range(3):
+            consumed.append(i)
+            yield ((j, -j) for j in range(i, i + 2))
+
+    g = unzipper(batches())
+    xs, ys = next(g)
+    assert consumed == [0]
+    assert (list(xs), list(ys)) == ([0, 1], [0, -1])
+    assert [list(x) for x, _ in g] == [[1, 2], [2, 3]]
+
+
+def test_unzipper_passthrough_and_schema():
+    from draugr import unzipper
+
+    assert list(unzipper(iter([1, 2, 3]))) == [1, 2, 3]
+    batches = [[(1, 2), (3, 4)]]
+    assert [list(c) for c in unzipper(batches, 3)] == [[(1, 3), (2, 4)]]
+    assert [list(c) for c in unzipper(iter(batches))] == [[(1, 3), (2, 4)]]
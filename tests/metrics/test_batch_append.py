@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import statistics
+
+import numpy
+import pytest
+
+from draugr.metrics import MetricAggregator, MetricCollection, RingBuffer
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+           """
+
+
+@pytest.mark.parametrize("capacity", [None, 7, 3000])
+def test_extend_matches_appends(capacity):
+    values = numpy.random.uniform(0.1, 10, 1024)
+    batched = MetricAggregator(capacity=capacity, window_sizes=(5,))
+    batched.extend(values[:1000])
+    batched.append(list(values[1000:]))
+    single = MetricAggregator(capacity=capacity, window_sizes=(5,))
+    for v in values:
+        single.append(v)
+
+    numpy.testing.assert_allclose(batched.values, single.values)
+    for key in ("mean", "variance", "geometric_mean", "harmonic_mean"):
+        assert batched.measures[key] == pytest.approx(single.measures[key])
+        assert batched.measures[key] == pytest.approx(getattr(statistics, key)(values))
+    assert batched.max == single.max and batched.min == single.min
+    assert batched.calc_moving_average(5) == pytest.approx(values[-5:].mean())
+    assert batched.calc_running_value() == pytest.approx(single.calc_running_value())
+    for d, v in single.running_values.items():
+        assert batched.running_values[d] == pytest.approx(v)
+
+
+def test_ring_buffer_extend_wraps():
+    r = RingBuffer(5, (3,))
+    r.extend(numpy.arange(4.0))
+    r.extend(numpy.arange(4.0, 12.0))
+    numpy.testing.assert_array_equal(r.view, numpy.arange(7.0, 12.0))
+    assert r.mean(3) == pytest.approx(10.0)
+    assert r.count == 12
+
+
+def test_running_value_zero_is_set():
+    a = MetricAggregator(ema_decays=(0.5,))
+    a.append(0.0)
+    a.append(2.0)
+    assert a.calc_running_value() == pytest.approx(0.02)
+    assert a.running_values == {0.5: pytest.approx(1.0)}
+
+
+def test_collection_extend_kwargs():
+    c = MetricCollection(keep_measure_history=True)
+    c.extend(signal=numpy.ones(1024), length=[1, 2, 3])
+    c.append(signal=2.0)
+    assert len(c.signal) == 1025 and len(c.length) == 3
+    assert len(c.signal.measures["mean"]) == 2  # One history entry per call
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import numpy
+import pytest
+
+from draugr.metrics import GrowableBuffer, MetricAggregator, MetricSummary, RingBuffer
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+           """
+
+
+def test_growable_buffer_list_behaviour():
+    b = GrowableBuffer(capacity=2)
+    ref = []
+    for i in range(100):
+        b.append(i * 0.5)
+        ref.append(i * 0.5)
+    b.extend(numpy.arange(10))
+    ref.extend(range(10))
+    assert len(b) == len(ref)
+    assert list(b) == ref
+    assert b[-1] == ref[-1] and b[3] == ref[3]
+    assert b.capacity >= len(b)
+    assert numpy.shares_memory(b.view, b.view)
+
+
+def test_aggregator_values_are_views():
+    agg = MetricAggregator()
+    for i in range(10):
+        agg.append(i)
+    assert isinstance(agg.values, numpy.ndarray)
+    assert agg[2] == 2 and len(agg) == 10 and 3 in agg
+    assert agg.calc_moving_average(4) == 7.5
+    assert list(agg) == [*range(10)]
+
+
+def test_summary_moving_average():
+    s = MetricSummary()
+    for i in range(10):
+        s.append(i)
+    assert s.moving_average(2) == 8.5
+    assert len(s) == 10
+
+
+def test_ring_buffer_windows():
+    r = RingBuffer(16, window_sizes=(4, 16))
+    ref = []
+    for i in range(1000):
+        v = float(numpy.sin(i))
+        r.append(v)
+        ref.append(v)
+        assert r.mean(4) == pytest.approx(numpy.mean(ref[-4:]))
+        if i > 0:
+            assert r.variance(16) == pytest.approx(numpy.var(ref[-16:], ddof=1))
+    assert len(r) == 16 and r.count == 1000
+    assert list(r) == pytest.approx(ref[-16:])
+    assert r[0] == ref[-16] and r[-1] == ref[-1]
+
+
+def test_bounded_aggregator():
+    agg = MetricAggregator(keep_measure_history=True, capacity=8, window_sizes=(4,))
+    for i in range(100):
+        agg.append(i)
+    assert len(agg) == 8 and len(agg.mean) == 8
+    assert agg.calc_moving_average(4) == 97.5
+    assert agg.mean[-1] == pytest.approx(49.5)
+
+
+@pytest.mark.parametrize("n", [10, 13, 25])
+def test_ring_buffer_append_after_extend_past_capacity(n):
+    r = RingBuffer(10, (3, 5))
+    r.extend(numpy.arange(float(n)))
+    for v in (100.0, 7.0, -3.0):
+        r.append(v)
+        assert r.mean(3) == pytest.approx(r.view[-3:].mean())
+        assert r.mean(5) == pytest.approx(r.view[-5:].mean())
+
+    a = MetricAggregator(capacity=100, window_sizes=(10,))
+    a.extend(numpy.random.random(250))
+    a.append(5.0)
+    assert a.calc_moving_average(10) == pytest.approx(a.values[-10:].mean())
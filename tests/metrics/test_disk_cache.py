@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import gc
+
+import numpy
+import pytest
+
+from draugr.metrics import MetricAggregator, SpillBuffer
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+           """
+
+
+def test_spill_buffer_indexing(tmp_path):
+    b = SpillBuffer(tmp_path, memory_tail=8)
+    ref = numpy.random.random(100)
+    for v in ref[:50]:
+        b.append(v)
+    b.extend(ref[50:])
+    assert b.spilled > 0
+    assert len(b) == 100
+    assert b[3] == ref[3] and b[-1] == ref[-1] and b[90] == ref[90]
+    assert numpy.array_equal(b[10:20], ref[10:20])
+    assert numpy.array_equal(b[-5:], ref[-5:])
+    assert numpy.array_equal(b.view, ref)
+    assert list(b) == ref.tolist()
+    assert b.mean(30) == pytest.approx(ref[-30:].mean())
+
+    b.flush()
+    assert numpy.array_equal(numpy.load(str(b.path)), ref)
+
+    path = b.path
+    del b
+    gc.collect()
+    assert not path.exists()
+
+
+def test_disk_cached_aggregator_save(tmp_path):
+    agg = MetricAggregator(
+        use_disk_cache=True,
+        keep_measure_history=True,
+        cache_directory=tmp_path / "cache",
+        memory_tail=4,
+    )
+    for i in range(20):
+        agg.append(i)
+    assert len(agg) == 20 and agg[2] == 2
+    assert agg.mean[-1] == pytest.approx(9.5)
+    agg.save(stat_name="signal", directory=tmp_path)
+    saved = next(tmp_path.glob("*.signal.npy"))
+    assert numpy.array_equal(numpy.load(str(saved)), numpy.arange(20))
+    agg.append(20)
+    assert agg[20] == 20
+
+
+def test_consecutive_saves_are_independent_copies(tmp_path):
+    b = SpillBuffer(tmp_path / "cache", memory_tail=4)
+    b.extend(numpy.arange(10))
+    first = b.save_to(tmp_path / "first.npy")
+    b.extend(numpy.arange(10, 30))
+    second = b.save_to(tmp_path / "second.npy")
+    b.append(30)
+    assert numpy.array_equal(numpy.load(str(first)), numpy.arange(10))
+    assert numpy.array_equal(numpy.load(str(second)), numpy.arange(30))
+    assert b.path.exists() and len(b) == 31
+
+    agg = MetricAggregator(
+        use_disk_cache=True, cache_directory=tmp_path / "cache", memory_tail=4
+    )
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    agg.extend(numpy.arange(10))
+    agg.save(stat_name="signal", directory=tmp_path / "a")
+    agg.extend(numpy.arange(10, 20))
+    agg.save(stat_name="signal", directory=tmp_path / "b")
+    saved_a = next((tmp_path / "a").glob("*.signal.npy"))
+    saved_b = next((tmp_path / "b").glob("*.signal.npy"))
+    assert numpy.array_equal(numpy.load(str(saved_a)), numpy.arange(10))
+    assert numpy.array_equal(numpy.load(str(saved_b)), numpy.arange(20))
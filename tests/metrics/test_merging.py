@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import pickle
+import random
+import statistics
+
+import pytest
+
+from draugr.metrics import (
+    AverageMeter,
+    MetricCollection,
+    StreamingStatistics,
+    merge_all,
+    reduce_summaries,
+)
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+           """
+
+
+def stream(values):
+    s = StreamingStatistics()
+    for v in values:
+        s.update(v)
+    return s
+
+
+@pytest.mark.parametrize("sizes", [(1, 2), (3, 1000), (500, 700, 20), (0, 10)])
+def test_merge_matches_single_stream(sizes):
+    chunks = [[random.uniform(0.1, 10) for _ in range(n)] for n in sizes]
+    values = [v for c in chunks for v in c]
+    merged = merge_all(stream(c) for c in chunks)
+    assert len(merged) == len(values)
+    for key in ("mean", "variance", "pstdev", "geometric_mean", "harmonic_mean"):
+        assert merged.measure(key) == pytest.approx(getattr(statistics, key)(values))
+    assert merged.min == min(values) and merged.max == max(values)
+
+
+def test_merge_associative():
+    a, b, c = (stream([random.gauss(0, 1) for _ in range(300)]) for _ in range(3))
+    left, right = a.merge(b).merge(c), a.merge(b.merge(c))
+    for key in ("mean", "variance", "median"):
+        assert left.measure(key) == pytest.approx(right.measure(key))
+
+
+def test_merged_median_estimate():
+    chunks = [[random.gauss(0, 1) for _ in range(2000)] for _ in range(4)]
+    merged = merge_all(stream(c) for c in chunks)
+    assert merged.measure("median") == pytest.approx(0, abs=0.1)
+    merged.update(0.5)  # Still a valid estimator after merging
+    assert merged.measure("median") == pytest.approx(0, abs=0.1)
+
+
+def test_reduce_collection_summaries():
+    summaries = []
+    values = []
+    for _ in range(3):
+        c = MetricCollection(metrics=("loss",), keep_measure_history=False)
+        for _ in range(50):
+            v = random.random()
+            values.append(v)
+            c.loss.append(v)
+        summaries.append(pickle.loads(pickle.dumps(c.summary())))
+    loss = reduce_summaries(summaries)["loss"]
+    assert loss.measure("stdev") == pytest.approx(statistics.stdev(values))
+
+
+def test_merge_meters():
+    a, b = AverageMeter(), AverageMeter()
+    a.update(1, 2)
+    b.update(4, 1)
+    m = a.merge(b)
+    assert m.count == 3 and m.avg == pytest.approx(2) and m.val == 4
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import numpy
+import pytest
+
+from draugr.metrics import LatencyHistogramMeter, RateMeter
+from draugr.metrics.meters import PublishingMeter
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+           """
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class RecordingWriter:
+    def __init__(self):
+        self.scalars = []
+
+    def scalar(self, tag, value, step_i=None):
+        self.scalars.append((tag, value))
+
+
+def test_rate_meter_window():
+    clock = FakeClock()
+    rate = RateMeter(window=10.0, num_buckets=10, clock=clock)
+    for _ in range(100):  # 100 events/sec for 5 seconds
+        clock.now += 0.05
+        rate.tick(5)
+    assert rate.rate == pytest.approx(100, rel=0.05)
+    for _ in range(200):  # then 10 events/sec, older buckets fall out of the window
+        clock.now += 0.1
+        rate.tick()
+    assert rate.rate == pytest.approx(10, rel=0.1)
+    assert rate.total == 700
+
+
+def test_latency_quantiles_and_publish():
+    clock = FakeClock()
+    writer = RecordingWriter()
+    latency = LatencyHistogramMeter(
+        writer=writer, tag="step", publish_interval=5.0, clock=clock
+    )
+    samples = numpy.random.lognormal(-4, 1, 10000)
+    latency.tick()
+    for s in samples:
+        clock.now += s
+        latency.tick()
+    for q in (0.5, 0.99):
+        assert latency.quantile(q) == pytest.approx(
+            numpy.quantile(samples, q), rel=0.02
+        )
+    assert latency.mean == pytest.approx(samples.mean())
+    tags = {t for t, _ in writer.scalars}
+    assert tags == {"step_p50", "step_p90", "step_p99", "step_mean"}
+
+
+def test_latency_merge():
+    a, b = LatencyHistogramMeter(), LatencyHistogramMeter()
+    for v in (0.001, 0.002):
+        a.record(v)
+    b.record(1.0)
+    m = a.merge(b)
+    assert m.count == 3 and m.max == 1.0
+    assert m.quantile(0.5) == pytest.approx(0.002, rel=0.01)
+
+
+def test_publishing_meter_is_abstract():
+    with pytest.raises(TypeError):
+        PublishingMeter(tag="abstract")
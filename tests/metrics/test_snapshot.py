@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import numpy
+import pytest
+
+from draugr.metrics import (
+    MetricCollection,
+    load_metric_chunks,
+    read_metric_index,
+    snapshot_directory,
+)
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+           """
+
+
+def test_incremental_save_and_load(tmp_path):
+    c = MetricCollection(keep_measure_history=False)
+    c.extend(signal=numpy.arange(10.0), length=numpy.ones(3))
+    c.save(directory=tmp_path, project_name="p", config_name="c.d", incremental=True)
+    c.save(directory=tmp_path, project_name="p", config_name="c.d", incremental=True)
+    c.extend(signal=numpy.arange(10.0, 15.0))
+    c.save(directory=tmp_path, project_name="p", config_name="c.d", incremental=True)
+
+    directory = snapshot_directory(tmp_path, "p", "c.d")
+    index = read_metric_index(directory, "signal")
+    assert index["length"] == 15
+    assert [chunk["length"] for chunk in index["chunks"]] == [10, 5]
+    assert all(
+        isinstance(m, numpy.memmap) for m in load_metric_chunks(directory, "signal")
+    )
+
+    loaded = MetricCollection.load_snapshot(directory, keep_measure_history=False)
+    assert sorted(loaded.keys()) == ["length", "signal"]
+    numpy.testing.assert_array_equal(loaded.signal.values, numpy.arange(15.0))
+    assert loaded.signal.measures["mean"] == 7.0
+
+    loaded.signal.append(15.0)  # Resumed runs continue the snapshot
+    loaded.save(
+        directory=tmp_path, project_name="p", config_name="c.d", incremental=True
+    )
+    assert read_metric_index(directory, "signal")["length"] == 16
+    assert read_metric_index(directory, "length")["length"] == 3
+
+
+def test_fresh_aggregator_does_not_append_to_old_snapshot(tmp_path):
+    from draugr.metrics import MetricAggregator
+
+    old = MetricAggregator()
+    old.extend([1.0, 2.0, 3.0])
+    old.save_snapshot(tmp_path, "loss")
+
+    fresh = MetricAggregator()
+    fresh.append(9.0)
+    with pytest.raises(ValueError):
+        fresh.save_snapshot(tmp_path, "loss")
+    numpy.testing.assert_array_equal(
+        MetricAggregator.load_snapshot(tmp_path, "loss").values, [1.0, 2.0, 3.0]
+    )
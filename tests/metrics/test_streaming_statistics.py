@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import random
+import statistics
+
+import pytest
+
+from draugr.metrics import MetricAggregator, StreamingStatistics
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+           """
+
+
+@pytest.mark.parametrize(
+    "key",
+    [
+        "mean",
+        "variance",
+        "stdev",
+        "pvariance",
+        "pstdev",
+        "geometric_mean",
+        "harmonic_mean",
+    ],
+)
+def test_exact_measures(key):
+    values = [random.uniform(0.1, 10) for _ in range(1000)]
+    s = StreamingStatistics()
+    for v in values:
+        s.update(v)
+    assert s.measure(key) == pytest.approx(getattr(statistics, key)(values))
+
+
+def test_median_exact_below_five():
+    for n in range(1, 5):
+        values = [random.random() for _ in range(n)]
+        s = StreamingStatistics()
+        for v in values:
+            s.update(v)
+        assert s.measure("median") == pytest.approx(statistics.median(values))
+        assert s.measure("median_low") == statistics.median_low(values)
+        assert s.measure("median_high") == statistics.median_high(values)
+
+
+def test_median_estimate():
+    values = [random.gauss(3, 1) for _ in range(10000)]
+    s = StreamingStatistics()
+    for v in values:
+        s.update(v)
+    assert s.measure("median") == pytest.approx(statistics.median(values), abs=0.1)
+
+
+def test_median_batched_estimate():
+    values = [random.gauss(3, 1) for _ in range(10000)]
+    s = StreamingStatistics()
+    for i in range(0, len(values), 1000):
+        s.extend(values[i : i + 1000])
+    s.extend(values[:10])
+    assert len(s) == 10010
+    assert s.measure("median") == pytest.approx(statistics.median(values), abs=0.1)
+    assert s.measure("mean") == pytest.approx(statistics.mean(values + values[:10]))
+
+
+def test_median_drifting_batches():
+    import numpy
+
+    rng = numpy.random.default_rng(0)
+    batches = [rng.normal(i ** 2, 1, 1024) for i in range(100)]
+    agg = MetricAggregator()
+    for b in batches:
+        agg.extend(b)
+    assert agg.measures["median"] == pytest.approx(
+        numpy.median(numpy.concatenate(batches)), rel=0.01
+    )
+
+
+def test_ill_defined_is_none():
+    s = StreamingStatistics()
+    assert s.measure("mean") is None
+    s.update(-1)
+    assert s.measure("variance") is None
+    assert s.measure("geometric_mean") is None
+
+
+def test_aggregator_history():
+    agg = MetricAggregator(keep_measure_history=True)
+    for i in range(10):
+        agg.append(i)
+    assert len(agg.mean) == 10
+    assert agg.mean[-1] == pytest.approx(4.5)
+    assert agg.max == 9 and agg.min == 0
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import math
+
+import numpy
+
+from draugr.numpy_utilities.signal_utilities.smoothing import (
+    debiased_ema_smooth,
+    exponential_moving_average,
+    window_smooth,
+)
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+           """
+
+
+def tensorboard_smoothing(values, weight):
+    """The smoothing slider of the TensorBoard scalar dashboard, transcribed from its frontend"""
+    last, num_accumulated, smoothed = 0.0, 0, []
+    for v in values:
+        if not math.isfinite(v):
+            smoothed.append(v)
+            continue
+        last = last * weight + (1 - weight) * v
+        num_accumulated += 1
+        smoothed.append(last / (1 - weight ** num_accumulated))
+    return smoothed
+
+
+def test_debiased_ema_smooth_matches_tensorboard():
+    values = numpy.random.RandomState(0).normal(size=200)
+    values[[3, 50, 51]] = [numpy.nan, numpy.inf, -numpy.inf]
+    for weight in (0.0, 0.6, 0.99):
+        numpy.testing.assert_allclose(
+            debiased_ema_smooth(values, weight),
+            tensorboard_smoothing(values, weight),
+            rtol=1e-12,
+        )
+
+
+def test_window_smooth_trailing_mean():
+    values = numpy.arange(10.0)
+    expected = [numpy.mean(values[max(i - 2, 0) : i + 1]) for i in range(10)]
+    numpy.testing.assert_allclose(window_smooth(values, 3), expected)
+
+
+def test_exponential_moving_average_recurrence():
+    values = numpy.random.RandomState(1).random(50)
+    y, expected = values[0], []
+    for v in values:
+        y = 0.9 * y + 0.1 * v
+        expected.append(y)
+    numpy.testing.assert_allclose(exponential_moving_average(values, 0.9), expected)
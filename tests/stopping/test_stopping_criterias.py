@@ -1,8 +1,63 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import os
+import signal
+
+import pytest
+
+from draugr.stopping import (
+    DivergenceCriterion,
+    EarlyStop,
+    EMASlopeCriterion,
+    PlateauCriterion,
+    StoppingCriterion,
+)
 
 __author__ = "Christian Heider Nielsen"
 __doc__ = r"""
 
            Created on 9/14/19
            """
+
+
+def test_plateau():
+    p = PlateauCriterion(patience=3)
+    assert not any(p.update(v) for v in (3, 2, 1, 1.5, 1.2))
+    assert p.update(1.1)
+
+
+def test_ema_slope_and_divergence():
+    s = EMASlopeCriterion(threshold=1e-3, decay=0.9, min_updates=10)
+    assert not any(s.update(-i) for i in range(50))
+    assert any(s.update(0.0) for _ in range(200))
+    assert DivergenceCriterion().update(float("nan"))
+    assert DivergenceCriterion(10).update(-11)
+
+
+def test_early_stop_triggers(tmp_path):
+    calls = []
+    with EarlyStop(
+        {"loss": DivergenceCriterion()}, callbacks=lambda: calls.append(1)
+    ) as stop:
+        assert not stop.update(loss=1.0)
+        assert stop.update(loss=float("inf"))
+        stop.update(loss=float("inf"))
+    assert len(calls) == 1
+
+    with EarlyStop(signals=(signal.SIGUSR1,)) as stop:
+        os.kill(os.getpid(), signal.SIGUSR1)
+        assert stop.should_stop
+
+    sentinel = tmp_path / "STOP"
+    with EarlyStop(signals=(), sentinel_file=sentinel, sentinel_interval=0) as stop:
+        assert not stop.should_stop
+        sentinel.touch()
+        assert stop.should_stop
+
+    with EarlyStop(budget=0) as stop:
+        assert stop.should_stop
+
+
+def test_stopping_criterion_is_abstract():
+    with pytest.raises(TypeError):
+        StoppingCriterion()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+from torch.utils.tensorboard import SummaryWriter
+
+from draugr.tensorboard_utilities import TensorboardEventExporter
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+           """
+
+
+def test_follow_yields_new_scalars_once(tmp_path):
+    writer = SummaryWriter(str(tmp_path))
+    writer.add_scalar("loss", 0.0, 0)
+    writer.flush()
+
+    def write_more():
+        for step in range(1, 20):
+            time.sleep(0.02)
+            writer.add_scalar("loss", float(step), step)
+            writer.flush()
+
+    thread = threading.Thread(target=write_more)
+    with TensorboardEventExporter(tmp_path) as tee:
+        thread.start()
+        followed = [
+            (tag, event.step, event.value)
+            for tag, event in tee.follow(
+                "loss", poll_interval=0.05, max_poll_interval=0.1, timeout=1.0
+            )
+        ]
+    thread.join()
+    writer.close()
+
+    assert followed == [("loss", step, float(step)) for step in range(20)]
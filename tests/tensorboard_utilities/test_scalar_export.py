@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import numpy
+import pytest
+from torch.utils.tensorboard import SummaryWriter
+
+from draugr.tensorboard_utilities import TensorboardEventExporter
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+           """
+
+
+@pytest.fixture
+def run_dir(tmp_path):
+    with SummaryWriter(str(tmp_path)) as writer:
+        for step in (0, 2, 4):
+            writer.add_scalar("a", float(step), step)
+        writer.add_scalar("a", 40.0, 4)  # Relogged step, the last value is kept
+        for step in (1, 2, 3):
+            writer.add_scalar("b", 10.0 * step, step)
+    return tmp_path
+
+
+def test_scalar_arrays_sorted_last_value_kept(run_dir):
+    steps, values = TensorboardEventExporter(run_dir).scalar_arrays("a")
+    assert steps.tolist() == [0, 2, 4]
+    assert values.tolist() == [0.0, 2.0, 40.0]
+
+
+def test_scalar_export_aligned_outer_join(run_dir):
+    df = TensorboardEventExporter(run_dir).scalar_export_aligned("a", "b")
+    assert df.index.tolist() == [0, 1, 2, 3, 4]
+    numpy.testing.assert_array_equal(df["a"], [0, numpy.nan, 2, numpy.nan, 40])
+    numpy.testing.assert_array_equal(df["b"], [numpy.nan, 10, 20, 30, numpy.nan])
+
+
+def test_scalar_export_aligned_resampled(run_dir):
+    df = TensorboardEventExporter(run_dir).scalar_export_aligned(
+        "a", "b", resample_steps=[1, 3]
+    )
+    numpy.testing.assert_allclose(df["a"], [1, 21])
+    numpy.testing.assert_allclose(df["b"], [10, 30])
+
+
+def test_scalar_export_aligned_writes(run_dir, tmp_path):
+    tee = TensorboardEventExporter(run_dir, save_to_disk=True)
+    tee.scalar_export_aligned("a", out_dir=tmp_path, file_format="npz")
+    with numpy.load(str(tmp_path / "scalars_aligned_a.npz")) as f:
+        assert f["steps"].tolist() == [0, 2, 4]
+    with pytest.raises(ValueError):
+        tee.scalar_export_aligned("a", out_dir=tmp_path, file_format="xlsx")
+
+
+def test_scalar_export_aligned_no_tags(run_dir):
+    df = TensorboardEventExporter(run_dir).scalar_export_aligned(resample_steps=5)
+    assert df.shape == (0, 0)
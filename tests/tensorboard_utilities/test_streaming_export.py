@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import numpy
+import pytest
+from PIL import Image
+from tensorboard.plugins.histogram.summary_v2 import histogram_pb
+from torch.utils.tensorboard import SummaryWriter
+
+from draugr.tensorboard_utilities import TensorboardEventExporter
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+           """
+
+
+@pytest.fixture
+def run_dir(tmp_path):
+    run = tmp_path / "run"
+    with SummaryWriter(str(run)) as writer:
+        for step in range(3):
+            writer.add_histogram("legacy", numpy.arange(10.0) + step, step)
+            writer._get_file_writer().add_summary(
+                histogram_pb("tensor_form", numpy.arange(10.0) * step, buckets=3), step,
+            )
+            writer.add_image("image", numpy.full((3, 4, 5), step / 3), step)
+            writer.add_audio("audio", numpy.zeros(100), step, sample_rate=8000)
+    return run
+
+
+def test_export_histogram_npz(run_dir, tmp_path):
+    tee = TensorboardEventExporter(run_dir, save_to_disk=True)
+    legacy, tensor_form = tee.export_histogram(
+        "legacy", "tensor_form", out_dir=tmp_path
+    )
+    with numpy.load(str(legacy)) as f:
+        assert f["steps"].tolist() == [0, 1, 2]
+        assert f["stats"][:, 2].tolist() == [10, 10, 10]
+        assert f["offsets"][-1] == f["limits"].shape[0] == f["counts"].shape[0]
+    with numpy.load(str(tensor_form)) as f:
+        assert f["steps"].tolist() == [0, 1, 2]
+        assert f["offsets"].tolist() == [0, 3, 6, 9]
+        assert f["counts"].reshape(3, 3).sum(axis=1).tolist() == [10, 10, 10]
+        numpy.testing.assert_allclose(f["stats"][2, :2], [0, 18])
+
+
+def test_export_image_and_audio_blobs(run_dir, tmp_path):
+    tee = TensorboardEventExporter(run_dir, save_to_disk=True)
+    (images,) = tee.export_image("image", out_dir=tmp_path)
+    assert len(images) == 3
+    assert Image.open(str(images[-1])).size == (5, 4)
+    (audio,) = tee.export_audio("audio", out_dir=tmp_path)
+    assert [p.suffix for p in audio] == [".wav"] * 3
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import time
+
+import numpy
+import pytest
+import torch
+
+from draugr.torch_utilities import prefetch_to_device, to_tensor_generator
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+           """
+
+
+def slow_batches(n, seconds=0.02):
+    for i in range(n):
+        time.sleep(seconds)
+        yield numpy.full((4, 3), i)
+
+
+def test_preload_next_order_and_values():
+    out = list(to_tensor_generator(slow_batches(5, 0), preload_next=True))
+    assert [t.dtype for t in out] == [torch.float] * 5
+    assert all(t.equal(torch.full((4, 3), float(i))) for i, t in enumerate(out))
+
+
+def test_prefetch_to_device_overlaps_on_cpu():
+    start = time.perf_counter()
+    with prefetch_to_device(slow_batches(10)) as batches:
+        for _ in batches:
+            time.sleep(0.02)
+    assert time.perf_counter() - start < 0.35  # Serially 10 * (0.02 + 0.02)
+    assert batches.stats["items"] == 10
+
+
+def test_prefetch_to_device_reraises():
+    def failing():
+        yield numpy.zeros(2)
+        raise KeyError("boom")
+
+    batches = prefetch_to_device(failing())
+    next(batches)
+    with pytest.raises(KeyError):
+        next(batches)
+
+
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="requires cuda")
+def test_prefetch_to_device_cuda():
+    out = list(prefetch_to_device(slow_batches(5, 0), "cuda", dtype=torch.double))
+    assert all(t.is_cuda for t in out)
+    assert all(
+        t.cpu().equal(torch.full((4, 3), float(i), dtype=torch.double))
+        for i, t in enumerate(out)
+    )
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import math
+
+import pytest
+import torch
+
+from draugr.metrics import AverageMeter, lambda_accumulator, mean_accumulator
+from draugr.torch_utilities import (
+    TensorAccumulator,
+    TensorAverageMeter,
+    TensorLambdaAccumulator,
+    TensorMeanAccumulator,
+    TensorTotalAccumulator,
+)
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+           """
+
+
+def test_accumulators_match_generators():
+    lmbd, mean = lambda_accumulator(), mean_accumulator()
+    t_lmbd, t_mean, t_total = (
+        TensorLambdaAccumulator(),
+        TensorMeanAccumulator(),
+        TensorTotalAccumulator(),
+    )
+    for i in range(100):
+        lmbd.send(math.cos(i))
+        mean.send(math.cos(i))
+        v = torch.tensor(math.cos(i), dtype=torch.float64)
+        for acc in (t_lmbd, t_mean, t_total):
+            acc.update(v)
+    assert t_lmbd.value == pytest.approx(next(lmbd))
+    assert t_mean.value == pytest.approx(next(mean))
+    assert t_total.value == pytest.approx(sum(math.cos(i) for i in range(100)))
+
+
+def test_no_graph_retained():
+    x = torch.ones(3, requires_grad=True)
+    acc = TensorLambdaAccumulator()
+    acc.update(x * 2)
+    acc.update(x * 3)
+    assert not acc.tensor.requires_grad
+    assert acc.value == pytest.approx([2.01] * 3)
+
+
+def test_vector_average_meter():
+    meter = TensorAverageMeter()
+    meters = [AverageMeter() for _ in range(2)]
+    for val, mask in (([1.0, 2.0], [1, 1]), ([3.0, 8.0], [1, 0]), ([5.0, 4.0], [0, 1])):
+        meter.update(torch.tensor(val), torch.tensor(mask))
+        for m, v, n in zip(meters, val, mask):
+            if n:
+                m.update(v, n)
+    assert meter.value == pytest.approx([m.avg for m in meters])
+    assert meter.summary()["count"] == [2.0, 2.0]
+
+
+def test_host_count_weights():
+    meter, reference = TensorAverageMeter(), AverageMeter()
+    for val, n in ((1.0, 1), (2.0, 3), (4.0, 2)):
+        meter.update(torch.tensor(val), n)
+        reference.update(val, n)
+    assert meter.value == pytest.approx(reference.avg)
+    assert meter.summary()["count"] == 6.0
+
+
+def test_tensor_accumulator_is_abstract():
+    with pytest.raises(TypeError):
+        TensorAccumulator()
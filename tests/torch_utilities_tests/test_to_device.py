@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from collections import OrderedDict, namedtuple
+
+import numpy
+import pytest
+import torch
+
+from draugr.torch_utilities import (
+    NamedTensorTuple,
+    to_device,
+    to_device_iterator,
+    tree_flatten,
+    tree_unflatten,
+)
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+           """
+
+Sample = namedtuple("Sample", ("image", "label"))
+
+
+def nested_batch():
+    return OrderedDict(
+        sample=Sample(torch.rand((2, 3)), torch.arange(2)),
+        masks=[numpy.ones((2, 2), dtype=numpy.float32), (torch.zeros(5),)],
+        boxes=NamedTensorTuple(boxes=torch.rand(4, 4), labels=torch.arange(4)),
+        name="batch",
+    )
+
+
+def test_tree_roundtrip():
+    batch = nested_batch()
+    leaves, spec = tree_flatten(batch)
+    assert len(leaves) == 7
+    rebuilt = tree_unflatten(spec, leaves)
+    assert isinstance(rebuilt, OrderedDict) and list(rebuilt) == list(batch)
+    assert isinstance(rebuilt["sample"], Sample)
+    assert isinstance(rebuilt["masks"][1], tuple)
+    assert isinstance(rebuilt["boxes"], NamedTensorTuple)
+    assert rebuilt["boxes"]["labels"] is batch["boxes"]["labels"]
+
+
+def test_to_device_coalesces_per_dtype():
+    batch = nested_batch()
+    moved = to_device(batch, "meta")
+    floats = [
+        moved["sample"].image,
+        moved["masks"][0],
+        moved["masks"][1][0],
+        moved["boxes"]["boxes"],
+    ]
+    assert all(t.is_meta and t.dtype == torch.float for t in floats)
+    assert len({t._base.shape for t in floats}) == 1
+    assert floats[0]._base.numel() == 6 + 4 + 5 + 16
+    assert moved["sample"].label.dtype == torch.int64
+    assert moved["boxes"]["labels"].shape == (4,)
+    assert moved["name"] == "batch"
+
+
+def test_to_device_iterator_keeps_structure_on_cpu():
+    batches = [(numpy.full((2, 2), i), {"y": torch.tensor([i])}) for i in range(3)]
+    for i, (x, y) in enumerate(to_device_iterator(batches, "cpu")):
+        assert x.equal(torch.full((2, 2), i))
+        assert y["y"].item() == i
+
+
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="requires cuda")
+def test_to_device_cuda_values():
+    batch = nested_batch()
+    moved = to_device(batch, "cuda")
+    torch.cuda.synchronize()
+    assert moved["sample"].image.cpu().equal(batch["sample"].image)
+    assert moved["boxes"]["labels"].cpu().equal(batch["boxes"]["labels"])
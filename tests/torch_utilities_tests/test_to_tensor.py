@@ -76,5 +76,26 @@ def test_generator_to_float_tensor():
     assert tensor.equal(ref)
 
 
+def test_numpy_shares_memory_when_dtype_matches():
+    ref = numpy.zeros((2, 3), dtype=numpy.float32)
+    tensor = to_tensor(ref)
+    ref[0, 0] = 1
+    assert tensor[0, 0] == 1
+    assert to_tensor(ref[::-1]).equal(torch.from_numpy(ref[::-1].copy()))
+
+
+def test_nested_leaves_stacked_once():
+    z = torch.zeros((2, 2))
+    assert to_tensor(([[[z]]], [[[z]]])).shape == (2, 1, 1, 1, 2, 2)
+    assert to_tensor([[numpy.ones(3)] * 4] * 5).equal(torch.ones((5, 4, 3)))
+    assert to_tensor(numpy.array([z, z], dtype=object)).shape == (2, 2, 2)
+
+
+def test_pin_memory():
+    tensor = to_tensor([[0, 1], [2, 3]], pin_memory=True)
+    assert tensor.equal(torch.FloatTensor([[0, 1], [2, 3]]))
+    assert tensor.is_pinned() == torch.cuda.is_available()
+
+
 if __name__ == "__main__":
     pass